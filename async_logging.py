@@ -0,0 +1,109 @@
+import collections
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+import time
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class CompressedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler berdasarkan ukuran; file lama dikompres gzip"""
+
+    def __init__(self, filename, max_bytes=5 * 1024 * 1024, backup_count=10, encoding='utf-8'):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding)
+        self.namer = lambda name: f"{name}.gz"
+        self.rotator = self._compress
+
+    @staticmethod
+    def _compress(source, dest):
+        with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+
+
+class DuplicateCollapseFilter(logging.Filter):
+    """Batasi pesan identik: pesan yang sama dalam jendela waktu digabung menjadi satu baris"""
+
+    def __init__(self, window_seconds=5.0, max_keys=256):
+        super().__init__()
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._seen = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = (record.levelno, record.getMessage())
+        now = record.created
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window_seconds:
+                entry[1] += 1
+                return False
+            repeats = entry[1] if entry is not None else 0
+            self._seen[key] = [now, 0]
+            self._seen.move_to_end(key)
+            while len(self._seen) > self.max_keys:
+                self._seen.popitem(last=False)
+        if repeats:
+            record.msg = f"{record.getMessage()} (diulang {repeats} kali sebelumnya)"
+            record.args = None
+        return True
+
+
+class LogRingBuffer(logging.Handler):
+    """Handler untuk panel log GUI: ring buffer terbatas berisi baris yang belum diambil, diambil per tick"""
+
+    def __init__(self, capacity=500):
+        super().__init__()
+        # Jika GUI tertinggal, baris tertua dibuang; panel sendiri dibatasi log_view_max_lines
+        self._pending = collections.deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def emit(self, record):
+        try:
+            line = f"[{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.created))}] {record.getMessage()}\n"
+        except Exception:
+            self.handleError(record)
+            return
+        with self._lock:
+            self._pending.append(line)
+
+    def drain(self):
+        """Ambil semua baris baru sejak drain terakhir (dipanggil dari thread Tk)"""
+        with self._lock:
+            pending = list(self._pending)
+            self._pending.clear()
+        return pending
+
+
+def setup_async_logging(log_dir, log_name='object_detection.log', level=logging.INFO,
+                        max_bytes=5 * 1024 * 1024, backup_count=10, gui_capacity=500, collapse_window=5.0):
+    """Logging non-blocking: QueueHandler di thread pemanggil, file/console/GUI di thread listener"""
+    os.makedirs(log_dir, exist_ok=True)
+    log_filename = os.path.join(log_dir, log_name)
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    file_handler = CompressedRotatingFileHandler(log_filename, max_bytes, backup_count)
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+    gui_handler = LogRingBuffer(gui_capacity)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(DuplicateCollapseFilter(collapse_window))
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(level)
+    root_logger.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, gui_handler, respect_handler_level=True
+    )
+    listener.start()
+    return log_filename, listener, gui_handler
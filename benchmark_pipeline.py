@@ -0,0 +1,260 @@
+import argparse
+import glob
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from detection_engine import DetectionEngine, DEFAULT_DETECTION_CONFIG
+from display_pipeline import compute_display_size, prepare_display_frame
+from frame_mailbox import LatestFrameMailbox
+from motion_gate import MotionGate
+
+STAGES = ("capture", "motion_gate", "infer", "filter", "draw", "display", "end_to_end")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def iter_source_frames(sources, loops=1):
+    """Iterasi frame dari file video dan/atau direktori gambar (tanpa kamera)"""
+    for _ in range(loops):
+        for source in sources:
+            if os.path.isdir(source):
+                paths = sorted(p for p in glob.glob(os.path.join(source, "*")) if p.lower().endswith(IMAGE_EXTENSIONS))
+                for path in paths:
+                    frame = cv2.imread(path)
+                    if frame is not None:
+                        yield frame
+            else:
+                cap = cv2.VideoCapture(source)
+                try:
+                    while True:
+                        ret, frame = cap.read()
+                        if not ret:
+                            break
+                        yield frame
+                finally:
+                    cap.release()
+
+
+def timed_frames(frames):
+    """Iterasi frame beserta durasi baca (stage capture) dan waktu selesai capture"""
+    iterator = iter(frames)
+    while True:
+        t_start = time.perf_counter()
+        try:
+            frame = next(iterator)
+        except StopIteration:
+            return
+        t_end = time.perf_counter()
+        yield frame, t_end - t_start, t_end
+
+
+def summarize(samples):
+    """Ringkasan latensi (ms) satu stage"""
+    if not samples:
+        return {"count": 0}
+    values = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": int(values.size),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(values.max())
+    }
+
+
+class PipelineBenchmark:
+    """Replay footage melalui stage capture -> infer -> filter -> draw -> display tanpa kamera dan window"""
+
+    def __init__(self, engine, display_width=1200, warmup_frames=5, motion_gate=None):
+        self.engine = engine
+        self.motion_gate = motion_gate
+        self.last_inspection = None
+        self.display_size = compute_display_size(display_width)
+        self.warmup_frames = warmup_frames
+        self.timings = {stage: [] for stage in STAGES}
+        self.processed_frames = 0
+
+    def process_frame(self, frame, capture_ts):
+        """Jalankan satu frame melalui stage yang sama dengan detection_thread dan display_frame"""
+        t_gate = time.perf_counter()
+        run_inference = self.motion_gate is None or self.last_inspection is None or self.motion_gate.should_infer(frame)
+        t0 = time.perf_counter()
+        if run_inference and self.engine.detection_config.get("tiling_enabled"):
+            # Mode tiling: semua tile ROI dalam satu batch, filter dan merge termasuk di stage infer
+            inspection = self.last_inspection = self.engine.predict_tiled([frame])[0]
+            t1 = time.perf_counter()
+        elif run_inference and self.engine.detection_config.get("adaptive_resolution_enabled"):
+            # Mode adaptif: filter termasuk di stage infer (dua pass imgsz)
+            inspection = self.last_inspection = self.engine.predict_adaptive([frame])[0]
+            t1 = time.perf_counter()
+        elif run_inference:
+            results = self.engine.run_model([frame])
+            t1 = time.perf_counter()
+            inspection = self.last_inspection = self.engine.postprocess(results)[0]
+        else:
+            inspection = self.last_inspection
+            t1 = time.perf_counter()
+        t2 = time.perf_counter()
+        display_frame = self.engine.draw_detections(frame, inspection["objects"])
+        t3 = time.perf_counter()
+        prepare_display_frame(display_frame, self.display_size)
+        t4 = time.perf_counter()
+
+        self.processed_frames += 1
+        if self.processed_frames > self.warmup_frames:
+            if self.motion_gate is not None:
+                self.timings["motion_gate"].append(t0 - t_gate)
+            if run_inference:
+                self.timings["infer"].append(t1 - t0)
+                self.timings["filter"].append(t2 - t1)
+            self.timings["draw"].append(t3 - t2)
+            self.timings["display"].append(t4 - t3)
+            self.timings["end_to_end"].append(t4 - capture_ts)
+        return inspection
+
+    def run_offline(self, frames):
+        """Proses setiap frame secara berurutan (throughput maksimum, tanpa frame dibuang)"""
+        total_frames = 0
+        start = None
+        for frame, read_time, t_capture in timed_frames(frames):
+            total_frames += 1
+            if total_frames == self.warmup_frames + 1:
+                start = t_capture - read_time
+            if total_frames > self.warmup_frames:
+                self.timings["capture"].append(read_time)
+            self.process_frame(frame, t_capture)
+        elapsed = time.perf_counter() - start if start else 0.0
+        return self.report("offline", total_frames, 0, elapsed)
+
+    def run_realtime(self, frames, fps=30.0):
+        """Replay frame pada FPS kamera melalui mailbox, seperti video_capture_thread/detection_thread"""
+        mailbox = LatestFrameMailbox(capacity=1)
+        done = threading.Event()
+        captured = [0]
+        frame_interval = 1.0 / fps if fps > 0 else 0.0
+
+        def capture_worker():
+            next_ts = time.perf_counter()
+            for frame, read_time, t_capture in timed_frames(frames):
+                captured[0] += 1
+                mailbox.put(frame, t_capture)
+                if captured[0] > self.warmup_frames:
+                    self.timings["capture"].append(read_time)
+                next_ts += frame_interval
+                delay = next_ts - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            done.set()
+
+        capture_thread = threading.Thread(target=capture_worker, daemon=True)
+        start = time.perf_counter()
+        capture_thread.start()
+        while True:
+            try:
+                packet = mailbox.get(timeout=0.1)
+            except queue.Empty:
+                if done.is_set() and mailbox.qsize() == 0:
+                    break
+                continue
+            self.process_frame(packet.frame, packet.capture_ts)
+        elapsed = time.perf_counter() - start
+        capture_thread.join()
+        return self.report("realtime", captured[0], mailbox.dropped_frames, elapsed)
+
+    def report(self, mode, total_frames, dropped_frames, elapsed):
+        """Laporan JSON: throughput, persentil latensi per stage dan frame dibuang"""
+        measured = max(0, self.processed_frames - self.warmup_frames)
+        return {
+            "mode": mode,
+            "backend": self.engine.detection_config.get("inference_backend", "torch"),
+            "imgsz": self.engine.detection_config.get("imgsz"),
+            "confidence_threshold": self.engine.detection_config["confidence_threshold"],
+            "frames_total": total_frames,
+            "frames_processed": self.processed_frames,
+            "frames_dropped": dropped_frames,
+            "warmup_frames": self.warmup_frames,
+            "elapsed_s": elapsed,
+            "throughput_fps": measured / elapsed if elapsed > 0 else 0.0,
+            "stages": {stage: summarize(samples) for stage, samples in self.timings.items()},
+            "motion_gate": self.motion_gate.stats() if self.motion_gate else None,
+            "adaptive_resolution": self.adaptive_report(),
+            "tiling": self.tiling_report()
+        }
+
+    def tiling_report(self):
+        config = self.engine.detection_config
+        if not config.get("tiling_enabled"):
+            return None
+        return {key: config[key] for key in ("tiling_roi", "tiling_tile_size", "tiling_overlap", "tiling_include_full")}
+
+    def adaptive_report(self):
+        config = self.engine.detection_config
+        if not config.get("adaptive_resolution_enabled"):
+            return None
+        return {
+            "low_imgsz": config["adaptive_low_imgsz"],
+            "uncertainty_band": config["adaptive_uncertainty_band"],
+            "escalation_rate": self.engine.escalation_rate(),
+            **self.engine.adaptive_stats
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline deteksi dengan footage rekaman")
+    parser.add_argument("sources", nargs="*", default=[os.path.join("data", "clarinet_captured_photos")],
+                        help="File video atau direktori gambar")
+    parser.add_argument("--weights", default="trainedclarinettes_yolov8n.pt")
+    parser.add_argument("--backend", default=DEFAULT_DETECTION_CONFIG["inference_backend"])
+    parser.add_argument("--imgsz", type=int, default=DEFAULT_DETECTION_CONFIG["imgsz"])
+    parser.add_argument("--conf", type=float, default=DEFAULT_DETECTION_CONFIG["confidence_threshold"])
+    parser.add_argument("--mode", choices=("offline", "realtime"), default="realtime")
+    parser.add_argument("--fps", type=float, default=30.0, help="FPS replay untuk mode realtime")
+    parser.add_argument("--loops", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--motion-gate", action="store_true", help="Lewati inferensi saat scene statis")
+    parser.add_argument("--adaptive", action="store_true", help="Resolusi adaptif: pass imgsz kecil dengan eskalasi")
+    parser.add_argument("--low-imgsz", type=int, default=DEFAULT_DETECTION_CONFIG["adaptive_low_imgsz"])
+    parser.add_argument("--uncertainty-band", type=float, default=DEFAULT_DETECTION_CONFIG["adaptive_uncertainty_band"])
+    parser.add_argument("--tiled", action="store_true", help="Inferensi per tile di dalam ROI (part kecil)")
+    parser.add_argument("--roi", type=int, nargs=4, metavar=("X1", "Y1", "X2", "Y2"), help="ROI tiling (piksel)")
+    parser.add_argument("--tile-size", type=int, default=DEFAULT_DETECTION_CONFIG["tiling_tile_size"])
+    parser.add_argument("--overlap", type=float, default=DEFAULT_DETECTION_CONFIG["tiling_overlap"])
+    parser.add_argument("--output", help="Simpan laporan JSON ke file")
+    args = parser.parse_args(argv)
+
+    config = dict(DEFAULT_DETECTION_CONFIG)
+    config.update({"inference_backend": args.backend, "imgsz": args.imgsz, "confidence_threshold": args.conf,
+                   "adaptive_resolution_enabled": args.adaptive, "adaptive_low_imgsz": args.low_imgsz,
+                   "adaptive_uncertainty_band": args.uncertainty_band, "tiling_enabled": args.tiled,
+                   "tiling_roi": tuple(args.roi) if args.roi else None, "tiling_tile_size": args.tile_size,
+                   "tiling_overlap": args.overlap})
+    engine = DetectionEngine(args.weights, detection_config=config)
+    engine.load_model()
+
+    motion_gate = MotionGate.from_config(config) if args.motion_gate else None
+    benchmark = PipelineBenchmark(engine, warmup_frames=args.warmup, motion_gate=motion_gate)
+    frames = iter_source_frames(args.sources, args.loops)
+    if args.mode == "offline":
+        report = benchmark.run_offline(frames)
+    else:
+        report = benchmark.run_realtime(frames, args.fps)
+    report["sources"] = args.sources
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
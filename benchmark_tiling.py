@@ -0,0 +1,163 @@
+import argparse
+import json
+
+import cv2
+import numpy as np
+
+from dataset_audit import list_pairs
+from geometry import box_iou
+from quantize_int8 import build_engine, measure_latency
+
+
+def load_ground_truth(label_path, width, height):
+    """Label YOLO (class cx cy w h ternormalisasi) -> class ID dan box xyxy piksel"""
+    try:
+        rows = np.loadtxt(label_path, ndmin=2, dtype=np.float32)
+    except (OSError, ValueError):
+        rows = np.zeros((0, 5), dtype=np.float32)
+    if rows.size == 0:
+        return np.zeros(0, dtype=np.int32), np.zeros((0, 4), dtype=np.float32)
+    cx, cy, w, h = rows[:, 1] * width, rows[:, 2] * height, rows[:, 3] * width, rows[:, 4] * height
+    xyxy = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    return rows[:, 0].astype(np.int32), xyxy
+
+
+def match_frame(objects, gt_cls, gt_xyxy, iou_threshold, counts):
+    """Pencocokan greedy per kelas (confidence tertinggi dulu); hasil ditambahkan ke counts[class_id]"""
+    for class_id in set(gt_cls.tolist()) | {obj["class_id"] for obj in objects}:
+        gt = gt_xyxy[gt_cls == class_id]
+        preds = sorted((obj for obj in objects if obj["class_id"] == class_id), key=lambda obj: -obj["confidence"])
+        stats = counts.setdefault(class_id, {"gt": 0, "tp": 0, "fp": 0})
+        stats["gt"] += len(gt)
+        if not preds:
+            continue
+        if not len(gt):
+            stats["fp"] += len(preds)
+            continue
+        iou = np.array([[box_iou(obj["bbox"], box) for box in gt.tolist()] for obj in preds])
+        taken = np.zeros(len(gt), dtype=bool)
+        for row in iou:
+            candidates = np.where(taken, -1.0, row)
+            best = int(candidates.argmax())
+            if candidates[best] >= iou_threshold:
+                taken[best] = True
+                stats["tp"] += 1
+            else:
+                stats["fp"] += 1
+
+
+def evaluate_mode(engine, samples, iou_threshold):
+    """Recall/precision per part dan akurasi status Lengkap/NG terhadap label"""
+    compiled = engine.compiled_recipe
+    counts = {}
+    status_correct = 0
+    tiles = 0
+    for frame, gt_cls, gt_xyxy in samples:
+        inspection = engine.predict(frame)
+        tiles += inspection.get("tiles", 1)
+        match_frame(inspection["objects"], gt_cls, gt_xyxy, iou_threshold, counts)
+        expected = compiled.check_counts(compiled.count(gt_cls.tolist()))
+        status_correct += expected["complete"] == inspection["complete"]
+    names = engine.names
+    per_part = {}
+    for class_id, stats in sorted(counts.items()):
+        predicted = stats["tp"] + stats["fp"]
+        per_part[names.get(class_id, str(class_id))] = {
+            **stats,
+            "recall": stats["tp"] / stats["gt"] if stats["gt"] else 0.0,
+            "precision": stats["tp"] / predicted if predicted else 0.0
+        }
+    total = len(samples)
+    return {
+        "per_part": per_part,
+        "status_accuracy": status_correct / total if total else 0.0,
+        "tiles_per_frame": tiles / total if total else 0.0
+    }
+
+
+def load_samples(dataset_path, split, limit=None):
+    samples = []
+    for pair_split, _, image_path, label_path in list_pairs(dataset_path):
+        if pair_split != split:
+            continue
+        frame = cv2.imread(image_path)
+        if frame is None:
+            continue
+        gt_cls, gt_xyxy = load_ground_truth(label_path, frame.shape[1], frame.shape[0])
+        samples.append((frame, gt_cls, gt_xyxy))
+        if limit and len(samples) >= limit:
+            break
+    return samples
+
+
+def compare_tiling(weights_path, dataset_path, split="val", backend="torch", imgsz=640, roi=None, tile_size=640,
+                   overlap=0.2, include_full=True, iou_threshold=0.5, limit=None):
+    """Full-frame vs tiling ROI pada gambar berlabel yang sama: throughput dan recall per part"""
+    samples = load_samples(dataset_path, split, limit)
+    if not samples:
+        raise ValueError(f"Tidak ada gambar berlabel di split {split} pada {dataset_path}")
+    engine = build_engine(weights_path, backend, imgsz)
+    frames = [frame for frame, _, _ in samples]
+    height, width = frames[0].shape[:2]
+    report = {
+        "weights": weights_path,
+        "backend": backend,
+        "images": len(samples),
+        "resolution": [width, height],
+        "iou_threshold": iou_threshold
+    }
+    modes = (
+        ("full_frame", {"tiling_enabled": False}),
+        ("tiled", {"tiling_enabled": True, "tiling_roi": roi, "tiling_tile_size": tile_size,
+                   "tiling_overlap": overlap, "tiling_include_full": include_full})
+    )
+    for mode, overrides in modes:
+        engine.detection_config.update(overrides)
+        report[mode] = {
+            "config": overrides,
+            "latency": measure_latency(engine, frames),
+            "accuracy": evaluate_mode(engine, samples, iou_threshold)
+        }
+    full, tiled = report["full_frame"], report["tiled"]
+    report["recall_gain"] = {
+        part: stats["recall"] - full["accuracy"]["per_part"].get(part, {}).get("recall", 0.0)
+        for part, stats in tiled["accuracy"]["per_part"].items()
+    }
+    report["throughput_ratio"] = (
+        tiled["latency"]["throughput_fps"] / full["latency"]["throughput_fps"]
+        if full["latency"]["throughput_fps"] else 0.0
+    )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan inferensi full-frame dengan tiling ROI (part kecil)")
+    parser.add_argument("dataset", help="Dataset YOLO resolusi kamera tinggi (split/images, split/labels)")
+    parser.add_argument("--weights", default="trainedclarinettes_yolov8n.pt")
+    parser.add_argument("--split", default="val")
+    parser.add_argument("--backend", default="torch")
+    parser.add_argument("--imgsz", type=int, default=640, help="imgsz mode full-frame")
+    parser.add_argument("--roi", type=int, nargs=4, metavar=("X1", "Y1", "X2", "Y2"), help="ROI inspeksi (piksel)")
+    parser.add_argument("--tile-size", type=int, default=640)
+    parser.add_argument("--overlap", type=float, default=0.2)
+    parser.add_argument("--no-full", action="store_true", help="Tanpa pass ROI utuh di batch tile")
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU minimum deteksi cocok dengan label")
+    parser.add_argument("--limit", type=int, help="Batasi jumlah gambar")
+    parser.add_argument("--output", default="tiling_report.json")
+    args = parser.parse_args()
+
+    report = compare_tiling(args.weights, args.dataset, args.split, args.backend, args.imgsz,
+                            tuple(args.roi) if args.roi else None, args.tile_size, args.overlap,
+                            not args.no_full, args.iou, args.limit)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"{'Mode':<12}{'FPS':>8}{'p50 ms':>9}{'Tile/frame':>12}{'Status':>9}")
+    for mode in ("full_frame", "tiled"):
+        result = report[mode]
+        print(f"{mode:<12}{result['latency']['throughput_fps']:>8.1f}{result['latency']['p50_ms']:>9.1f}"
+              f"{result['accuracy']['tiles_per_frame']:>12.1f}{result['accuracy']['status_accuracy']:>9.3f}")
+    print(f"{'Part':<18}{'Recall full':>12}{'Recall tile':>12}")
+    for part, stats in report["tiled"]["accuracy"]["per_part"].items():
+        full_recall = report["full_frame"]["accuracy"]["per_part"].get(part, {}).get("recall", 0.0)
+        print(f"{part:<18}{full_recall:>12.3f}{stats['recall']:>12.3f}")
+    print(f"Laporan ditulis ke {args.output}")
@@ -0,0 +1,158 @@
+import queue
+import threading
+import time
+
+import cv2
+
+from frame_mailbox import LatestFrameMailbox
+from frame_pool import FramePool, FrameRef
+
+DEFAULT_CAMERA = {
+    "name": "Kamera 1",
+    "source": 0,
+    "api": cv2.CAP_DSHOW,
+    "width": 640,
+    "height": 360,
+    "fps": 30,
+    # Buffer frame per kamera: capture + mailbox + deteksi + frame submit terakhir + antrian writer
+    "pool_size": 8
+}
+
+
+class CameraSource:
+    """Satu kamera di stasiun: capture thread sendiri dan mailbox frame terbaru sendiri"""
+
+    def __init__(self, camera_id, config, frame_ready):
+        config = {**DEFAULT_CAMERA, "name": f"Kamera {camera_id + 1}", **config}
+        self.camera_id = camera_id
+        self.name = config["name"]
+        self.source = config["source"]
+        self.api = config["api"]
+        self.width = config["width"]
+        self.height = config["height"]
+        self.fps = config["fps"]
+        self.pool_size = config["pool_size"]
+        self.frame_ready = frame_ready
+        self.mailbox = LatestFrameMailbox(capacity=1)
+        self.cap = None
+        # Pool dibuat setelah frame pertama, dengan bentuk frame yang benar-benar dikirim kamera
+        self.pool = None
+        self._current_ref = None
+        self._current_lock = threading.Lock()
+        # State per kamera yang diisi aplikasi (motion gate, tracker, hasil terakhir, tampilan)
+        self.motion_gate = None
+        self.tracker = None
+        self.event_recorder = None
+        self.last_inspection = None
+        self.display = None
+
+    def open(self):
+        """Buka kamera dengan resolusi dan FPS dari konfigurasi"""
+        cap = cv2.VideoCapture(self.source, self.api) if self.api is not None else cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            raise IOError(f"Tidak dapat membuka kamera {self.name} ({self.source})")
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        cap.set(cv2.CAP_PROP_FPS, self.fps)
+        self.cap = cap
+        return cap
+
+    def read(self):
+        """Baca satu frame ke buffer pool lalu kirim ke mailbox; None jika kamera gagal dibaca"""
+        if self.pool is None:
+            ret, frame = self.cap.read()
+            if not ret:
+                return None
+            self.pool = FramePool(self.pool_size, frame.shape, frame.dtype)
+            ref = FrameRef(None, -1, frame)
+        else:
+            ref = self.pool.acquire()
+            ret, frame = self.cap.read(ref.array)
+            if not ret:
+                ref.release()
+                return None
+            if frame is not ref.array:
+                # Kamera mengganti resolusi: OpenCV mengalokasi array baru, pakai array itu di luar pool
+                ref.release()
+                ref = FrameRef(None, -1, frame)
+        capture_ts = time.perf_counter()
+        self._set_current(ref.retain())
+        # Referensi milik capture diserahkan ke mailbox (dilepas oleh consumer atau saat frame digantikan)
+        packet = self.mailbox.put(ref.array, capture_ts, ref)
+        self.frame_ready.set()
+        return packet
+
+    def _set_current(self, ref):
+        with self._current_lock:
+            previous, self._current_ref = self._current_ref, ref
+        if previous is not None:
+            previous.release()
+
+    @property
+    def current_frame(self):
+        """Frame terbaru (tanpa menahan buffer; pakai acquire_current jika frame diserahkan ke thread lain)"""
+        ref = self._current_ref
+        return ref.array if ref is not None else None
+
+    def acquire_current(self):
+        """Frame terbaru dengan satu referensi tambahan; pemanggil wajib release"""
+        with self._current_lock:
+            if self._current_ref is None:
+                return None
+            return self._current_ref.retain()
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        self._set_current(None)
+
+
+class CameraStation:
+    """Kumpulan kamera satu stasiun; frame terbaru semua kamera dikumpulkan untuk satu batch inferensi"""
+
+    def __init__(self, camera_configs):
+        self.frame_ready = threading.Event()
+        self.cameras = [CameraSource(index, config, self.frame_ready) for index, config in enumerate(camera_configs)]
+
+    def __iter__(self):
+        return iter(self.cameras)
+
+    def __len__(self):
+        return len(self.cameras)
+
+    @property
+    def primary(self):
+        return self.cameras[0]
+
+    def open_all(self):
+        for camera in self.cameras:
+            camera.open()
+
+    def release_all(self):
+        for camera in self.cameras:
+            camera.release()
+
+    def wait_packets(self, timeout=1.0):
+        """Tunggu minimal satu frame baru, lalu ambil frame terbaru dari setiap kamera yang punya frame baru"""
+        if not self.frame_ready.wait(timeout):
+            return []
+        # Clear sebelum mengambil: frame yang masuk setelah ini akan men-set event lagi
+        self.frame_ready.clear()
+        packets = []
+        for camera in self.cameras:
+            try:
+                packets.append((camera, camera.mailbox.get(timeout=0)))
+            except queue.Empty:
+                continue
+        return packets
+
+    def queue_depth(self):
+        return sum(camera.mailbox.qsize() for camera in self.cameras)
+
+    def dropped_frames(self):
+        return sum(camera.mailbox.dropped_frames for camera in self.cameras)
+
+    def pool_exhausted(self):
+        """Jumlah frame yang terpaksa dialokasi di luar pool karena semua buffer sedang dipakai"""
+        return sum(camera.pool.exhausted for camera in self.cameras if camera.pool is not None)
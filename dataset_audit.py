@@ -0,0 +1,304 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+SPLITS = ("train", "val")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+INDEX_FILENAME = ".audit_index.json"
+INDEX_VERSION = 1
+# Batas area box (piksel persegi) ala COCO: kecil < 32x32, sedang < 96x96
+SMALL_AREA = 32 * 32
+MEDIUM_AREA = 96 * 96
+
+
+def file_signature(path):
+    """(mtime, ukuran) file; None jika file tidak ada"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime, stat.st_size]
+
+
+def dhash(gray, hash_size=8):
+    """Difference hash 64-bit untuk deteksi gambar hampir sama"""
+    resized = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (resized[:, 1:] > resized[:, :-1]).flatten()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def audit_pair(image_path, label_path, num_classes):
+    """Validasi satu pasangan gambar/label (dijalankan di worker proses)"""
+    record = {
+        "image_signature": file_signature(image_path),
+        "label_signature": file_signature(label_path),
+        "width": 0,
+        "height": 0,
+        "dhash": None,
+        "boxes": [],
+        "errors": [],
+        "warnings": []
+    }
+    errors, warnings = record["errors"], record["warnings"]
+
+    with open(image_path, "rb") as f:
+        data = f.read()
+    if image_path.lower().endswith((".jpg", ".jpeg")) and not data.rstrip(b"\0").endswith(b"\xff\xd9"):
+        errors.append("JPEG terpotong (tanpa marker EOI)")
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        errors.append("Gambar rusak / tidak dapat didecode")
+        return record
+    height, width = image.shape[:2]
+    record["width"], record["height"] = width, height
+    record["dhash"] = dhash(image)
+
+    if record["label_signature"] is None:
+        errors.append("File label tidak ada")
+        return record
+    seen = set()
+    with open(label_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            fields = line.split()
+            if len(fields) != 5:
+                errors.append(f"Baris {line_number}: {len(fields)} kolom (harus 5: kelas cx cy w h)")
+                continue
+            try:
+                class_value = float(fields[0])
+                cx, cy, w, h = (float(value) for value in fields[1:])
+            except ValueError:
+                errors.append(f"Baris {line_number}: nilai bukan angka")
+                continue
+            if class_value != int(class_value) or not 0 <= class_value < num_classes:
+                errors.append(f"Baris {line_number}: class ID {fields[0]} di luar rentang 0..{num_classes - 1}")
+                continue
+            if w <= 0 or h <= 0 or w * width < 2 or h * height < 2:
+                errors.append(f"Baris {line_number}: box degenerate ({w * width:.1f}x{h * height:.1f} piksel)")
+                continue
+            if not (0 <= cx <= 1 and 0 <= cy <= 1) or cx - w / 2 < -0.01 or cx + w / 2 > 1.01 \
+                    or cy - h / 2 < -0.01 or cy + h / 2 > 1.01:
+                errors.append(f"Baris {line_number}: box keluar dari gambar")
+                continue
+            key = tuple(fields)
+            if key in seen:
+                warnings.append(f"Baris {line_number}: label duplikat")
+                continue
+            seen.add(key)
+            record["boxes"].append([int(class_value), w * width, h * height])
+    if not record["boxes"] and not errors:
+        warnings.append("Label kosong (gambar background)")
+    return record
+
+
+def _audit_task(task):
+    key, image_path, label_path, num_classes = task
+    try:
+        return key, audit_pair(image_path, label_path, num_classes)
+    except Exception as e:
+        return key, {"image_signature": file_signature(image_path), "label_signature": file_signature(label_path),
+                     "width": 0, "height": 0, "dhash": None, "boxes": [], "errors": [f"Gagal diaudit: {e}"],
+                     "warnings": []}
+
+
+def load_names(data_yaml):
+    """Nama kelas dari data.yaml (list atau dict)"""
+    import yaml
+
+    with open(data_yaml, encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    names = data["names"]
+    if isinstance(names, dict):
+        return [names[key] for key in sorted(names, key=int)]
+    return list(names)
+
+
+def list_pairs(dataset_path):
+    """Pasangan (split, key, path gambar, path label) untuk semua split"""
+    pairs = []
+    for split in SPLITS:
+        image_dir = os.path.join(dataset_path, split, "images")
+        label_dir = os.path.join(dataset_path, split, "labels")
+        if not os.path.isdir(image_dir):
+            continue
+        for filename in sorted(os.listdir(image_dir)):
+            if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            label_path = os.path.join(label_dir, os.path.splitext(filename)[0] + ".txt")
+            pairs.append((split, f"{split}/{filename}", os.path.join(image_dir, filename), label_path))
+    return pairs
+
+
+def load_index(index_path, num_classes):
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    # Index lama tidak berlaku jika versi atau jumlah kelas berubah (validasi class ID bergantung padanya)
+    if index.get("version") != INDEX_VERSION or index.get("num_classes") != num_classes:
+        return {}
+    return index.get("records", {})
+
+
+def save_index(index_path, records, num_classes):
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "num_classes": num_classes, "records": records}, f)
+    os.replace(tmp_path, index_path)
+
+
+def build_index(dataset_path, num_classes, workers=None, index_path=None):
+    """Audit semua pasangan gambar/label; hanya file yang mtime/ukurannya berubah yang dibaca ulang"""
+    index_path = index_path or os.path.join(dataset_path, INDEX_FILENAME)
+    cached = load_index(index_path, num_classes)
+    pairs = list_pairs(dataset_path)
+    records, tasks = {}, []
+    for split, key, image_path, label_path in pairs:
+        record = cached.get(key)
+        if record is not None and record["image_signature"] == file_signature(image_path) \
+                and record["label_signature"] == file_signature(label_path):
+            records[key] = record
+        else:
+            tasks.append((key, image_path, label_path, num_classes))
+    if tasks:
+        chunksize = max(1, len(tasks) // (4 * (workers or os.cpu_count() or 1)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for key, record in pool.map(_audit_task, tasks, chunksize=chunksize):
+                records[key] = record
+    save_index(index_path, records, num_classes)
+    return records, {"audited": len(tasks), "cached": len(pairs) - len(tasks)}
+
+
+def class_balance(records, names):
+    """Jumlah instance dan gambar per part, per split"""
+    balance = {}
+    for split in SPLITS:
+        instances = np.zeros(len(names), dtype=np.int64)
+        images = np.zeros(len(names), dtype=np.int64)
+        for key, record in records.items():
+            if not key.startswith(f"{split}/") or not record["boxes"]:
+                continue
+            classes = np.array([box[0] for box in record["boxes"]], dtype=np.int64)
+            instances += np.bincount(classes, minlength=len(names))
+            images[np.unique(classes)] += 1
+        total = int(instances.sum())
+        balance[split] = {
+            name: {
+                "instances": int(instances[i]),
+                "images": int(images[i]),
+                "share": float(instances[i] / total) if total else 0.0
+            }
+            for i, name in enumerate(names)
+        }
+    return balance
+
+
+def box_size_distribution(records, names):
+    """Distribusi ukuran box per part: persentil sisi (akar area, piksel) dan bucket kecil/sedang/besar"""
+    sizes = {i: [] for i in range(len(names))}
+    for record in records.values():
+        for class_id, width, height in record["boxes"]:
+            sizes[class_id].append(width * height)
+    distribution = {}
+    for class_id, areas in sizes.items():
+        if not areas:
+            distribution[names[class_id]] = {"count": 0}
+            continue
+        areas = np.asarray(areas)
+        p5, p50, p95 = np.percentile(np.sqrt(areas), [5, 50, 95])
+        distribution[names[class_id]] = {
+            "count": int(areas.size),
+            "side_p5_px": float(p5),
+            "side_p50_px": float(p50),
+            "side_p95_px": float(p95),
+            "small": int((areas < SMALL_AREA).sum()),
+            "medium": int(((areas >= SMALL_AREA) & (areas < MEDIUM_AREA)).sum()),
+            "large": int((areas >= MEDIUM_AREA).sum())
+        }
+    return distribution
+
+
+def near_duplicates(records, max_distance=4, chunk_size=256):
+    """Pasangan gambar train/val dengan jarak Hamming dHash <= max_distance (kebocoran data)"""
+    def hashes(split):
+        keys = [key for key, record in records.items() if key.startswith(f"{split}/") and record["dhash"] is not None]
+        return keys, np.array([records[key]["dhash"] for key in keys], dtype=np.uint64)
+
+    train_keys, train_hashes = hashes("train")
+    val_keys, val_hashes = hashes("val")
+    pairs = []
+    if not len(train_hashes) or not len(val_hashes):
+        return pairs
+    train_bytes = train_hashes.view(np.uint8).reshape(-1, 8)
+    for start in range(0, len(val_hashes), chunk_size):
+        chunk = val_hashes[start:start + chunk_size]
+        xor = np.bitwise_xor(chunk[:, None].view(np.uint8).reshape(-1, 1, 8), train_bytes[None, :, :])
+        distance = np.unpackbits(xor, axis=2).sum(axis=2)
+        for val_index, train_index in zip(*np.nonzero(distance <= max_distance)):
+            pairs.append({
+                "val": val_keys[start + val_index],
+                "train": train_keys[train_index],
+                "distance": int(distance[val_index, train_index])
+            })
+    return pairs
+
+
+def audit_dataset(dataset_path, names, workers=None, duplicate_distance=4):
+    """Audit lengkap dataset YOLO: error per file, keseimbangan kelas, ukuran box dan duplikat train/val"""
+    records, cache_stats = build_index(dataset_path, len(names), workers)
+    problems = {key: record["errors"] for key, record in records.items() if record["errors"]}
+    warnings = {key: record["warnings"] for key, record in records.items() if record["warnings"]}
+    return {
+        "dataset": dataset_path,
+        "images": {split: sum(key.startswith(f"{split}/") for key in records) for split in SPLITS},
+        "index": cache_stats,
+        "errors": problems,
+        "warnings": warnings,
+        "class_balance": class_balance(records, names),
+        "box_sizes": box_size_distribution(records, names),
+        "near_duplicates": near_duplicates(records, duplicate_distance)
+    }
+
+
+def print_summary(report, rare_share=0.05):
+    """Ringkasan audit untuk console"""
+    print(f"Dataset: {report['dataset']}")
+    print("Gambar: " + ", ".join(f"{split} {count}" for split, count in report["images"].items()))
+    print(f"Index: {report['index']['audited']} file diaudit, {report['index']['cached']} dari cache")
+    print(f"File bermasalah: {len(report['errors'])}, peringatan: {len(report['warnings'])}")
+    for key, errors in list(report["errors"].items())[:20]:
+        print(f"- {key}: {'; '.join(errors)}")
+    for split, balance in report["class_balance"].items():
+        print(f"Keseimbangan kelas ({split}):")
+        for name, stats in sorted(balance.items(), key=lambda item: item[1]["instances"]):
+            marker = "  <- jarang" if stats["share"] < rare_share else ""
+            print(f"  {name}: {stats['instances']} instance di {stats['images']} gambar ({stats['share']:.1%}){marker}")
+    print(f"Gambar hampir sama antara train dan val: {len(report['near_duplicates'])}")
+    for pair in report["near_duplicates"][:10]:
+        print(f"- {pair['val']} ~ {pair['train']} (jarak {pair['distance']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audit dataset YOLO (train/val) dengan index cache")
+    parser.add_argument("dataset", help="Direktori dataset berisi train/ dan val/")
+    parser.add_argument("--data", help="data.yaml untuk nama kelas (default: <dataset>/data.yaml)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--duplicate-distance", type=int, default=4, help="Jarak Hamming dHash maksimum")
+    parser.add_argument("--output", help="Simpan laporan JSON ke file")
+    args = parser.parse_args()
+
+    audit = audit_dataset(args.dataset, load_names(args.data or os.path.join(args.dataset, "data.yaml")),
+                          args.workers, args.duplicate_distance)
+    print_summary(audit)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(audit, f, indent=2)
+    sys.exit(1 if audit["errors"] else 0)
@@ -0,0 +1,374 @@
+import cv2
+import numpy as np
+from inference_backends import load_backend_model
+from recipes import Recipe
+from tiling import clip_roi, merge_detections, tile_windows
+
+DEFAULT_REQUIRED_OBJECTS = {"Accessories Set", "Barcode", "Silica", "Strap", "Lower", "Mouthpiece", "Barrel", "Bell", "Upper"}
+
+DEFAULT_DETECTION_CONFIG = {
+    "confidence_threshold": 0.3,
+    "nms_threshold": 0.5,
+    "tracking_enabled": False,
+    # Mode tracking: detector tiap N frame, tracker optical flow di antaranya
+    "tracking_detect_interval": 5,
+    "tracking_iou_threshold": 0.3,
+    "tracking_max_misses": 2,
+    "tracking_confidence_decay": 0.95,
+    # Track yang tidak dikonfirmasi detector selama N frame memaksa deteksi ulang
+    "tracking_max_age": 10,
+    "alert_mode": False,
+    "min_detection_area": 100,
+    # Backend inferensi CPU: "torch", "onnxruntime", "openvino", "openvino_int8" atau "remote" (inference_server.py)
+    "inference_backend": "torch",
+    "inference_server_url": "http://127.0.0.1:8765",
+    "imgsz": 640,
+    # Resolusi adaptif: pass murah di imgsz kecil, ulang di imgsz penuh hanya jika hasilnya ambigu
+    "adaptive_resolution_enabled": False,
+    "adaptive_low_imgsz": 320,
+    "adaptive_uncertainty_band": 0.1,  # Confidence part wajib dalam +/- band dari threshold dianggap ragu
+    # Tiling: inferensi per tile (overlap) di dalam ROI inspeksi untuk part kecil (Silica, Barcode)
+    "tiling_enabled": False,
+    "tiling_roi": None,  # (x1, y1, x2, y2) piksel kamera; None = seluruh frame
+    "tiling_tile_size": 640,
+    "tiling_overlap": 0.2,
+    "tiling_include_full": True,  # Tambahkan ROI utuh (diperkecil) ke batch untuk part besar yang melewati tile
+    "tiling_merge_threshold": 0.5
+}
+
+# Backend dengan ukuran input tetap: butuh artefak export terpisah untuk setiap imgsz
+FIXED_SHAPE_BACKENDS = ("onnxruntime", "openvino", "openvino_int8")
+
+COLOR_MAP = {
+    "Accessories Set": (255, 0, 0),
+    "Barcode": (0, 255, 0),
+    "Silica": (0, 0, 255),
+    "Strap": (255, 165, 0),
+    "Lower": (128, 0, 128),
+    "Mouthpiece": (255, 255, 0),
+    "Barrel": (0, 255, 255),
+    "Bell": (255, 0, 255),
+    "Upper": (75, 0, 130)
+}
+
+
+class DetectionEngine:
+    """Engine inspeksi tanpa GUI: load model, filtering, cek kelengkapan dan overlay"""
+
+    def __init__(self, model_path, required_objects=None, detection_config=None, model=None, recipe=None):
+        self.model_path = model_path
+        self.recipe = recipe or Recipe.from_required(required_objects or DEFAULT_REQUIRED_OBJECTS)
+        self._compiled = None
+        # Dict konfigurasi dipakai bersama (bukan disalin) agar perubahan slider di GUI langsung berlaku
+        self.detection_config = detection_config if detection_config is not None else dict(DEFAULT_DETECTION_CONFIG)
+        self.model = model
+        self._names_source = None
+        self._class_names = None
+        self._models_by_imgsz = {}
+        self.logger = None
+        self.reset_adaptive_stats()
+
+    def load_model(self, logger=None):
+        """Load model YOLO dari model_path melalui backend inferensi terpilih"""
+        self.logger = logger
+        self._models_by_imgsz = {}
+        self.model = self._load_for_imgsz(self.detection_config.get("imgsz", 640))
+        if self.detection_config.get("tiling_enabled"):
+            self.check_tiling_support()
+        if self.detection_config.get("adaptive_resolution_enabled"):
+            # Siapkan model resolusi rendah sekarang agar tidak load di tengah deteksi live
+            self.model_for_imgsz(self.detection_config["adaptive_low_imgsz"])
+        return self.model
+
+    def _load_for_imgsz(self, imgsz):
+        return load_backend_model(
+            self.model_path,
+            backend=self.detection_config.get("inference_backend", "torch"),
+            imgsz=imgsz,
+            logger=self.logger,
+            server_url=self.detection_config.get("inference_server_url")
+        )
+
+    def model_for_imgsz(self, imgsz):
+        """Model untuk imgsz tertentu; backend PyTorch/remote menerima imgsz apa pun saat dipanggil"""
+        if imgsz == self.detection_config.get("imgsz", 640) or \
+                self.detection_config.get("inference_backend", "torch") not in FIXED_SHAPE_BACKENDS:
+            return self.model
+        model = self._models_by_imgsz.get(imgsz)
+        if model is None:
+            model = self._models_by_imgsz[imgsz] = self._load_for_imgsz(imgsz)
+        return model
+
+    @property
+    def names(self):
+        return self.model.names
+
+    @property
+    def class_names(self):
+        """Array nama kelas (index = class ID) untuk lookup vektor"""
+        names = self.model.names
+        if self._names_source is not names:
+            size = max(names) + 1 if names else 0
+            self._class_names = np.array([names.get(i, str(i)) for i in range(size)], dtype=object)
+            self._names_source = names
+        return self._class_names
+
+    @property
+    def required_objects(self):
+        return set(self.recipe.required)
+
+    def set_recipe(self, recipe):
+        """Ganti resep aktif (dikompilasi ulang pada frame berikutnya)"""
+        self.recipe = recipe
+        self._compiled = None
+
+    @property
+    def compiled_recipe(self):
+        """Resep aktif dalam bentuk class ID, dikompilasi sekali per resep dan nama kelas model"""
+        compiled = self._compiled
+        if compiled is None or compiled.recipe is not self.recipe or compiled.names is not self.model.names:
+            compiled = self._compiled = self.recipe.compile(self.model.names)
+        return compiled
+
+    def required_class_ids(self):
+        """Class ID part resep aktif (wajib, opsional, terlarang); None jika tidak ada yang dikenal model"""
+        return self.compiled_recipe.class_ids or None
+
+    def predict_kwargs(self):
+        """Argumen model: threshold dan subset kelas diterapkan langsung di NMS model"""
+        return {
+            "conf": self.detection_config["confidence_threshold"],
+            "iou": self.detection_config["nms_threshold"],
+            "classes": self.required_class_ids(),
+            "imgsz": self.detection_config.get("imgsz", 640),
+            "verbose": False
+        }
+
+    @staticmethod
+    def as_frame_list(frames):
+        """Normalisasi input: satu frame HWC, list frame, atau array NHWC"""
+        if isinstance(frames, np.ndarray):
+            if frames.ndim == 3:
+                return [frames], True
+            if frames.ndim == 4:
+                return list(frames), False
+            raise ValueError(f"Bentuk array frame tidak didukung: {frames.shape}")
+        return list(frames), False
+
+    def predict(self, frames):
+        """Deteksi dan cek kelengkapan untuk satu frame atau batch frame (satu panggilan model)"""
+        frame_list, single = self.as_frame_list(frames)
+        if not frame_list:
+            return []
+        if self.detection_config.get("tiling_enabled"):
+            inspections = self.predict_tiled(frame_list)
+        elif self.detection_config.get("adaptive_resolution_enabled"):
+            inspections = self.predict_adaptive(frame_list)
+        else:
+            inspections = self.postprocess(self.run_model(frame_list))
+        return inspections[0] if single else inspections
+
+    def run_model(self, frame_list):
+        """Satu panggilan model untuk seluruh batch frame"""
+        return self.model(frame_list, **self.predict_kwargs())
+
+    def reset_adaptive_stats(self):
+        self.adaptive_stats = {"frames": 0, "escalated": 0, "missing": 0, "uncertain": 0}
+
+    def escalation_reason(self, result, inspection):
+        """Alasan pass resolusi rendah perlu diulang: part wajib hilang atau confidence dekat threshold"""
+        if not inspection["complete"]:
+            return "missing"
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return None
+        boxes = boxes.cpu().numpy()
+        conf = np.asarray(boxes.conf, dtype=np.float32).reshape(-1)
+        required = self.compiled_recipe.required_flags[np.asarray(boxes.cls).astype(np.int32, copy=False).reshape(-1)]
+        band = self.detection_config["adaptive_uncertainty_band"]
+        uncertain = np.abs(conf - self.detection_config["confidence_threshold"]) < band
+        return "uncertain" if (required & uncertain).any() else None
+
+    def predict_adaptive(self, frame_list):
+        """Pass imgsz kecil untuk semua frame, lalu satu batch imgsz penuh untuk frame yang ambigu"""
+        low_imgsz = self.detection_config["adaptive_low_imgsz"]
+        low_kwargs = self.predict_kwargs()
+        low_kwargs["imgsz"] = low_imgsz
+        # Threshold diturunkan sebesar band agar deteksi tepat di bawah threshold ikut terlihat sebagai ragu
+        low_kwargs["conf"] = max(0.01, low_kwargs["conf"] - self.detection_config["adaptive_uncertainty_band"])
+        results = self.model_for_imgsz(low_imgsz)(frame_list, **low_kwargs)
+
+        inspections, escalate = [], []
+        for index, result in enumerate(results):
+            inspection = self.inspect(self.filter_result(result))
+            inspection["imgsz"] = low_imgsz
+            reason = self.escalation_reason(result, inspection)
+            if reason:
+                self.adaptive_stats[reason] += 1
+                escalate.append(index)
+            inspections.append(inspection)
+        self.adaptive_stats["frames"] += len(frame_list)
+        self.adaptive_stats["escalated"] += len(escalate)
+
+        if escalate:
+            full_inspections = self.postprocess(self.run_model([frame_list[index] for index in escalate]))
+            for index, inspection in zip(escalate, full_inspections):
+                inspection["imgsz"] = self.detection_config.get("imgsz", 640)
+                inspections[index] = inspection
+        return inspections
+
+    def check_tiling_support(self):
+        """Pastikan backend menerima batch tile berukuran campuran (tile + ROI penuh) sebelum dipakai live"""
+        tile_size = self.detection_config["tiling_tile_size"]
+        probe = [np.zeros((tile_size, tile_size, 3), dtype=np.uint8),
+                 np.zeros((tile_size // 2, tile_size, 3), dtype=np.uint8)]
+        kwargs = self.predict_kwargs()
+        kwargs["imgsz"] = tile_size
+        backend = self.detection_config.get("inference_backend", "torch")
+        try:
+            results = self.model_for_imgsz(tile_size)(probe, **kwargs)
+        except Exception as e:
+            raise RuntimeError(
+                f"Backend {backend} tidak mendukung batch tiling ({e}); export ulang model dengan batch dinamis"
+            ) from e
+        if len(results) != len(probe):
+            raise RuntimeError(f"Backend {backend} mengembalikan {len(results)} hasil untuk {len(probe)} tile")
+
+    def tile_plan(self, frame):
+        """Potongan tile (view tanpa salin) beserta offset piksel kamera untuk satu frame"""
+        config = self.detection_config
+        height, width = frame.shape[:2]
+        roi_x1, roi_y1, roi_x2, roi_y2 = clip_roi(config["tiling_roi"], width, height)
+        windows = tile_windows(roi_x2 - roi_x1, roi_y2 - roi_y1, config["tiling_tile_size"], config["tiling_overlap"])
+        plan = [
+            (frame[roi_y1 + y1:roi_y1 + y2, roi_x1 + x1:roi_x1 + x2], (roi_x1 + x1, roi_y1 + y1))
+            for x1, y1, x2, y2 in windows
+        ]
+        if config["tiling_include_full"] and len(windows) > 1:
+            plan.append((frame[roi_y1:roi_y2, roi_x1:roi_x2], (roi_x1, roi_y1)))
+        return plan
+
+    def predict_tiled(self, frame_list):
+        """Semua tile ROI dari semua frame dalam satu batch; deteksi dipetakan ke koordinat frame dan digabung"""
+        tiles, owners = [], []
+        for index, frame in enumerate(frame_list):
+            for tile, offset in self.tile_plan(frame):
+                tiles.append(tile)
+                owners.append((index, offset))
+        tile_size = self.detection_config["tiling_tile_size"]
+        kwargs = self.predict_kwargs()
+        kwargs["imgsz"] = tile_size
+        results = self.model_for_imgsz(tile_size)(tiles, **kwargs)
+
+        per_frame = [([], [], []) for _ in frame_list]
+        for (index, (offset_x, offset_y)), result in zip(owners, results):
+            boxes = result.boxes
+            if boxes is None or len(boxes) == 0:
+                continue
+            boxes = boxes.cpu().numpy()
+            xyxy = np.asarray(boxes.xyxy, dtype=np.float32).reshape(-1, 4) + (offset_x, offset_y, offset_x, offset_y)
+            per_frame[index][0].append(xyxy)
+            per_frame[index][1].append(np.asarray(boxes.conf, dtype=np.float32).reshape(-1))
+            per_frame[index][2].append(np.asarray(boxes.cls).reshape(-1))
+
+        inspections = []
+        for index, (xyxy, conf, cls) in enumerate(per_frame):
+            if xyxy:
+                merged = merge_detections(np.concatenate(xyxy), np.concatenate(conf), np.concatenate(cls),
+                                          self.detection_config["tiling_merge_threshold"])
+                inspection = self.inspect(self.filter_arrays(*merged))
+            else:
+                inspection = self.inspect([])
+            inspection["tiles"] = sum(1 for owner, _ in owners if owner == index)
+            inspections.append(inspection)
+        return inspections
+
+    def escalation_rate(self):
+        frames = self.adaptive_stats["frames"]
+        return self.adaptive_stats["escalated"] / frames if frames else 0.0
+
+    def postprocess(self, results):
+        """Filtering dan cek kelengkapan untuk setiap hasil model"""
+        return [self.inspect(self.filter_result(result)) for result in results]
+
+    def filter_result(self, result):
+        """Filtering objek satu hasil model dengan kriteria lanjutan (satu pass NumPy)"""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return []
+        boxes = boxes.cpu().numpy()
+        return self.filter_arrays(boxes.xyxy, boxes.conf, boxes.cls)
+
+    def filter_arrays(self, xyxy, conf, cls):
+        """Filter confidence dan area secara vektor atas array xyxy/conf/cls"""
+        xyxy = np.asarray(xyxy).astype(np.int32, copy=False).reshape(-1, 4)
+        conf = np.asarray(conf, dtype=np.float32).reshape(-1)
+        cls = np.asarray(cls).astype(np.int32, copy=False).reshape(-1)
+        area = (xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1])
+        keep = (conf > self.detection_config["confidence_threshold"]) & (area > self.detection_config["min_detection_area"])
+        if not keep.any():
+            return []
+        kept_cls = cls[keep]
+        names = self.class_names[kept_cls]
+        return [
+            {"name": name, "class_id": class_id, "confidence": score, "bbox": tuple(bbox), "area": box_area}
+            for name, class_id, score, bbox, box_area in zip(
+                names, kept_cls.tolist(), conf[keep].tolist(), xyxy[keep].tolist(), area[keep].tolist()
+            )
+        ]
+
+    def advanced_object_filtering(self, results):
+        """Filtering objek untuk semua hasil model (digabung menjadi satu list)"""
+        filtered_objects = []
+        for result in results:
+            filtered_objects.extend(self.filter_result(result))
+        return filtered_objects
+
+    def check_completeness(self, detected_names):
+        """Bandingkan nama objek terdeteksi (masing-masing dihitung satu) dengan resep aktif"""
+        compiled = self.compiled_recipe
+        class_ids = [compiled.name_to_id.get(name, -1) for name in set(detected_names)]
+        return compiled.check_counts(compiled.count(class_ids))
+
+    def inspect(self, filtered_objects):
+        """Bangun hasil inspeksi terstruktur dari objek yang sudah difilter"""
+        compiled = self.compiled_recipe
+        detected_objects = {obj["name"]: obj for obj in filtered_objects}
+        inspection = compiled.check_counts(compiled.count(compiled.class_ids_of(filtered_objects)))
+        inspection["objects"] = filtered_objects
+        inspection["detected"] = set(detected_objects)
+        inspection["detected_objects"] = detected_objects
+        return inspection
+
+    def merge_inspections(self, inspections):
+        """Gabungkan hasil beberapa sudut kamera: kelengkapan = union part dari semua view"""
+        objects = [obj for inspection in inspections for obj in inspection["objects"]]
+        # Jumlah per part = maksimum antar view (part yang terlihat dua kamera tidak dihitung dua kali)
+        merged = self.compiled_recipe.check_counts(np.maximum.reduce([inspection["counts"] for inspection in inspections]))
+        # Urut naik confidence agar deteksi dengan confidence tertinggi yang dipakai per part
+        merged["detected_objects"] = {obj["name"]: obj for obj in sorted(objects, key=lambda obj: obj["confidence"])}
+        merged["detected"] = set(merged["detected_objects"])
+        merged["objects"] = objects
+        return merged
+
+    @staticmethod
+    def draw_detections(frame, objects, copy=True, scale=(1.0, 1.0), rgb=False):
+        """Gambar bounding box dan label di frame (bbox dikali scale jika frame sudah di-resize)"""
+        display_frame = frame.copy() if copy else frame
+        scale_x, scale_y = scale
+        for obj in objects:
+            x1, y1, x2, y2 = obj["bbox"]
+            if scale_x != 1.0 or scale_y != 1.0:
+                x1, x2 = int(x1 * scale_x), int(x2 * scale_x)
+                y1, y2 = int(y1 * scale_y), int(y2 * scale_y)
+            name = obj["name"]
+            conf = obj["confidence"]
+            color = COLOR_MAP.get(name, (255, 255, 255))
+            if rgb:
+                color = color[::-1]
+            cv2.rectangle(display_frame, (x1, y1), (x2, y2), color, 2)
+            label = f"{name} {conf:.2f}"
+            if "track_id" in obj:
+                label = f"#{obj['track_id']} {label}"
+            cv2.putText(display_frame, label, (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+        return display_frame
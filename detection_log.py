@@ -0,0 +1,269 @@
+import argparse
+import glob
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+# Satu record per deteksi (lebar tetap 32 byte, little-endian, tanpa padding)
+RECORD_DTYPE = np.dtype([
+    ("seq", "<u8"),
+    ("timestamp", "<f8"),  # Epoch detik (waktu capture)
+    ("camera", "u1"),
+    ("source", "u1"),
+    ("class_id", "<i2"),  # -1 = frame tanpa deteksi (penanda agar frame kosong ikut terhitung)
+    ("confidence", "<f4"),
+    ("bbox", "<u2", (4,))  # x1, y1, x2, y2 dalam piksel frame kamera
+])
+# Asal hasil frame: detector, propagasi tracker, atau hasil lama dipakai ulang oleh motion gate
+SOURCE_DETECTOR, SOURCE_TRACKER, SOURCE_REUSED = 0, 1, 2
+NO_DETECTION = -1
+
+SEGMENT_MAGIC = b"CLDLOG01"
+HEADER_SIZE = 16
+SEGMENT_PATTERN = "detections_*.bin"
+NAMES_FILENAME = "names.json"
+
+
+class DetectionLogWriter:
+    """Writer buffer record biner; segmen dirotasi berdasarkan ukuran"""
+
+    def __init__(self, directory, segment_bytes=64 * 1024 * 1024, buffer_records=4096, flush_interval=2.0,
+                 logger=None):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.flush_interval = flush_interval
+        self.logger = logger
+        os.makedirs(directory, exist_ok=True)
+        self._buffer = np.zeros(buffer_records, dtype=RECORD_DTYPE)
+        self._count = 0
+        self._file = None
+        self._segment_size = 0
+        self._segment_index = 0
+        self._last_flush = time.perf_counter()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.records_written = 0
+
+    def set_names(self, names):
+        """Simpan mapping class ID -> nama di samping segmen agar reader tidak butuh model"""
+        path = os.path.join(self.directory, NAMES_FILENAME)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({str(class_id): name for class_id, name in dict(names).items()}, f, indent=2)
+
+    def append(self, seq, timestamp, camera, objects, source=SOURCE_DETECTOR):
+        """Tambahkan semua deteksi satu frame; frame tanpa deteksi ditulis sebagai satu record penanda"""
+        with self._lock:
+            if self._closed:
+                # Thread deteksi yang belum berhenti saat aplikasi keluar: record diabaikan
+                return
+            rows = max(1, len(objects))
+            if self._count + rows > len(self._buffer):
+                self._flush_locked()
+                if rows > len(self._buffer):
+                    self._buffer = np.zeros(rows, dtype=RECORD_DTYPE)
+            block = self._buffer[self._count:self._count + rows]
+            block["seq"] = seq
+            block["timestamp"] = timestamp
+            block["camera"] = camera
+            block["source"] = source
+            if objects:
+                block["class_id"] = [obj.get("class_id", NO_DETECTION) for obj in objects]
+                block["confidence"] = [obj["confidence"] for obj in objects]
+                block["bbox"] = np.clip([obj["bbox"] for obj in objects], 0, 65535)
+            else:
+                block["class_id"] = NO_DETECTION
+                block["confidence"] = 0.0
+                block["bbox"] = 0
+            self._count += rows
+            if time.perf_counter() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def _open_segment(self):
+        self._segment_index += 1
+        name = f"detections_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self._segment_index:04d}.bin"
+        self._file = open(os.path.join(self.directory, name), "wb")
+        self._file.write(SEGMENT_MAGIC.ljust(HEADER_SIZE, b"\0"))
+        self._segment_size = HEADER_SIZE
+
+    def _flush_locked(self):
+        self._last_flush = time.perf_counter()
+        if not self._count:
+            return
+        data = self._buffer[:self._count].tobytes()
+        if self._file is not None and self._segment_size + len(data) > self.segment_bytes:
+            self._file.close()
+            self._file = None
+        if self._file is None:
+            self._open_segment()
+        try:
+            self._file.write(data)
+            self._file.flush()
+        except OSError as e:
+            if self.logger:
+                self.logger.error(f"Gagal menulis log deteksi: {e}")
+        self._segment_size += len(data)
+        self.records_written += self._count
+        self._count = 0
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._flush_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def list_segments(directory):
+    return sorted(glob.glob(os.path.join(directory, SEGMENT_PATTERN)))
+
+
+def open_segment(path):
+    """Memory-map satu segmen sebagai array record; record terakhir yang terpotong (crash) diabaikan"""
+    with open(path, "rb") as f:
+        if f.read(len(SEGMENT_MAGIC)) != SEGMENT_MAGIC:
+            raise ValueError(f"Bukan segmen log deteksi: {path}")
+    count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+    if count <= 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def load_names(directory):
+    """Mapping class ID -> nama dari names.json (kosong jika belum ada)"""
+    try:
+        with open(os.path.join(directory, NAMES_FILENAME), encoding="utf-8") as f:
+            return {int(class_id): name for class_id, name in json.load(f).items()}
+    except FileNotFoundError:
+        return {}
+
+
+def read_log(directory, start=None, end=None):
+    """Gabungan record semua segmen (opsional dibatasi rentang epoch [start, end))"""
+    parts = []
+    for path in list_segments(directory):
+        records = open_segment(path)
+        if start is not None or end is not None:
+            # Timestamp (hampir) naik dalam satu segmen: potong dengan searchsorted tanpa scan penuh
+            timestamps = records["timestamp"]
+            lo = np.searchsorted(timestamps, start, side="left") if start is not None else 0
+            hi = np.searchsorted(timestamps, end, side="left") if end is not None else len(records)
+            records = records[lo:hi]
+        if len(records):
+            parts.append(records)
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=RECORD_DTYPE)
+
+
+def frame_keys(records):
+    """Kunci unik per frame (waktu capture dalam mikrodetik x kamera); seq berulang dari 1 setiap aplikasi start"""
+    return np.round(records["timestamp"] * 1e6).astype(np.int64) * 256 + records["camera"].astype(np.int64)
+
+
+def part_detection_rates(records, names):
+    """Fraksi frame yang memuat setiap part dan confidence rata-ratanya"""
+    total_frames = len(np.unique(frame_keys(records)))
+    rates = {}
+    for class_id, name in names.items():
+        mask = records["class_id"] == class_id
+        frames = len(np.unique(frame_keys(records[mask])))
+        rates[name] = {
+            "frames": frames,
+            "rate": frames / total_frames if total_frames else 0.0,
+            "mean_confidence": float(records["confidence"][mask].mean()) if frames else 0.0
+        }
+    return {"total_frames": total_frames, "parts": rates}
+
+
+def confidence_drift(records, names, bucket_seconds=600.0):
+    """Confidence rata-rata per part per interval waktu, serta selisih interval terakhir vs pertama"""
+    detections = records[records["class_id"] >= 0]
+    if not len(detections):
+        return {}
+    origin = detections["timestamp"].min()
+    buckets = ((detections["timestamp"] - origin) // bucket_seconds).astype(np.int64)
+    drift = {}
+    for class_id, name in names.items():
+        mask = detections["class_id"] == class_id
+        if not mask.any():
+            continue
+        part_buckets = buckets[mask]
+        counts = np.bincount(part_buckets)
+        sums = np.bincount(part_buckets, weights=detections["confidence"][mask])
+        filled = np.flatnonzero(counts)
+        means = sums[filled] / counts[filled]
+        drift[name] = {
+            "buckets": [
+                {"start": float(origin + index * bucket_seconds), "mean_confidence": float(mean), "count": int(count)}
+                for index, mean, count in zip(filled, means, counts[filled])
+            ],
+            "delta": float(means[-1] - means[0])
+        }
+    return drift
+
+
+def flicker(records, names):
+    """Per part: jumlah pergantian hadir/hilang antar frame berurutan per kamera (dibagi jumlah transisi frame)"""
+    size = max(names) + 1 if names else 0
+    transitions = np.zeros(size, dtype=np.int64)
+    steps = 0
+    for camera in np.unique(records["camera"]):
+        camera_records = records[records["camera"] == camera]
+        # Urut waktu capture agar segmen dari beberapa sesi tetap berurutan
+        frames, frame_index = np.unique(frame_keys(camera_records), return_inverse=True)
+        presence = np.zeros((len(frames), size), dtype=bool)
+        valid = (camera_records["class_id"] >= 0) & (camera_records["class_id"] < size)
+        presence[frame_index[valid], camera_records["class_id"][valid]] = True
+        if len(frames) > 1:
+            transitions += np.count_nonzero(presence[1:] != presence[:-1], axis=0)
+            steps += len(frames) - 1
+    return {
+        name: {"transitions": int(transitions[class_id]), "rate": float(transitions[class_id] / steps) if steps else 0.0}
+        for class_id, name in names.items()
+    }
+
+
+def summarize(directory, start=None, end=None, bucket_seconds=600.0):
+    records = read_log(directory, start, end)
+    names = load_names(directory) or {
+        int(class_id): str(class_id) for class_id in np.unique(records["class_id"]) if class_id >= 0
+    }
+    return {
+        "records": len(records),
+        "rates": part_detection_rates(records, names),
+        "drift": confidence_drift(records, names, bucket_seconds),
+        "flicker": flicker(records, names)
+    }
+
+
+def parse_time(value):
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ringkasan log deteksi biner per frame (rate, drift, flicker per part)")
+    parser.add_argument("directory", help="Direktori segmen detections_*.bin")
+    parser.add_argument("--start", help="Awal rentang, ISO (misal 2025-07-01T07:00)")
+    parser.add_argument("--end", help="Akhir rentang, ISO")
+    parser.add_argument("--bucket-minutes", type=float, default=10.0, help="Lebar interval confidence drift")
+    parser.add_argument("--output", help="Tulis ringkasan lengkap ke file JSON")
+    args = parser.parse_args()
+
+    summary = summarize(args.directory, parse_time(args.start), parse_time(args.end), args.bucket_minutes * 60)
+    print(f"{summary['records']} record, {summary['rates']['total_frames']} frame")
+    print(f"{'Part':<18}{'Rate':>8}{'Conf':>8}{'Drift':>8}{'Flicker':>9}")
+    for name, rate in summary["rates"]["parts"].items():
+        drift = summary["drift"].get(name, {}).get("delta", 0.0)
+        print(f"{name:<18}{rate['rate']:>8.3f}{rate['mean_confidence']:>8.3f}{drift:>+8.3f}"
+              f"{summary['flicker'][name]['rate']:>9.4f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"Ringkasan ditulis ke {args.output}")
@@ -0,0 +1,100 @@
+import threading
+import time
+
+import cv2
+from PIL import Image, ImageTk
+
+from detection_engine import DetectionEngine
+
+MIN_DISPLAY_SIZE = (640, 360)
+ASPECT_RATIO = 16 / 9  # Rasio 16:9
+
+
+def compute_display_size(window_width):
+    """Ukuran tampilan kamera (sesuai lebar window, minimal 640x360)"""
+    # Ukuran maksimum berdasarkan layar: 1/3 lebar layar untuk kolom kamera
+    max_width = int(window_width * 0.33)
+    max_height = int(max_width / ASPECT_RATIO)
+    display_width = max(MIN_DISPLAY_SIZE[0], min(max_width, 640))
+    display_height = max(MIN_DISPLAY_SIZE[1], min(max_height, 360))
+    return display_width, display_height
+
+
+def prepare_display_frame(frame, display_size):
+    """Resize cepat di OpenCV (hanya jika ukuran berbeda) lalu konversi BGR ke RGB"""
+    if (frame.shape[1], frame.shape[0]) != display_size:
+        frame = cv2.resize(frame, display_size, interpolation=cv2.INTER_LINEAR)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+class FrameDisplay:
+    """Tampilan video: resize di worker, satu PhotoImage dipakai ulang, hanya frame terbaru yang menunggu"""
+
+    def __init__(self, root, label, refresh_interval_ms=16, metrics=None, grid_columns=1):
+        self.root = root
+        self.label = label
+        self.refresh_interval_ms = refresh_interval_ms
+        self.metrics = metrics
+        # Tampilan multi-kamera: setiap tile mendapat 1/grid_columns dari ukuran tampilan
+        self.grid_columns = grid_columns
+        self.display_size = self._tile_size(MIN_DISPLAY_SIZE)
+        self._lock = threading.Lock()
+        self._pending = None
+        self._photo = None
+        self._photo_size = None
+        self._running = False
+        self.coalesced_frames = 0
+        self.root.bind("<Configure>", self._on_configure, add="+")
+
+    def _on_configure(self, event):
+        # Ukuran target dihitung sekali di thread Tk saat window berubah, bukan per frame
+        if event.widget is self.root:
+            self.display_size = self._tile_size(compute_display_size(event.width))
+
+    def _tile_size(self, size):
+        return size[0] // self.grid_columns, size[1] // self.grid_columns
+
+    def submit(self, frame, objects=None):
+        """Dipanggil dari thread deteksi: siapkan frame, ganti frame yang belum sempat ditampilkan"""
+        rgb = prepare_display_frame(frame, self.display_size)
+        if objects:
+            # Overlay digambar di frame tampilan milik display, sehingga buffer kamera tetap bersih tanpa disalin
+            scale = (rgb.shape[1] / frame.shape[1], rgb.shape[0] / frame.shape[0])
+            DetectionEngine.draw_detections(rgb, objects, copy=False, scale=scale, rgb=True)
+        with self._lock:
+            if self._pending is not None:
+                self.coalesced_frames += 1
+                if self.metrics:
+                    self.metrics.inc("display_frames_coalesced")
+            self._pending = rgb
+
+    def start(self):
+        self._running = True
+        self.root.after(self.refresh_interval_ms, self._tick)
+
+    def stop(self):
+        self._running = False
+
+    def _tick(self):
+        """Loop berirama refresh layar di thread Tk: blit frame terbaru jika ada"""
+        if not self._running:
+            return
+        with self._lock:
+            rgb, self._pending = self._pending, None
+        if rgb is not None:
+            start = time.perf_counter()
+            self._blit(rgb)
+            if self.metrics:
+                self.metrics.observe("display_blit", time.perf_counter() - start)
+        self.root.after(self.refresh_interval_ms, self._tick)
+
+    def _blit(self, rgb):
+        image = Image.fromarray(rgb)
+        if self._photo is None or self._photo_size != image.size:
+            self._photo = ImageTk.PhotoImage(image=image)
+            self._photo_size = image.size
+            self.label.configure(image=self._photo)
+            self.label.image = self._photo
+        else:
+            # Tulis langsung ke buffer gambar Tk yang sama, tanpa alokasi PhotoImage baru
+            self._photo.paste(image)
@@ -0,0 +1,250 @@
+import collections
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+
+def write_clip(path, jpeg_frames, fps):
+    """Dijalankan di proses terpisah: decode frame JPEG lalu tulis ke video mp4"""
+    writer = None
+    written = 0
+    try:
+        for data in jpeg_frames:
+            frame = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                continue
+            if writer is None:
+                height, width = frame.shape[:2]
+                writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+                if not writer.isOpened():
+                    raise IOError(f"Gagal membuka VideoWriter {path}")
+            writer.write(frame)
+            written += 1
+    finally:
+        if writer is not None:
+            writer.release()
+    return path, written
+
+
+class PartLossMonitor:
+    """Part wajib yang hilang setelah sempat terlihat, dengan debounce jumlah inspeksi dan durasi"""
+
+    def __init__(self, min_missing_inspections=5, min_missing_seconds=1.0):
+        self.min_missing_inspections = min_missing_inspections
+        self.min_missing_seconds = min_missing_seconds
+        self.present_parts = set()
+        # part -> (jumlah inspeksi berturut-turut hilang, waktu pertama hilang)
+        self._missing = {}
+        self.armed = True
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, detection_config):
+        return cls(
+            min_missing_inspections=detection_config.get("event_part_loss_inspections", 5),
+            min_missing_seconds=detection_config.get("event_part_loss_seconds", 1.0)
+        )
+
+    def reset(self, disarm=False):
+        """Lupakan part yang terlihat; disarm=True (setelah submit sukses) menunggu tray kosong dulu"""
+        with self._lock:
+            self.present_parts = set()
+            self._missing = {}
+            self.armed = not disarm
+
+    def update(self, present, now=None):
+        """Catat part wajib yang terlihat di inspeksi ini; kembalikan part yang dinyatakan hilang"""
+        now = time.perf_counter() if now is None else now
+        present = set(present)
+        with self._lock:
+            if not self.armed:
+                # Set yang sudah disubmit sedang diangkat dari tray: bukan event NG
+                if not present:
+                    self.armed = True
+                return set()
+            for part in present:
+                self._missing.pop(part, None)
+            self.present_parts |= present
+            lost = set()
+            for part in self.present_parts - present:
+                count, since = self._missing.get(part, (0, now))
+                count += 1
+                if count >= self.min_missing_inspections and now - since >= self.min_missing_seconds:
+                    lost.add(part)
+                else:
+                    self._missing[part] = (count, since)
+            for part in lost:
+                self.present_parts.discard(part)
+                self._missing.pop(part, None)
+            return lost
+
+
+class RecordedEvent:
+    """Event NG yang sedang direkam: frame pra-event dari ring ditambah frame sampai deadline"""
+    __slots__ = ("started_at", "reasons", "frames", "deadline", "max_deadline")
+
+    def __init__(self, reason, frames, deadline, max_deadline):
+        self.started_at = datetime.now()
+        self.reasons = [reason]
+        self.frames = frames
+        self.deadline = deadline
+        self.max_deadline = max_deadline
+
+
+class EventRecorder:
+    """Ring buffer pra-event (JPEG) satu kamera; klip NG ditulis ke video oleh proses latar"""
+
+    def __init__(self, name, output_dir, pre_seconds=5.0, post_seconds=3.0, record_fps=10, jpeg_quality=70,
+                 max_event_seconds=20.0, executor=None, logger=None):
+        self.name = name
+        self.output_dir = output_dir
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.record_fps = record_fps
+        self.jpeg_quality = jpeg_quality
+        self.max_event_seconds = max_event_seconds
+        self.logger = logger
+        # Executor bisa dibagi antar kamera; tanpa executor dibuat satu proses penulis sendiri
+        self._executor = executor
+        self._owns_executor = executor is None
+        # Ring dibatasi jumlah frame pada record_fps; isinya bytes JPEG, bukan array mentah
+        self._ring = collections.deque(maxlen=max(1, int(round(pre_seconds * record_fps))))
+        self._inbox = queue.Queue(maxsize=2)
+        self._lock = threading.Lock()
+        self._event = None
+        self._closed = False
+        self._last_add_ts = None
+        self.dropped_frames = 0
+        self.clips_written = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, detection_config, name, output_dir, executor=None, logger=None):
+        return cls(
+            name, output_dir,
+            pre_seconds=detection_config.get("event_pre_seconds", 5.0),
+            post_seconds=detection_config.get("event_post_seconds", 3.0),
+            record_fps=detection_config.get("event_record_fps", 10),
+            jpeg_quality=detection_config.get("event_jpeg_quality", 70),
+            max_event_seconds=detection_config.get("event_max_seconds", 20.0),
+            executor=executor, logger=logger
+        )
+
+    def due(self, capture_ts):
+        """True jika frame ini perlu direkam (frame kamera di-subsample ke record_fps)"""
+        return self._last_add_ts is None or capture_ts - self._last_add_ts >= 1.0 / self.record_fps
+
+    def add(self, frame_ref, capture_ts):
+        """Dipanggil thread capture dengan FrameRef yang sudah di-retain; tidak pernah blocking"""
+        if frame_ref is None:
+            return False
+        if self._closed:
+            # Perekam sudah ditutup: buffer langsung dikembalikan ke pool
+            frame_ref.release()
+            return False
+        self._last_add_ts = capture_ts
+        try:
+            self._inbox.put_nowait((frame_ref, capture_ts))
+            return True
+        except queue.Full:
+            # Encoder tertinggal: frame dilewati, capture tidak boleh menunggu
+            frame_ref.release()
+            self.dropped_frames += 1
+            return False
+
+    def trigger(self, reason, now=None):
+        """Mulai klip dari isi ring; trigger saat klip masih direkam hanya memperpanjang klip tersebut"""
+        now = time.perf_counter() if now is None else now
+        with self._lock:
+            if self._event is not None:
+                self._event.reasons.append(reason)
+                self._event.deadline = min(now + self.post_seconds, self._event.max_deadline)
+                return False
+            frames = [data for capture_ts, data in self._ring if capture_ts >= now - self.pre_seconds]
+            self._event = RecordedEvent(reason, frames, now + self.post_seconds, now + self.max_event_seconds)
+            return True
+
+    def recording(self):
+        return self._event is not None
+
+    def _run(self):
+        while True:
+            item = self._inbox.get()
+            if item is None:
+                break
+            frame_ref, capture_ts = item
+            try:
+                ok, encoded = cv2.imencode(".jpg", frame_ref.array, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            except Exception as e:
+                ok = False
+                if self.logger:
+                    self.logger.error(f"Gagal encode frame rekaman {self.name}: {e}")
+            finally:
+                frame_ref.release()
+            if not ok:
+                continue
+            data = encoded.tobytes()
+            finished = None
+            with self._lock:
+                self._ring.append((capture_ts, data))
+                if self._event is not None:
+                    self._event.frames.append(data)
+                    if capture_ts >= self._event.deadline:
+                        finished, self._event = self._event, None
+            if finished is not None:
+                self._write(finished)
+
+    def _write(self, event):
+        """Serahkan klip ke proses penulis; thread ini langsung kembali ke encoding frame berikutnya"""
+        if not event.frames:
+            return
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", self.name).strip("_").lower()
+        path = os.path.join(self.output_dir, f"ng_{event.started_at.strftime('%Y%m%d_%H%M%S')}_{slug}.mp4")
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=1)
+        future = self._executor.submit(write_clip, path, event.frames, self.record_fps)
+        reasons = "; ".join(event.reasons)
+        future.add_done_callback(lambda done: self._on_written(done, reasons))
+
+    def _on_written(self, future, reasons):
+        try:
+            path, written = future.result()
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Gagal menulis klip event {self.name}: {e}")
+            return
+        self.clips_written += 1
+        if self.logger:
+            self.logger.info(f"Klip event {self.name} disimpan: {path} ({written} frame; {reasons})")
+
+    def close(self, timeout=10.0):
+        """Hentikan encoder, tulis klip yang masih terbuka dan tunggu proses penulis selesai"""
+        self._closed = True
+        try:
+            self._inbox.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            # Frame yang masuk bersamaan dengan close tidak di-encode lagi; ref-nya tetap dikembalikan
+            while True:
+                try:
+                    item = self._inbox.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    item[0].release()
+        with self._lock:
+            finished, self._event = self._event, None
+        if finished is not None:
+            self._write(finished)
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=True)
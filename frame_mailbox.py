@@ -0,0 +1,115 @@
+import collections
+import queue
+import threading
+import time
+
+
+class FramePacket:
+    """Frame kamera beserta nomor urut dan waktu capture"""
+    __slots__ = ("seq", "frame", "capture_ts", "ref")
+
+    def __init__(self, seq, frame, capture_ts, ref=None):
+        self.seq = seq
+        self.frame = frame
+        self.capture_ts = capture_ts
+        # FrameRef dari FramePool: penerima packet wajib release setelah selesai memakai frame
+        self.ref = ref
+
+    def release(self):
+        if self.ref is not None:
+            self.ref.release()
+            self.ref = None
+
+
+class LatestFrameMailbox:
+    """Mailbox frame terbatas: frame lama yang belum diambil digantikan frame terbaru"""
+
+    def __init__(self, capacity=1):
+        self._slots = collections.deque(maxlen=capacity)
+        self._cond = threading.Condition()
+        self._seq = 0
+        self.dropped_frames = 0
+        self.delivered_frames = 0
+
+    @property
+    def latest_seq(self):
+        """Nomor urut frame terakhir yang masuk mailbox"""
+        return self._seq
+
+    def put(self, frame, capture_ts=None, ref=None):
+        """Masukkan frame baru (kepemilikan ref pindah ke mailbox); frame tertua dibuang jika mailbox penuh"""
+        if capture_ts is None:
+            capture_ts = time.perf_counter()
+        dropped = None
+        with self._cond:
+            self._seq += 1
+            packet = FramePacket(self._seq, frame, capture_ts, ref)
+            if len(self._slots) == self._slots.maxlen:
+                self.dropped_frames += 1
+                dropped = self._slots[0]
+            self._slots.append(packet)
+            self._cond.notify()
+        if dropped is not None:
+            # Frame yang digantikan tidak akan dipakai siapa pun: kembalikan buffernya ke pool
+            dropped.release()
+        return packet
+
+    def get(self, timeout=None):
+        """Ambil frame berikutnya, raise queue.Empty jika timeout"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._slots, timeout=timeout):
+                raise queue.Empty
+            self.delivered_frames += 1
+            return self._slots.popleft()
+
+    def qsize(self):
+        with self._cond:
+            return len(self._slots)
+
+
+class LatencyMonitor:
+    """Ukur latensi glass-to-status (capture kamera sampai status tampil di UI)"""
+
+    def __init__(self, window=300):
+        self.latencies = collections.deque(maxlen=window)
+        self.inference_times = collections.deque(maxlen=window)
+        self.frames_behind = collections.deque(maxlen=window)
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def record(self, packet, inference_time, latest_seq, now=None):
+        """Catat satu hasil deteksi yang sudah ditampilkan"""
+        if now is None:
+            now = time.perf_counter()
+        with self._lock:
+            self.latencies.append(now - packet.capture_ts)
+            self.inference_times.append(inference_time)
+            self.frames_behind.append(max(0, latest_seq - packet.seq))
+            self.samples += 1
+
+    @staticmethod
+    def _percentile(values, pct):
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self):
+        """Ringkasan latensi (ms) dan jarak status terhadap frame terbaru"""
+        with self._lock:
+            latencies = list(self.latencies)
+            inference_times = list(self.inference_times)
+            frames_behind = list(self.frames_behind)
+        if not latencies:
+            return {}
+        # Rasio latensi terhadap durasi inferensi: <= ~2 berarti status
+        # tidak pernah tertinggal lebih dari satu inferensi
+        ratios = [lat / inf for lat, inf in zip(latencies, inference_times) if inf > 0]
+        return {
+            "samples": len(latencies),
+            "latency_p50_ms": self._percentile(latencies, 50) * 1000,
+            "latency_p95_ms": self._percentile(latencies, 95) * 1000,
+            "latency_max_ms": max(latencies) * 1000,
+            "inference_p50_ms": self._percentile(inference_times, 50) * 1000,
+            "max_frames_behind": max(frames_behind),
+            "latency_per_inference_p95": self._percentile(ratios, 95) if ratios else 0.0,
+        }
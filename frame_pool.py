@@ -0,0 +1,67 @@
+import collections
+import threading
+
+import numpy as np
+
+
+class FrameRef:
+    """Referensi ber-refcount ke satu buffer frame; buffer kembali ke pool saat semua pemakai release"""
+    __slots__ = ("pool", "index", "array")
+
+    def __init__(self, pool, index, array):
+        self.pool = pool
+        self.index = index
+        self.array = array
+
+    def retain(self):
+        """Tambah satu pemilik (misal writer submit) sebelum diserahkan ke thread lain"""
+        if self.pool is not None:
+            self.pool.retain(self.index)
+        return self
+
+    def release(self):
+        if self.pool is not None:
+            self.pool.release(self.index)
+
+
+class FramePool:
+    """Ring buffer frame yang dialokasikan sekali; diisi langsung oleh cap.read(buffer) tanpa alokasi baru"""
+
+    def __init__(self, count, shape, dtype=np.uint8):
+        self.shape = tuple(shape)
+        self.buffers = np.empty((count, *self.shape), dtype=dtype)
+        self._refcounts = [0] * count
+        self._free = collections.deque(range(count))
+        self._lock = threading.Lock()
+        self.exhausted = 0
+
+    def __len__(self):
+        return len(self._refcounts)
+
+    def acquire(self):
+        """Ambil buffer bebas dengan refcount 1; jika semua sedang dipakai, alokasi frame di luar pool"""
+        with self._lock:
+            if self._free:
+                index = self._free.popleft()
+                self._refcounts[index] = 1
+                return FrameRef(self, index, self.buffers[index])
+            self.exhausted += 1
+        return FrameRef(None, -1, np.empty(self.shape, dtype=self.buffers.dtype))
+
+    def retain(self, index):
+        with self._lock:
+            if self._refcounts[index] <= 0:
+                raise RuntimeError(f"Buffer {index} sudah dikembalikan ke pool")
+            self._refcounts[index] += 1
+
+    def release(self, index):
+        with self._lock:
+            if self._refcounts[index] <= 0:
+                raise RuntimeError(f"Buffer {index} di-release lebih dari sekali")
+            self._refcounts[index] -= 1
+            if self._refcounts[index] == 0:
+                self._free.append(index)
+
+    def in_use(self):
+        with self._lock:
+            return len(self._refcounts) - len(self._free)
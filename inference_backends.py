@@ -0,0 +1,283 @@
+import argparse
+import glob
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import urllib.parse
+import urllib.request
+
+import cv2
+import numpy as np
+
+from geometry import box_iou
+
+FLOAT_BACKENDS = ("torch", "onnxruntime", "openvino")
+# INT8 hasil post-training quantization (kalibrasi dengan foto tangkapan sendiri, lihat quantize_int8.py)
+QUANTIZED_BACKENDS = ("openvino_int8",)
+LOCAL_BACKENDS = FLOAT_BACKENDS + QUANTIZED_BACKENDS
+# "remote": inferensi dijalankan inference_server.py (lokal atau di PC CPU bersama)
+SUPPORTED_BACKENDS = LOCAL_BACKENDS + ("remote",)
+
+# Format export Ultralytics untuk tiap backend
+EXPORT_FORMATS = {
+    "onnxruntime": "onnx",
+    "openvino": "openvino",
+    "openvino_int8": "openvino"
+}
+CALIBRATION_DIR_NAME = "clarinet_captured_photos"
+# Artefak export memakai batch dinamis: batch multi-kamera, tiling dan inference server mengirim > 1 gambar
+EXPORT_DYNAMIC = True
+
+
+def yolo_class():
+    """Import ultralytics saat model benar-benar dimuat (import torch memakan beberapa detik)"""
+    from ultralytics import YOLO
+    return YOLO
+
+
+def weights_hash(weights_path, chunk_size=1 << 20):
+    """Hash SHA-256 (16 karakter) dari file bobot .pt"""
+    digest = hashlib.sha256()
+    with open(weights_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def cached_artifact_path(weights_path, backend, imgsz):
+    """Lokasi artefak hasil export di samping file .pt, dikunci hash bobot, ukuran gambar dan mode batch"""
+    if backend not in EXPORT_FORMATS:
+        raise ValueError(f"Backend tidak didukung untuk export: {backend}")
+    stem = os.path.splitext(weights_path)[0]
+    # Akhiran _dyn membedakan artefak batch dinamis dari artefak batch-1 lama di cache
+    key = f"{stem}_{weights_hash(weights_path)}_{imgsz}{'_dyn' if EXPORT_DYNAMIC else ''}"
+    if backend == "openvino_int8":
+        return f"{key}_int8_openvino_model"
+    if backend == "openvino":
+        # AutoBackend Ultralytics mengenali model OpenVINO dari akhiran nama direktori
+        return f"{key}_openvino_model"
+    return f"{key}.onnx"
+
+
+def default_calibration_dir(weights_path):
+    """Foto tangkapan di samping file bobot (layout base_path aplikasi)"""
+    return os.path.join(os.path.dirname(os.path.abspath(weights_path)), CALIBRATION_DIR_NAME)
+
+
+def write_calibration_yaml(image_dir, names, path):
+    """Dataset kalibrasi tanpa label: split train dan val sama-sama menunjuk ke direktori foto"""
+    image_dir = os.path.abspath(image_dir)
+    if not os.path.isdir(image_dir):
+        raise FileNotFoundError(f"Direktori gambar kalibrasi tidak ditemukan: {image_dir}")
+    # JSON adalah YAML yang valid, jadi tidak perlu dependensi tambahan
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"path": image_dir, "train": ".", "val": ".", "names": {int(k): v for k, v in names.items()}}, f)
+    return path
+
+
+def export_backend(weights_path, backend, imgsz, logger=None, calibration_dir=None):
+    """Export bobot .pt ke format backend lalu simpan ke lokasi cache"""
+    target = cached_artifact_path(weights_path, backend, imgsz)
+    if logger:
+        logger.info(f"Export model ke {backend} (imgsz={imgsz}): {target}")
+    model = yolo_class()(weights_path)
+    if backend in QUANTIZED_BACKENDS:
+        calibration_dir = calibration_dir or default_calibration_dir(weights_path)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data = write_calibration_yaml(calibration_dir, model.names, os.path.join(tmp_dir, "calibration.yaml"))
+            if logger:
+                logger.info(f"Kalibrasi INT8 dengan gambar dari {calibration_dir}")
+            exported = model.export(format=EXPORT_FORMATS[backend], imgsz=imgsz, dynamic=EXPORT_DYNAMIC,
+                                    int8=True, data=data)
+    else:
+        exported = model.export(format=EXPORT_FORMATS[backend], imgsz=imgsz, dynamic=EXPORT_DYNAMIC)
+    tmp_target = f"{target}.tmp"
+    remove_artifact(tmp_target)
+    shutil.move(str(exported), tmp_target)
+    # Export ulang (--force): os.replace tidak bisa menimpa direktori OpenVINO yang tidak kosong
+    remove_artifact(target)
+    os.replace(tmp_target, target)
+    return target
+
+
+def remove_artifact(path):
+    """Hapus artefak export lama (direktori OpenVINO atau file ONNX) jika ada"""
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def load_backend_model(weights_path, backend="torch", imgsz=640, logger=None, server_url=None):
+    """Load model untuk backend terpilih; artefak export dipakai ulang dari cache"""
+    if backend not in SUPPORTED_BACKENDS:
+        raise ValueError(f"Backend tidak dikenal: {backend} (pilihan: {', '.join(SUPPORTED_BACKENDS)})")
+    if backend == "remote":
+        if logger:
+            logger.info(f"Memakai inference server: {server_url}")
+        return RemoteModel(server_url)
+    if backend == "torch":
+        return yolo_class()(weights_path)
+    target = cached_artifact_path(weights_path, backend, imgsz)
+    if os.path.exists(target):
+        if logger:
+            logger.info(f"Memakai artefak {backend} dari cache: {target}")
+    else:
+        target = export_backend(weights_path, backend, imgsz, logger)
+    return yolo_class()(target, task="detect")
+
+
+class RemoteBoxes:
+    """Box hasil server dengan atribut xyxy/conf/cls seperti Boxes Ultralytics"""
+
+    def __init__(self, rows):
+        rows = np.asarray(rows, dtype=np.float32).reshape(-1, 6)
+        self.xyxy = rows[:, :4]
+        self.conf = rows[:, 4]
+        self.cls = rows[:, 5]
+
+    def __len__(self):
+        return len(self.conf)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self
+
+
+class RemoteResult:
+    __slots__ = ("boxes",)
+
+    def __init__(self, rows):
+        self.boxes = RemoteBoxes(rows)
+
+
+class RemoteModel:
+    """Klien inference server; dipanggil seperti model YOLO oleh DetectionEngine"""
+
+    def __init__(self, server_url, encoding="jpeg", jpeg_quality=90, timeout=10.0):
+        self.server_url = server_url.rstrip("/")
+        self.encoding = encoding
+        self.jpeg_quality = jpeg_quality
+        self.timeout = timeout
+        with urllib.request.urlopen(f"{self.server_url}/info", timeout=timeout) as response:
+            info = json.load(response)
+        self.names = {int(class_id): name for class_id, name in info["names"].items()}
+
+    def _encode(self, frames):
+        if self.encoding == "jpeg" and len(frames) == 1:
+            ok, encoded = cv2.imencode(".jpg", frames[0], [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ok:
+                raise IOError("Gagal encode frame ke JPEG")
+            return encoded.tobytes(), "image/jpeg"
+        buffer = io.BytesIO()
+        np.save(buffer, np.stack(frames), allow_pickle=False)
+        return buffer.getvalue(), "application/x-npy"
+
+    def _predict(self, frames, params):
+        body, content_type = self._encode(frames)
+        request = urllib.request.Request(
+            f"{self.server_url}/predict?{urllib.parse.urlencode(params)}",
+            data=body, headers={"Content-Type": content_type}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            payload = json.load(response)
+        return [RemoteResult(result["boxes"]) for result in payload["results"]]
+
+    def __call__(self, frames, conf=0.25, iou=0.7, classes=None, imgsz=640, verbose=False):
+        frames = [frames] if isinstance(frames, np.ndarray) and frames.ndim == 3 else list(frames)
+        params = {"conf": conf, "iou": iou, "imgsz": imgsz}
+        if classes is not None:
+            params["classes"] = ",".join(str(c) for c in classes)
+        # Array .npy harus satu bentuk: frame beda ukuran (tile + ROI penuh) dikirim per kelompok bentuk
+        groups = {}
+        for index, frame in enumerate(frames):
+            groups.setdefault(frame.shape, []).append(index)
+        if len(groups) == 1:
+            return self._predict(frames, params)
+        results = [None] * len(frames)
+        for indices in groups.values():
+            for index, result in zip(indices, self._predict([frames[index] for index in indices], params)):
+                results[index] = result
+        return results
+
+
+def match_detections(reference, candidate, iou_threshold=0.85, conf_tolerance=0.05):
+    """Cocokkan deteksi dua backend per kelas; kembalikan jumlah cocok dan selisih maksimum"""
+    unmatched = list(candidate)
+    matched, max_conf_diff, min_iou = 0, 0.0, 1.0
+    for ref in reference:
+        best, best_iou = None, 0.0
+        for cand in unmatched:
+            if cand["name"] != ref["name"]:
+                continue
+            iou = box_iou(ref["bbox"], cand["bbox"])
+            if iou > best_iou:
+                best, best_iou = cand, iou
+        if best is None:
+            continue
+        conf_diff = abs(best["confidence"] - ref["confidence"])
+        if best_iou >= iou_threshold and conf_diff <= conf_tolerance:
+            unmatched.remove(best)
+            matched += 1
+            max_conf_diff = max(max_conf_diff, conf_diff)
+            min_iou = min(min_iou, best_iou)
+    return {
+        "matched": matched,
+        "reference_only": len(reference) - matched,
+        "candidate_only": len(unmatched),
+        "max_conf_diff": max_conf_diff,
+        "min_iou": min_iou if matched else 0.0
+    }
+
+
+def compare_backends(weights_path, frames, backends=FLOAT_BACKENDS, imgsz=640,
+                     iou_threshold=0.85, conf_tolerance=0.05, detection_config=None):
+    """Bandingkan deteksi tiap backend terhadap backend torch pada frame yang sama"""
+    from detection_engine import DetectionEngine, DEFAULT_DETECTION_CONFIG
+
+    def build_engine(backend):
+        config = dict(DEFAULT_DETECTION_CONFIG)
+        config.update(detection_config or {})
+        config.update({"inference_backend": backend, "imgsz": imgsz})
+        engine = DetectionEngine(weights_path, detection_config=config)
+        engine.load_model()
+        return engine
+
+    reference = build_engine("torch")
+    reference_results = [reference.predict(frame)["objects"] for frame in frames]
+
+    report = {}
+    for backend in backends:
+        if backend == "torch":
+            continue
+        engine = build_engine(backend)
+        totals = {"matched": 0, "reference_only": 0, "candidate_only": 0, "max_conf_diff": 0.0}
+        for frame, ref_objects in zip(frames, reference_results):
+            stats = match_detections(ref_objects, engine.predict(frame)["objects"], iou_threshold, conf_tolerance)
+            for key in ("matched", "reference_only", "candidate_only"):
+                totals[key] += stats[key]
+            totals["max_conf_diff"] = max(totals["max_conf_diff"], stats["max_conf_diff"])
+        totals["within_tolerance"] = totals["reference_only"] == 0 and totals["candidate_only"] == 0
+        report[backend] = totals
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export dan verifikasi backend inferensi CPU")
+    parser.add_argument("--weights", default="trainedclarinettes_yolov8n.pt")
+    parser.add_argument("--backends", nargs="+", default=list(FLOAT_BACKENDS), choices=LOCAL_BACKENDS)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--images", default=os.path.join("data", "clarinet_captured_photos"))
+    parser.add_argument("--iou", type=float, default=0.85)
+    parser.add_argument("--conf-tolerance", type=float, default=0.05)
+    args = parser.parse_args()
+
+    image_paths = sorted(glob.glob(os.path.join(args.images, "*.jpg")))
+    frames = [frame for frame in (cv2.imread(path) for path in image_paths) if frame is not None]
+    result = compare_backends(args.weights, frames, args.backends, args.imgsz, args.iou, args.conf_tolerance)
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,296 @@
+import argparse
+import io
+import json
+import logging
+import queue
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+from detection_engine import DEFAULT_DETECTION_CONFIG, DetectionEngine
+from inference_backends import LOCAL_BACKENDS
+from pipeline_metrics import MetricsRegistry
+
+
+class PendingRequest:
+    """Satu request /predict yang menunggu masuk batch"""
+    __slots__ = ("frames", "params", "enqueued_at", "done", "results", "error", "queue_wait", "batch_size")
+
+    def __init__(self, frames, params):
+        self.frames = frames
+        self.params = params
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+        self.queue_wait = 0.0
+        self.batch_size = 0
+
+
+class DynamicBatcher:
+    """Kumpulkan request dari banyak stasiun dalam jendela waktu lalu jalankan satu panggilan model per batch"""
+
+    def __init__(self, engine, batch_window_ms=10.0, max_batch=16, metrics=None, logger=None):
+        self.engine = engine
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self.metrics = metrics or MetricsRegistry()
+        self.logger = logger
+        self._queue = queue.Queue()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, frames, params, timeout=30.0):
+        """Dipanggil dari thread handler HTTP: blok sampai batch berisi request ini selesai"""
+        request = PendingRequest(frames, params)
+        self._queue.put(request)
+        self.metrics.set_gauge("server_queue_depth", self._queue.qsize())
+        if not request.done.wait(timeout):
+            raise TimeoutError("Inferensi melebihi batas waktu")
+        if request.error is not None:
+            raise request.error
+        return request
+
+    def stop(self):
+        self._running = False
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _collect(self):
+        """Ambil satu request lalu tambahkan request lain yang datang dalam jendela batch"""
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        frame_count = len(first.frames)
+        deadline = time.perf_counter() + self.batch_window
+        while frame_count < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                self._running = False
+                break
+            batch.append(request)
+            frame_count += len(request.frames)
+        return batch
+
+    def _run(self):
+        while self._running:
+            batch = self._collect()
+            # Request dengan parameter model berbeda (conf, kelas, imgsz) tidak bisa berbagi satu panggilan
+            groups = {}
+            for request in batch:
+                groups.setdefault(request.params, []).append(request)
+            for params, requests in groups.items():
+                self._infer(params, requests)
+
+    def _infer(self, params, requests):
+        started = time.perf_counter()
+        frames = [frame for request in requests for frame in request.frames]
+        try:
+            conf, iou, imgsz, classes = params
+            results = self.engine.model(frames, conf=conf, iou=iou, classes=list(classes) if classes else None,
+                                        imgsz=imgsz, verbose=False)
+            encoded = [self.encode_result(result) for result in results]
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Inferensi batch gagal: {e}")
+            for request in requests:
+                request.error = e
+                request.done.set()
+            return
+        elapsed = time.perf_counter() - started
+
+        self.metrics.observe("server_batch_inference", elapsed)
+        self.metrics.set_gauge("server_batch_size", len(frames))
+        self.metrics.inc("server_batches")
+        self.metrics.inc("server_frames", len(frames))
+        offset = 0
+        for request in requests:
+            count = len(request.frames)
+            request.results = encoded[offset:offset + count]
+            request.queue_wait = started - request.enqueued_at
+            request.batch_size = len(frames)
+            offset += count
+            self.metrics.observe("server_queue_wait", request.queue_wait)
+            for _ in range(count):
+                self.metrics.mark("server_frames")
+            request.done.set()
+
+    def encode_result(self, result):
+        """Box mentah (untuk RemoteModel) plus hasil inspeksi terstruktur seperti advanced_object_filtering"""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            rows = np.zeros((0, 6), dtype=np.float32)
+        else:
+            boxes = boxes.cpu().numpy()
+            rows = np.column_stack([boxes.xyxy, boxes.conf, boxes.cls]).astype(np.float32)
+        inspection = self.engine.inspect(self.engine.filter_arrays(rows[:, :4], rows[:, 4], rows[:, 5]))
+        return {
+            "boxes": rows.round(3).tolist(),
+            "objects": inspection["objects"],
+            "status": inspection["status"],
+            "complete": inspection["complete"],
+            "missing": sorted(inspection["missing"]),
+            "extra": sorted(inspection["extra"])
+        }
+
+
+def decode_frames(body, content_type):
+    """JPEG/PNG untuk satu frame, .npy (HWC atau NHWC uint8) untuk frame mentah atau batch"""
+    if content_type.startswith("application/x-npy"):
+        array = np.load(io.BytesIO(body), allow_pickle=False)
+        if array.ndim == 3:
+            return [array]
+        if array.ndim == 4:
+            return list(array)
+        raise ValueError(f"Bentuk array frame tidak didukung: {array.shape}")
+    frame = cv2.imdecode(np.frombuffer(body, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError("Gambar tidak dapat didecode")
+    return [frame]
+
+
+def parse_params(query, defaults):
+    """Parameter model dari query string; dipakai juga sebagai kunci pengelompokan batch"""
+    values = urllib.parse.parse_qs(query)
+
+    def first(key, default):
+        return values[key][0] if key in values else default
+
+    classes = first("classes", None)
+    return (
+        float(first("conf", defaults["confidence_threshold"])),
+        float(first("iou", defaults["nms_threshold"])),
+        int(first("imgsz", defaults.get("imgsz", 640))),
+        tuple(sorted(int(c) for c in classes.split(",") if c)) if classes else None
+    )
+
+
+def make_handler(batcher, defaults, logger):
+    class InferenceRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+        def _send(self, status, body, content_type="application/json"):
+            data = body.encode("utf-8") if isinstance(body, str) else body
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            path = urllib.parse.urlsplit(self.path).path
+            if path == "/info":
+                names = {str(class_id): name for class_id, name in batcher.engine.names.items()}
+                self._send(200, json.dumps({"names": names, "max_batch": batcher.max_batch}))
+            elif path == "/metrics":
+                self._send(200, batcher.metrics.to_prometheus(), "text/plain; version=0.0.4")
+            elif path == "/health":
+                self._send(200, json.dumps({"status": "ok"}))
+            else:
+                self._send(404, json.dumps({"error": "not found"}))
+
+        def do_POST(self):
+            url = urllib.parse.urlsplit(self.path)
+            if url.path != "/predict":
+                self._send(404, json.dumps({"error": "not found"}))
+                return
+            try:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                frames = decode_frames(body, self.headers.get("Content-Type", "image/jpeg"))
+                params = parse_params(url.query, defaults)
+            except Exception as e:
+                batcher.metrics.inc("server_bad_requests")
+                self._send(400, json.dumps({"error": str(e)}))
+                return
+            try:
+                request = batcher.submit(frames, params)
+            except Exception as e:
+                self._send(500, json.dumps({"error": str(e)}))
+                return
+            self._send(200, json.dumps({
+                "results": request.results,
+                "queue_wait_ms": round(request.queue_wait * 1000, 3),
+                "batch_size": request.batch_size
+            }))
+
+    return InferenceRequestHandler
+
+
+class InferenceServer:
+    """Server inferensi HTTP bersama: satu model, request dari banyak stasiun di-batch dinamis"""
+
+    def __init__(self, engine, host="127.0.0.1", port=8765, batch_window_ms=10.0, max_batch=16, logger=None):
+        self.logger = logger or logging.getLogger(__name__)
+        self.engine = engine
+        self.metrics = MetricsRegistry(station_id="inference_server")
+        self.batcher = DynamicBatcher(engine, batch_window_ms, max_batch, self.metrics, self.logger)
+        handler = make_handler(self.batcher, engine.detection_config, self.logger)
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        self.logger.info(f"Inference server berjalan di {self.url}")
+        self.httpd.serve_forever()
+
+    def start(self):
+        """Jalankan di thread latar (instance loopback untuk pengujian)"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.batcher.stop()
+
+
+def build_server_engine(weights, backend="torch", imgsz=640, logger=None):
+    """Engine server: threshold confidence diterapkan oleh model sesuai parameter request"""
+    config = {**DEFAULT_DETECTION_CONFIG, "inference_backend": backend, "imgsz": imgsz, "confidence_threshold": 0.0}
+    engine = DetectionEngine(weights, detection_config=config)
+    engine.load_model(logger)
+    return engine
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inference server YOLO dengan dynamic batching")
+    parser.add_argument("--weights", default="trainedclarinettes_yolov8n.pt")
+    parser.add_argument("--backend", default="torch", choices=LOCAL_BACKENDS)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--batch-window-ms", type=float, default=10.0)
+    parser.add_argument("--max-batch", type=int, default=16)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger("inference_server")
+    server = InferenceServer(
+        build_server_engine(args.weights, args.backend, args.imgsz, logger),
+        args.host, args.port, args.batch_window_ms, args.max_batch, logger
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,67 @@
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Gate perubahan scene: lewati inferensi selama tray statis, jalankan lagi saat ada gerakan"""
+
+    def __init__(self, pixel_threshold=12, changed_fraction=0.002, max_skip_seconds=1.0, size=(160, 90)):
+        self.pixel_threshold = pixel_threshold
+        self.changed_fraction = changed_fraction
+        self.max_skip_seconds = max_skip_seconds
+        self.size = size
+        self._reference = None
+        self._reference_ts = 0.0
+        self.hits = 0
+        self.skips = 0
+
+    @classmethod
+    def from_config(cls, detection_config):
+        return cls(
+            pixel_threshold=detection_config.get("motion_pixel_threshold", 12),
+            changed_fraction=detection_config.get("motion_changed_fraction", 0.002),
+            max_skip_seconds=detection_config.get("motion_max_skip_seconds", 1.0)
+        )
+
+    def _signature(self, frame):
+        """Frame grayscale kecil dan diblur untuk differencing murah"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        small = cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(small, (3, 3), 0)
+
+    def changed_ratio(self, signature):
+        """Fraksi piksel yang berubah dibanding frame terakhir yang diinferensi"""
+        diff = cv2.absdiff(signature, self._reference)
+        return np.count_nonzero(diff > self.pixel_threshold) / diff.size
+
+    def should_infer(self, frame, now=None):
+        """True jika scene berubah (atau sudah terlalu lama) sehingga model perlu dijalankan"""
+        now = time.perf_counter() if now is None else now
+        signature = self._signature(frame)
+        run = (
+            self._reference is None
+            or self._reference.shape != signature.shape
+            or now - self._reference_ts >= self.max_skip_seconds
+            or self.changed_ratio(signature) >= self.changed_fraction
+        )
+        if run:
+            # Referensi = frame yang diinferensi, bukan frame sebelumnya, agar perubahan lambat tetap terdeteksi
+            self._reference = signature
+            self._reference_ts = now
+            self.hits += 1
+        else:
+            self.skips += 1
+        return run
+
+    def reset(self):
+        self._reference = None
+
+    def stats(self):
+        total = self.hits + self.skips
+        return {
+            "hits": self.hits,
+            "skips": self.skips,
+            "skip_ratio": self.skips / total if total else 0.0
+        }
@@ -0,0 +1,166 @@
+import itertools
+
+import cv2
+import numpy as np
+
+from geometry import box_iou
+
+LK_PARAMS = dict(winSize=(15, 15), maxLevel=2, criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+
+class Track:
+    """Satu objek yang dilacak antar frame dengan ID tetap"""
+    __slots__ = ("track_id", "name", "class_id", "bbox", "confidence", "detection_confidence", "points", "misses",
+                 "hits", "age")
+
+    def __init__(self, track_id, obj):
+        self.track_id = track_id
+        self.name = obj["name"]
+        self.class_id = obj.get("class_id")
+        self.bbox = np.array(obj["bbox"], dtype=np.float32)
+        # confidence meluruh selama propagasi (untuk tampilan); detection_confidence = skor detector terakhir
+        self.confidence = obj["confidence"]
+        self.detection_confidence = obj["confidence"]
+        self.points = None
+        self.misses = 0
+        self.hits = 1
+        # Jumlah frame sejak track terakhir dikonfirmasi detector
+        self.age = 0
+
+    def to_object(self):
+        x1, y1, x2, y2 = (int(v) for v in self.bbox)
+        obj = {
+            "name": self.name,
+            "confidence": self.confidence,
+            "bbox": (x1, y1, x2, y2),
+            "area": (x2 - x1) * (y2 - y1),
+            "track_id": self.track_id
+        }
+        if self.class_id is not None:
+            obj["class_id"] = self.class_id
+        return obj
+
+
+class MultiObjectTracker:
+    """Tracker multi-objek ringan: asosiasi IoU saat deteksi, optical flow LK di antara deteksi"""
+
+    def __init__(self, iou_threshold=0.3, max_misses=2, confidence_decay=0.95, max_age=10, max_points=20):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.confidence_decay = confidence_decay
+        self.max_age = max_age
+        self.max_points = max_points
+        self.tracks = []
+        self._prev_gray = None
+        self._ids = itertools.count(1)
+        self.frames_since_detection = 0
+
+    @classmethod
+    def from_config(cls, detection_config):
+        return cls(
+            iou_threshold=detection_config.get("tracking_iou_threshold", 0.3),
+            max_misses=detection_config.get("tracking_max_misses", 2),
+            confidence_decay=detection_config.get("tracking_confidence_decay", 0.95),
+            max_age=detection_config.get("tracking_max_age", 10)
+        )
+
+    def reset(self):
+        self.tracks = []
+        self._prev_gray = None
+        self.frames_since_detection = 0
+
+    def needs_detection(self, detect_interval, min_confidence):
+        """True jika detector harus dijalankan (interval habis, skor deteksi track rendah atau track terlalu tua)"""
+        if not self.tracks or self._prev_gray is None:
+            return True
+        if self.frames_since_detection >= detect_interval:
+            return True
+        # Confidence yang meluruh turun di bawah threshold dalam beberapa frame; pakai skor detector asli
+        return any(track.detection_confidence < min_confidence or track.age >= self.max_age for track in self.tracks)
+
+    def _seed_points(self, gray, track):
+        """Cari titik fitur di dalam bbox untuk dilacak dengan optical flow"""
+        h, w = gray.shape
+        x1, y1, x2, y2 = track.bbox.astype(int)
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(w, x2), min(h, y2)
+        if x2 - x1 < 4 or y2 - y1 < 4:
+            track.points = None
+            return
+        mask = np.zeros_like(gray)
+        mask[y1:y2, x1:x2] = 255
+        track.points = cv2.goodFeaturesToTrack(gray, self.max_points, 0.01, 3, mask=mask)
+
+    def update(self, frame, objects):
+        """Perbarui track dengan hasil detector (asosiasi greedy IoU per kelas)"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        pairs = []
+        for t_index, track in enumerate(self.tracks):
+            for d_index, obj in enumerate(objects):
+                if obj["name"] != track.name:
+                    continue
+                iou = box_iou(track.bbox, obj["bbox"])
+                if iou >= self.iou_threshold:
+                    pairs.append((iou, t_index, d_index))
+        pairs.sort(reverse=True)
+
+        matched_tracks, matched_detections = set(), set()
+        for _, t_index, d_index in pairs:
+            if t_index in matched_tracks or d_index in matched_detections:
+                continue
+            track, obj = self.tracks[t_index], objects[d_index]
+            track.bbox = np.array(obj["bbox"], dtype=np.float32)
+            track.confidence = obj["confidence"]
+            track.detection_confidence = obj["confidence"]
+            track.misses = 0
+            track.hits += 1
+            track.age = 0
+            matched_tracks.add(t_index)
+            matched_detections.add(d_index)
+
+        survivors = []
+        for t_index, track in enumerate(self.tracks):
+            if t_index not in matched_tracks:
+                # Pertahankan track beberapa deteksi agar status tidak berkedip saat satu frame terlewat
+                track.misses += 1
+                if track.misses > self.max_misses:
+                    continue
+            survivors.append(track)
+        for d_index, obj in enumerate(objects):
+            if d_index not in matched_detections:
+                survivors.append(Track(next(self._ids), obj))
+
+        for track in survivors:
+            self._seed_points(gray, track)
+        self.tracks = survivors
+        self._prev_gray = gray
+        self.frames_since_detection = 0
+        return self.objects()
+
+    def propagate(self, frame):
+        """Geser bbox tiap track dengan median optical flow, tanpa menjalankan detector"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        self.frames_since_detection += 1
+        if self._prev_gray is None:
+            self._prev_gray = gray
+            return self.objects()
+        for track in self.tracks:
+            track.age += 1
+            track.confidence *= self.confidence_decay
+            if track.points is None or len(track.points) == 0:
+                continue
+            new_points, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, track.points, None, **LK_PARAMS)
+            good = status.reshape(-1) == 1
+            if not good.any():
+                track.points = None
+                continue
+            shift = np.median(new_points[good] - track.points[good], axis=0).reshape(-1)
+            track.bbox += np.array([shift[0], shift[1], shift[0], shift[1]], dtype=np.float32)
+            track.points = new_points[good].reshape(-1, 1, 2)
+            # Confidence ikut turun jika banyak titik hilang
+            track.confidence *= float(good.mean())
+        self._prev_gray = gray
+        return self.objects()
+
+    def objects(self):
+        return [track.to_object() for track in self.tracks]
@@ -0,0 +1,207 @@
+import collections
+import json
+import os
+import socket
+import threading
+import time
+
+
+class RollingHistogram:
+    """Histogram bergulir: sampel terakhir untuk persentil, total kumulatif untuk counter"""
+
+    def __init__(self, window=1000):
+        self.samples = collections.deque(maxlen=window)
+        self.total_count = 0
+        self.total_sum = 0.0
+
+    def observe(self, value):
+        self.samples.append(value)
+        self.total_count += 1
+        self.total_sum += value
+
+    def percentile(self, pct):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self):
+        count = len(self.samples)
+        return {
+            "count": self.total_count,
+            "sum": self.total_sum,
+            "mean": sum(self.samples) / count if count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99)
+        }
+
+
+class RateMeter:
+    """Hitung event per detik dalam jendela waktu bergulir (misal FPS)"""
+
+    def __init__(self, window_seconds=2.0):
+        self.window_seconds = window_seconds
+        self.events = collections.deque()
+
+    def mark(self, now=None):
+        now = time.perf_counter() if now is None else now
+        self.events.append(now)
+        while self.events and now - self.events[0] > self.window_seconds:
+            self.events.popleft()
+
+    def rate(self, now=None):
+        now = time.perf_counter() if now is None else now
+        while self.events and now - self.events[0] > self.window_seconds:
+            self.events.popleft()
+        if len(self.events) < 2:
+            return 0.0
+        span = now - self.events[0]
+        return (len(self.events) - 1) / span if span > 0 else 0.0
+
+
+class _StageTimer:
+    __slots__ = ("registry", "stage", "start")
+
+    def __init__(self, registry, stage):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class MetricsRegistry:
+    """Registry metrik pipeline: durasi stage, counter, gauge dan rate"""
+
+    def __init__(self, station_id=None, window=1000):
+        self.station_id = station_id or socket.gethostname()
+        self.window = window
+        self.histograms = {}
+        self.counters = collections.defaultdict(int)
+        self.gauges = {}
+        self.rates = {}
+        self._lock = threading.Lock()
+
+    def timer(self, stage):
+        """Context manager untuk mengukur durasi satu stage (detik)"""
+        return _StageTimer(self, stage)
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = RollingHistogram(self.window)
+            histogram.observe(seconds)
+
+    def inc(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def mark(self, name):
+        with self._lock:
+            meter = self.rates.get(name)
+            if meter is None:
+                meter = self.rates[name] = RateMeter()
+            meter.mark()
+
+    def rate(self, name):
+        with self._lock:
+            meter = self.rates.get(name)
+            return meter.rate() if meter else 0.0
+
+    def stage_ms(self, stage, pct=50):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            return histogram.percentile(pct) * 1000 if histogram else 0.0
+
+    def snapshot(self):
+        """Salinan seluruh metrik dalam bentuk dict (siap JSON)"""
+        with self._lock:
+            return {
+                "station_id": self.station_id,
+                "timestamp": time.time(),
+                "stages": {stage: histogram.summary() for stage, histogram in self.histograms.items()},
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "rates": {name: meter.rate() for name, meter in self.rates.items()}
+            }
+
+    def to_prometheus(self, snapshot=None):
+        """Format teks eksposisi Prometheus"""
+        snapshot = snapshot or self.snapshot()
+        station = snapshot["station_id"].replace('"', "")
+        lines = [
+            "# HELP clarinet_stage_seconds Durasi stage pipeline deteksi",
+            "# TYPE clarinet_stage_seconds summary"
+        ]
+        for stage, summary in sorted(snapshot["stages"].items()):
+            labels = f'station="{station}",stage="{stage}"'
+            for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+                lines.append(f'clarinet_stage_seconds{{{labels},quantile="{quantile}"}} {summary[key]:.6f}')
+            lines.append(f"clarinet_stage_seconds_sum{{{labels}}} {summary['sum']:.6f}")
+            lines.append(f"clarinet_stage_seconds_count{{{labels}}} {summary['count']}")
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"# TYPE clarinet_{name}_total counter")
+            lines.append(f'clarinet_{name}_total{{station="{station}"}} {value}')
+        for name, value in sorted(snapshot["gauges"].items()):
+            lines.append(f"# TYPE clarinet_{name} gauge")
+            lines.append(f'clarinet_{name}{{station="{station}"}} {value}')
+        for name, value in sorted(snapshot["rates"].items()):
+            lines.append(f"# TYPE clarinet_{name}_per_second gauge")
+            lines.append(f'clarinet_{name}_per_second{{station="{station}"}} {value:.3f}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Tulis metrik ke file secara atomik (.json atau teks Prometheus)"""
+        snapshot = self.snapshot()
+        if path.endswith(".json"):
+            content = json.dumps(snapshot, indent=2)
+        else:
+            content = self.to_prometheus(snapshot)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+
+class MetricsExporter:
+    """Thread latar yang menulis metrik ke file secara berkala untuk di-scrape collector lokal"""
+
+    def __init__(self, registry, path, interval=5.0, logger=None):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.logger = logger
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 1)
+        self._write()
+
+    def _write(self):
+        try:
+            self.registry.write(self.path)
+        except OSError as e:
+            if self.logger:
+                self.logger.warning(f"Gagal menulis file metrik {self.path}: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._write()
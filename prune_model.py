@@ -0,0 +1,133 @@
+import argparse
+import os
+
+import torch
+
+from benchmark_pipeline import iter_source_frames
+from inference_backends import yolo_class
+from pruned_layers import C2f_v2, replace_c2f
+from quantize_int8 import DEFAULT_DATA_YAML, build_engine, measure_latency
+from sweep_training import evaluate_config, load_results, save_results
+
+try:
+    import torch_pruning as tp
+except ImportError:  # Dependensi opsional, hanya dibutuhkan untuk pruning
+    tp = None
+
+
+def require_torch_pruning():
+    if tp is None:
+        raise ImportError("torch_pruning belum terpasang: pip install torch-pruning")
+
+
+def count_complexity(model, imgsz):
+    """GFLOPs (2 x MACs) dan jumlah parameter untuk input imgsz x imgsz"""
+    require_torch_pruning()
+    example_inputs = torch.zeros(1, 3, imgsz, imgsz)
+    macs, params = tp.utils.count_ops_and_params(model, example_inputs)
+    return {"gflops": 2 * macs / 1e9, "params": int(params)}
+
+
+def prune_channels(model, ratio, imgsz):
+    """Structured channel pruning (magnitude L2) di seluruh backbone/neck; output head Detect tidak diubah"""
+    require_torch_pruning()
+    from ultralytics.nn.modules import Detect
+
+    model.eval()
+    # chunk(2) di C2f.forward membagi channel secara implisit; tanpa penggantian, pruning memotong cv1
+    # tanpa menyesuaikan pembagiannya sehingga model rusak
+    replace_c2f(model)
+    for param in model.parameters():
+        param.requires_grad = True
+    example_inputs = torch.zeros(1, 3, imgsz, imgsz)
+    ignored_layers = [module for module in model.modules() if isinstance(module, Detect)]
+    kwargs = dict(importance=tp.importance.MagnitudeImportance(p=2), ignored_layers=ignored_layers)
+    try:
+        pruner = tp.pruner.MagnitudePruner(model, example_inputs, pruning_ratio=ratio, **kwargs)
+    except TypeError:
+        # torch_pruning < 1.3 memakai nama argumen ch_sparsity
+        pruner = tp.pruner.MagnitudePruner(model, example_inputs, ch_sparsity=ratio, **kwargs)
+    pruner.step()
+    for module in model.modules():
+        if isinstance(module, C2f_v2):
+            module.c = module.cv0.conv.out_channels
+    try:
+        with torch.no_grad():
+            model(example_inputs)
+    except Exception as e:
+        raise RuntimeError(f"Model hasil pruning (rasio {ratio}) gagal forward pass: {e}") from e
+    return model
+
+
+def finetune_pruned(weights_path, ratio, data_yaml, imgsz, epochs, output_dir, batch=32, device=None):
+    """Prune lalu fine-tune; model hasil prune dipasang ke trainer agar tidak dibangun ulang dari yaml"""
+    yolo = yolo_class()(weights_path)
+    pruned = prune_channels(yolo.model, ratio, imgsz)
+
+    def use_pruned_model(trainer):
+        # setup_model() trainer dilewati jika trainer.model sudah berupa nn.Module
+        trainer.model = pruned
+
+    yolo.add_callback("on_pretrain_routine_start", use_pruned_model)
+    name = f"pruned_{int(round(ratio * 100))}"
+    yolo.train(data=data_yaml, epochs=epochs, imgsz=imgsz, batch=batch, device=device,
+               project=output_dir, name=name, exist_ok=True, plots=False, verbose=False)
+    # Checkpoint menyimpan modul utuh (lebar channel hasil prune), sehingga YOLO(path) memuatnya apa adanya
+    return os.path.join(output_dir, name, "weights", "best.pt")
+
+
+def slim_model(weights_path, ratios, data_yaml, latency_images, imgsz=640, epochs=30, output_dir=None,
+               batch=32, device=None, backend="torch"):
+    """Baseline + setiap rasio pruning: recall per part, GFLOPs, parameter dan latensi CPU"""
+    output_dir = output_dir or os.path.join("runs", "prune")
+    os.makedirs(output_dir, exist_ok=True)
+    results_path = os.path.join(output_dir, "prune_results.json")
+    results = load_results(results_path)
+    frames = list(iter_source_frames([latency_images]))
+    if not frames:
+        raise ValueError(f"Tidak ada gambar untuk pengukuran latensi di {latency_images}")
+
+    for ratio in [0.0, *ratios]:
+        key = f"ratio_{ratio:.2f}"
+        result = results.setdefault(key, {"ratio": ratio})
+        if "weights" not in result:
+            result["weights"] = weights_path if ratio == 0 else finetune_pruned(
+                weights_path, ratio, data_yaml, imgsz, epochs, output_dir, batch, device
+            )
+            save_results(results_path, results)
+        if "complexity" not in result:
+            result["complexity"] = count_complexity(yolo_class()(result["weights"]).model.float().eval(), imgsz)
+        if "accuracy" not in result:
+            result["accuracy"] = evaluate_config(result["weights"], data_yaml, imgsz)
+            save_results(results_path, results)
+        if "latency" not in result:
+            result["latency"] = measure_latency(build_engine(result["weights"], backend, imgsz), frames)
+            result["latency"]["backend"] = backend
+            save_results(results_path, results)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Structured channel pruning + fine-tune untuk model CPU lebih kecil")
+    parser.add_argument("--weights", default="trainedclarinettes_yolov8n.pt")
+    parser.add_argument("--ratios", nargs="+", type=float, default=[0.2, 0.35, 0.5], help="Rasio channel yang dibuang")
+    parser.add_argument("--data", default=DEFAULT_DATA_YAML)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--epochs", type=int, default=30, help="Epoch fine-tune setiap model hasil prune")
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--output-dir", default=os.path.join("runs", "prune"))
+    parser.add_argument("--latency-images", default=os.path.join("data", "clarinet_captured_photos"))
+    parser.add_argument("--backend", default="torch", help="Backend inferensi untuk pengukuran latensi")
+    args = parser.parse_args()
+
+    report = slim_model(args.weights, args.ratios, args.data, args.latency_images, args.imgsz, args.epochs,
+                        args.output_dir, args.batch, args.device, args.backend)
+    print(f"{'Rasio':<8}{'GFLOPs':>8}{'Param':>10}{'p50 ms':>9}{'mAP50-95':>10}  Recall terendah")
+    for result in report.values():
+        recalls = {part: stats["recall"] for part, stats in result["accuracy"]["per_part"].items()}
+        weakest = min(recalls, key=recalls.get) if recalls else "-"
+        print(f"{result['ratio']:<8.2f}{result['complexity']['gflops']:>8.2f}{result['complexity']['params']:>10}"
+              f"{result['latency']['p50_ms']:>9.1f}{result['accuracy']['map50_95']:>10.3f}"
+              f"  {weakest} {recalls.get(weakest, 0.0):.3f}")
+    print(f"Hasil lengkap: {os.path.join(args.output_dir, 'prune_results.json')}")
@@ -0,0 +1,57 @@
+import copy
+
+import torch
+from torch import nn
+
+# Modul layer model hasil prune_model.py. Checkpoint hasil pruning mem-pickle kelas di sini dengan nama
+# modul "pruned_layers" (bukan "__main__"), sehingga load_model aplikasi bisa memuatnya tanpa perubahan
+
+
+def split_conv(conv, start, end):
+    """Salinan blok Conv (conv + BN) yang hanya memuat channel output [start, end)"""
+    part = copy.deepcopy(conv)
+    part.conv.weight = nn.Parameter(conv.conv.weight.data[start:end].clone())
+    part.conv.out_channels = end - start
+    if part.conv.bias is not None:
+        part.conv.bias = nn.Parameter(conv.conv.bias.data[start:end].clone())
+    bn = part.bn
+    bn.weight = nn.Parameter(conv.bn.weight.data[start:end].clone())
+    bn.bias = nn.Parameter(conv.bn.bias.data[start:end].clone())
+    bn.running_mean = conv.bn.running_mean[start:end].clone()
+    bn.running_var = conv.bn.running_var[start:end].clone()
+    bn.num_features = end - start
+    return part
+
+
+class C2f_v2(nn.Module):
+    """C2f tanpa chunk(): cv1 dipecah menjadi cv0/cv1 agar dependency graph torch_pruning bisa mengikuti channel"""
+
+    def __init__(self, c2f):
+        super().__init__()
+        # Atribut graph ultralytics (index layer, input, tipe, jumlah parameter) ikut dipindahkan
+        for attr in ("i", "f", "type", "np"):
+            if hasattr(c2f, attr):
+                setattr(self, attr, getattr(c2f, attr))
+        self.c = c2f.c
+        self.cv0 = split_conv(c2f.cv1, 0, c2f.c)
+        self.cv1 = split_conv(c2f.cv1, c2f.c, 2 * c2f.c)
+        self.cv2 = c2f.cv2
+        self.m = c2f.m
+
+    def forward(self, x):
+        y = [self.cv0(x), self.cv1(x)]
+        y.extend(m(y[-1]) for m in self.m)
+        return self.cv2(torch.cat(y, 1))
+
+
+def replace_c2f(model):
+    """Ganti setiap C2f (termasuk turunannya) dengan C2f_v2 yang keluarannya identik"""
+    from ultralytics.nn.modules import C2f
+
+    replaced = 0
+    for parent in list(model.modules()):
+        for name, child in list(parent.named_children()):
+            if isinstance(child, C2f):
+                setattr(parent, name, C2f_v2(child))
+                replaced += 1
+    return replaced
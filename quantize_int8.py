@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import time
+
+from benchmark_pipeline import iter_source_frames, summarize
+from detection_engine import DetectionEngine, DEFAULT_DETECTION_CONFIG
+from inference_backends import FLOAT_BACKENDS, cached_artifact_path, export_backend, yolo_class
+
+DEFAULT_DATA_YAML = "D:/DATA/FOR_DL/objectdetection/magang2025/DatasetClarinet/data.yaml"
+
+
+def build_engine(weights_path, backend, imgsz):
+    """Engine dengan jalur load yang sama seperti aplikasi live"""
+    config = {**DEFAULT_DETECTION_CONFIG, "inference_backend": backend, "imgsz": imgsz}
+    engine = DetectionEngine(weights_path, detection_config=config)
+    engine.load_model()
+    return engine
+
+
+def evaluate_map(model_path, data_yaml, imgsz):
+    """Validasi pada split val dari data.yaml training; mAP keseluruhan dan per kelas"""
+    model = yolo_class()(model_path, task="detect")
+    metrics = model.val(data=data_yaml, imgsz=imgsz, split="val", device="cpu", plots=False, verbose=False)
+    box = metrics.box
+    per_class = {}
+    for index, class_id in enumerate(box.ap_class_index):
+        per_class[model.names[int(class_id)]] = {
+            "map50": float(box.ap50[index]),
+            "map50_95": float(box.ap[index])
+        }
+    return {"map50": float(box.map50), "map50_95": float(box.map), "per_class": per_class}
+
+
+def measure_latency(engine, frames, warmup=5):
+    """Latensi CPU per frame (model + filtering) dan throughput"""
+    for frame in frames[:warmup]:
+        engine.predict(frame)
+    samples = []
+    start = time.perf_counter()
+    for frame in frames:
+        t_start = time.perf_counter()
+        engine.predict(frame)
+        samples.append(time.perf_counter() - t_start)
+    elapsed = time.perf_counter() - start
+    report = summarize(samples)
+    report["throughput_fps"] = len(frames) / elapsed if elapsed > 0 else 0.0
+    return report
+
+
+def completeness_agreement(reference, candidate, frames):
+    """Seberapa sering keputusan Lengkap/NG dan set part terdeteksi sama antara dua model"""
+    same_decision = same_parts = 0
+    disagreements = []
+    for index, frame in enumerate(frames):
+        ref = reference.predict(frame)
+        cand = candidate.predict(frame)
+        if ref["complete"] == cand["complete"]:
+            same_decision += 1
+        else:
+            disagreements.append({
+                "frame": index,
+                "reference": ref["status"],
+                "candidate": cand["status"],
+                "reference_only": sorted(ref["detected"] - cand["detected"]),
+                "candidate_only": sorted(cand["detected"] - ref["detected"])
+            })
+        same_parts += ref["detected"] == cand["detected"]
+    total = len(frames)
+    return {
+        "frames": total,
+        "decision_agreement": same_decision / total if total else 0.0,
+        "part_set_agreement": same_parts / total if total else 0.0,
+        "disagreements": disagreements
+    }
+
+
+def quantize_and_report(weights_path, data_yaml, calibration_dir, eval_images, imgsz=640,
+                        baseline_backend="torch", int8_backend="openvino_int8", force=False, skip_map=False):
+    """Quantize ke INT8, lalu bandingkan dengan model FP32: mAP, kesepakatan kelengkapan, latensi"""
+    int8_path = cached_artifact_path(weights_path, int8_backend, imgsz)
+    if force or not os.path.exists(int8_path):
+        int8_path = export_backend(weights_path, int8_backend, imgsz, calibration_dir=calibration_dir)
+
+    frames = list(iter_source_frames([eval_images]))
+    if not frames:
+        raise ValueError(f"Tidak ada gambar evaluasi di {eval_images}")
+    fp32 = build_engine(weights_path, baseline_backend, imgsz)
+    int8 = build_engine(weights_path, int8_backend, imgsz)
+
+    report = {
+        "weights": weights_path,
+        "int8_model": int8_path,
+        "imgsz": imgsz,
+        "calibration_images": calibration_dir,
+        "fp32": {"backend": baseline_backend, "latency": measure_latency(fp32, frames)},
+        "int8": {"backend": int8_backend, "latency": measure_latency(int8, frames)},
+        "completeness": completeness_agreement(fp32, int8, frames)
+    }
+    if not skip_map:
+        report["fp32"]["accuracy"] = evaluate_map(
+            weights_path if baseline_backend == "torch" else cached_artifact_path(weights_path, baseline_backend, imgsz),
+            data_yaml, imgsz
+        )
+        report["int8"]["accuracy"] = evaluate_map(int8_path, data_yaml, imgsz)
+        report["map50_95_drop"] = report["fp32"]["accuracy"]["map50_95"] - report["int8"]["accuracy"]["map50_95"]
+    int8_p50 = report["int8"]["latency"]["p50_ms"]
+    report["speedup_p50"] = report["fp32"]["latency"]["p50_ms"] / int8_p50 if int8_p50 else 0.0
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quantization INT8 (post-training) dengan laporan akurasi dan latensi")
+    parser.add_argument("--weights", default="trainedclarinettes_yolov8n.pt")
+    parser.add_argument("--data", default=DEFAULT_DATA_YAML, help="data.yaml training (split val untuk evaluasi mAP)")
+    parser.add_argument("--calibration-images", default=os.path.join("data", "clarinet_captured_photos"))
+    parser.add_argument("--eval-images", default=os.path.join("data", "clarinet_captured_photos"),
+                        help="Gambar untuk kesepakatan Lengkap/NG dan latensi")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--baseline-backend", default="torch", choices=FLOAT_BACKENDS)
+    parser.add_argument("--force", action="store_true", help="Quantize ulang walaupun artefak INT8 sudah ada di cache")
+    parser.add_argument("--skip-map", action="store_true", help="Lewati validasi mAP (tanpa dataset berlabel)")
+    parser.add_argument("--output", default="quantization_report.json")
+    args = parser.parse_args()
+
+    result = quantize_and_report(
+        args.weights, args.data, args.calibration_images, args.eval_images, args.imgsz,
+        args.baseline_backend, force=args.force, skip_map=args.skip_map
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(json.dumps({key: value for key, value in result.items() if key != "completeness"}, indent=2))
+    print(f"Kesepakatan Lengkap/NG: {result['completeness']['decision_agreement']:.1%}")
+    print(f"Laporan ditulis ke {args.output}")
@@ -0,0 +1,131 @@
+import json
+
+import numpy as np
+
+DEFAULT_RECIPE_NAME = "Clarinet Standard"
+
+
+class Recipe:
+    """Resep produk (SKU): part wajib beserta jumlahnya, part opsional dan part terlarang"""
+
+    def __init__(self, name, required, optional=(), forbidden=()):
+        self.name = name
+        self.required = {part: int(quantity) for part, quantity in required.items()}
+        self.optional = set(optional)
+        self.forbidden = set(forbidden)
+        overlap = (set(self.required) | self.optional) & self.forbidden
+        if overlap:
+            raise ValueError(f"Resep {name}: part {', '.join(sorted(overlap))} wajib/opsional sekaligus terlarang")
+
+    @classmethod
+    def from_required(cls, names, name=DEFAULT_RECIPE_NAME):
+        """Resep dari kumpulan nama part wajib (masing-masing satu)"""
+        return cls(name, {part: 1 for part in names})
+
+    @classmethod
+    def from_dict(cls, data):
+        required = data["required"]
+        if isinstance(required, list):
+            required = {part: 1 for part in required}
+        return cls(data["name"], required, data.get("optional", ()), data.get("forbidden", ()))
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "required": dict(sorted(self.required.items())),
+            "optional": sorted(self.optional),
+            "forbidden": sorted(self.forbidden)
+        }
+
+    @property
+    def parts(self):
+        """Semua part yang relevan untuk resep (yang perlu dideteksi model)"""
+        return set(self.required) | self.optional | self.forbidden
+
+    def compile(self, names):
+        """Kompilasi ke vektor jumlah dan bitmask class ID untuk nama kelas model"""
+        return CompiledRecipe(self, names)
+
+
+class CompiledRecipe:
+    """Resep dalam bentuk class ID: cek kelengkapan per frame cukup operasi NumPy dan integer"""
+
+    def __init__(self, recipe, names):
+        self.recipe = recipe
+        self.names = names
+        self.num_classes = max(names) + 1 if names else 0
+        self.name_to_id = {name: class_id for class_id, name in names.items()}
+        self.class_names = np.array([names.get(i, str(i)) for i in range(self.num_classes)], dtype=object)
+
+        # Part resep yang tidak dikenal model tidak bisa dideteksi: part wajib seperti ini selalu hilang
+        self.unknown_required = {part for part in recipe.required if part not in self.name_to_id}
+        self.required_counts = np.zeros(self.num_classes, dtype=np.int32)
+        for part, quantity in recipe.required.items():
+            if part in self.name_to_id:
+                self.required_counts[self.name_to_id[part]] = quantity
+        self.required_flags = self.required_counts > 0
+        self.forbidden_flags = self._flags(recipe.forbidden)
+        self.allowed_flags = self.required_flags | self._flags(recipe.optional)
+
+        self.required_mask = self._mask(self.required_flags)
+        self.forbidden_mask = self._mask(self.forbidden_flags)
+        self.allowed_mask = self._mask(self.allowed_flags)
+        self.class_ids = sorted(self.name_to_id[part] for part in recipe.parts if part in self.name_to_id)
+
+    def _flags(self, parts):
+        flags = np.zeros(self.num_classes, dtype=bool)
+        for part in parts:
+            if part in self.name_to_id:
+                flags[self.name_to_id[part]] = True
+        return flags
+
+    @staticmethod
+    def _mask(flags):
+        mask = 0
+        for class_id in np.flatnonzero(flags):
+            mask |= 1 << int(class_id)
+        return mask
+
+    def class_ids_of(self, objects):
+        """Class ID untuk list objek terfilter (pakai class_id jika ada, selain itu lookup nama)"""
+        return np.fromiter(
+            (obj["class_id"] if "class_id" in obj else self.name_to_id.get(obj["name"], -1) for obj in objects),
+            dtype=np.int64, count=len(objects)
+        )
+
+    def count(self, class_ids):
+        """Vektor jumlah deteksi per class ID"""
+        class_ids = np.asarray(class_ids, dtype=np.int64)
+        class_ids = class_ids[(class_ids >= 0) & (class_ids < self.num_classes)]
+        return np.bincount(class_ids, minlength=self.num_classes)
+
+    def check_counts(self, counts):
+        """Cek kelengkapan dari vektor jumlah: kurang dari jumlah wajib atau ada part terlarang = NG"""
+        present = counts > 0
+        presence_mask = self._mask(present)
+        short = counts < self.required_counts
+        forbidden_found = presence_mask & self.forbidden_mask
+        complete = not short.any() and not forbidden_found and not self.unknown_required
+        return {
+            "complete": complete,
+            "status": "Lengkap" if complete else "NG",
+            "missing": set(self.class_names[short].tolist()) | self.unknown_required,
+            "extra": set(self.class_names[present & ~self.allowed_flags].tolist()),
+            "forbidden": set(self.class_names[present & self.forbidden_flags].tolist()),
+            "counts": counts,
+            "presence_mask": presence_mask
+        }
+
+
+def load_recipes(path):
+    """Baca file resep JSON: list resep atau {"recipes": [...]}; dict nama -> Recipe (urut sesuai file)"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data["recipes"] if isinstance(data, dict) else data
+    recipes = {}
+    for entry in entries:
+        recipe = Recipe.from_dict(entry)
+        if recipe.name in recipes:
+            raise ValueError(f"Nama resep ganda: {recipe.name}")
+        recipes[recipe.name] = recipe
+    return recipes
@@ -0,0 +1,262 @@
+import argparse
+import csv
+import glob
+import itertools
+import json
+import os
+import socket
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parts (
+    bit INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS inspection_sets (
+    id INTEGER PRIMARY KEY,
+    set_name TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    station_id TEXT NOT NULL,
+    complete INTEGER NOT NULL,
+    presence_mask INTEGER NOT NULL,
+    confidences TEXT,
+    image_path TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sets_station_name ON inspection_sets (station_id, set_name);
+CREATE INDEX IF NOT EXISTS idx_sets_timestamp ON inspection_sets (timestamp);
+CREATE INDEX IF NOT EXISTS idx_sets_complete_timestamp ON inspection_sets (complete, timestamp);
+"""
+
+SET_NAME_FORMAT = "Set_%Y%m%d_%H%M%S"
+PHOTO_NAME_FORMAT = "detected_%Y%m%d_%H%M%S"
+# Nama file export "Lihat CSV"; bukan log lama sehingga tidak pernah ikut diimport
+EXPORT_FILENAME = "inspection_sets_export.csv"
+EXPORT_HEADER = ["Timestamp", "Set"]
+
+
+class ResultsStore:
+    """Penyimpanan hasil inspeksi append-only di SQLite (WAL), satu baris per set"""
+
+    def __init__(self, db_path, station_id=None):
+        self.db_path = db_path
+        self.station_id = station_id or socket.gethostname()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._part_bits = dict(self._conn.execute("SELECT name, bit FROM parts"))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def is_empty(self):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM inspection_sets LIMIT 1").fetchone() is None
+
+    def register_parts(self, names):
+        """Pastikan setiap nama part punya bit tetap di bitmask"""
+        if all(name in self._part_bits for name in names):
+            return
+        with self._lock, self._conn:
+            new_names = [name for name in sorted(names) if name not in self._part_bits]
+            next_bit = max(self._part_bits.values(), default=-1) + 1
+            for name in new_names:
+                self._conn.execute("INSERT INTO parts (bit, name) VALUES (?, ?)", (next_bit, name))
+                self._part_bits[name] = next_bit
+                next_bit += 1
+
+    @property
+    def part_names(self):
+        """Nama part urut berdasarkan bit"""
+        return [name for name, _ in sorted(self._part_bits.items(), key=lambda item: item[1])]
+
+    def presence_mask(self, names):
+        self.register_parts(names)
+        mask = 0
+        for name in names:
+            mask |= 1 << self._part_bits[name]
+        return mask
+
+    def decode_mask(self, mask):
+        return {name for name, bit in self._part_bits.items() if mask >> bit & 1}
+
+    @staticmethod
+    def live_set_name(timestamp):
+        """Nama set submit live dengan resolusi milidetik (Set_YYYYmmdd_HHMMSS_mmm)"""
+        return f"{timestamp.strftime(SET_NAME_FORMAT)}_{timestamp.microsecond // 1000:03d}"
+
+    @staticmethod
+    def live_image_name(timestamp):
+        """Nama file foto submit live, resolusi milidetik yang sama dengan live_set_name"""
+        return f"{timestamp.strftime(PHOTO_NAME_FORMAT)}_{timestamp.microsecond // 1000:03d}.jpg"
+
+    def _row(self, timestamp, detected_objects, image_path, complete, set_name=None):
+        """Bangun baris tabel; detected_objects berupa dict nama->objek atau kumpulan nama"""
+        if isinstance(detected_objects, dict):
+            confidences = {name: round(float(obj["confidence"]), 4) for name, obj in detected_objects.items()}
+        else:
+            confidences = {}
+        names = set(detected_objects)
+        return (
+            set_name or self.live_set_name(timestamp),
+            timestamp.timestamp(),
+            self.station_id,
+            int(bool(complete)),
+            self.presence_mask(names),
+            json.dumps(confidences) if confidences else None,
+            image_path
+        )
+
+    def record_set(self, timestamp, detected_objects, image_path=None, complete=True, set_name=None):
+        """Simpan satu set hasil submit"""
+        return self.record_sets([(timestamp, detected_objects, image_path, complete, set_name)])
+
+    def record_sets(self, entries, skip_existing=False):
+        """Simpan beberapa set sekaligus dalam satu transaksi; skip_existing hanya untuk import CSV lama"""
+        # Submit live tidak pernah dibuang: nama set yang bentrok diberi akhiran _2, _3, ...
+        rows = [self._row(*entry) for entry in entries]
+        sql = ("INSERT {}INTO inspection_sets "
+               "(set_name, timestamp, station_id, complete, presence_mask, confidences, image_path) "
+               "VALUES (?, ?, ?, ?, ?, ?, ?)")
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            if skip_existing:
+                self._conn.executemany(sql.format("OR IGNORE "), rows)
+                return self._conn.total_changes - before
+            for row in rows:
+                set_name, suffix = row[0], 1
+                while True:
+                    try:
+                        self._conn.execute(sql.format(""), row)
+                        break
+                    except sqlite3.IntegrityError:
+                        suffix += 1
+                        row = (f"{set_name}_{suffix}", *row[1:])
+            return self._conn.total_changes - before
+
+    def checkpoint(self):
+        """Tulis WAL ke file database utama (dipanggil saat shutdown)"""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def query(self, start=None, end=None, complete=None, limit=None):
+        """Ambil set berdasarkan rentang waktu dan/atau status kelengkapan (memakai index)"""
+        clauses, params = [], []
+        if complete is not None:
+            clauses.append("complete = ?")
+            params.append(int(bool(complete)))
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start.timestamp())
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(end.timestamp())
+        sql = ("SELECT set_name, timestamp, station_id, complete, presence_mask, confidences, image_path "
+               "FROM inspection_sets")
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {
+                "set_name": set_name,
+                "timestamp": datetime.fromtimestamp(ts),
+                "station_id": station_id,
+                "complete": bool(is_complete),
+                "parts": self.decode_mask(mask),
+                "presence_mask": mask,
+                "confidences": json.loads(confidences) if confidences else {},
+                "image_path": image_path
+            }
+            for set_name, ts, station_id, is_complete, mask, confidences, image_path in rows
+        ]
+
+    def export_csv(self, csv_path, **query_kwargs):
+        """Export ke CSV (format 1/0 per part seperti file Set_*.csv lama)"""
+        part_names = self.part_names
+        rows = self.query(**query_kwargs)
+        tmp_path = f"{csv_path}.tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow([*EXPORT_HEADER, *part_names, "Status", "Gambar"])
+            for row in rows:
+                csv_writer.writerow([
+                    row["timestamp"].strftime("%Y-%m-%d %H:%M:%S"),
+                    row["set_name"],
+                    *[1 if name in row["parts"] else 0 for name in part_names],
+                    "Lengkap" if row["complete"] else "NG",
+                    row["image_path"] or ""
+                ])
+        os.replace(tmp_path, csv_path)
+        return len(rows)
+
+    def import_csv_logs(self, csv_dir, photo_dir=None, required_objects=None):
+        """Import file Set_*.csv dan clarinet_detection_log.csv lama ke database"""
+        entries, seen = [], set()
+        for path in sorted(glob.glob(os.path.join(csv_dir, "Set_*.csv"))):
+            with open(path, newline="", encoding="utf-8") as csvfile:
+                for row in csv.DictReader(csvfile):
+                    set_name = row.pop("Set")
+                    timestamp = datetime.strptime(set_name, SET_NAME_FORMAT)
+                    names = {name for name, value in row.items() if str(value).strip() == "1"}
+                    entries.append(self._legacy_entry(timestamp, names, row.keys(), photo_dir, required_objects, set_name))
+                    seen.add(set_name)
+
+        # Log utama: hanya baris yang tidak punya file Set_*.csv
+        for path in glob.glob(os.path.join(csv_dir, "*_detection_log.csv")):
+            if os.path.basename(path) == EXPORT_FILENAME:
+                continue
+            with open(path, newline="", encoding="utf-8") as csvfile:
+                reader = csv.reader(csvfile)
+                header = next(reader, [])
+                if header[:2] == EXPORT_HEADER:
+                    # Hasil export database (skema baru), bukan log lama
+                    continue
+                for row in itertools.chain([header], reader):
+                    if len(row) < 2 or row[0] == "Timestamp":
+                        continue
+                    timestamp = datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S")
+                    set_name = timestamp.strftime(SET_NAME_FORMAT)
+                    if set_name in seen:
+                        continue
+                    names = {name.strip() for name in row[1].strip('"').split(",") if name.strip()}
+                    entries.append(self._legacy_entry(timestamp, names, names, photo_dir, required_objects, set_name))
+                    seen.add(set_name)
+        return self.record_sets(entries, skip_existing=True)
+
+    @staticmethod
+    def _legacy_entry(timestamp, names, columns, photo_dir, required_objects, set_name):
+        required = set(required_objects) if required_objects else set(columns)
+        image_path = None
+        if photo_dir:
+            candidate = os.path.join(photo_dir, f"{timestamp.strftime(PHOTO_NAME_FORMAT)}.jpg")
+            if os.path.exists(candidate):
+                image_path = candidate
+        return timestamp, names, image_path, required.issubset(names), set_name
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import/export database hasil inspeksi")
+    parser.add_argument("--db", default=os.path.join("data", "clarinet_detection_logs", "inspection_results.db"))
+    parser.add_argument("--import-dir", help="Direktori berisi Set_*.csv dan log CSV lama")
+    parser.add_argument("--photo-dir", help="Direktori foto untuk dikaitkan ke set hasil import")
+    parser.add_argument("--export", help="Export seluruh set ke file CSV")
+    parser.add_argument("--ng-only", action="store_true", help="Export hanya set yang tidak lengkap")
+    args = parser.parse_args()
+
+    store = ResultsStore(args.db)
+    if args.import_dir:
+        imported = store.import_csv_logs(args.import_dir, args.photo_dir)
+        print(f"{imported} set diimport dari {args.import_dir}")
+    if args.export:
+        exported = store.export_csv(args.export, complete=False if args.ng_only else None)
+        print(f"{exported} set diexport ke {args.export}")
+    store.close()
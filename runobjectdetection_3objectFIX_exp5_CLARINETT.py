@@ -3,32 +3,35 @@ import tkinter as tk
 from tkinter import messagebox, filedialog
 import customtkinter as ctk
 from PIL import Image, ImageTk
-import queue
 import threading
-from ultralytics import YOLO
 import os
-import csv
-import pandas as pd
 from datetime import datetime
 import logging
 import sys
+import time
+import math
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from frame_mailbox import LatencyMonitor
+from camera_station import CameraStation
+from detection_engine import DetectionEngine, DEFAULT_DETECTION_CONFIG, DEFAULT_REQUIRED_OBJECTS
+from display_pipeline import FrameDisplay
+from pipeline_metrics import MetricsRegistry, MetricsExporter
+from motion_gate import MotionGate
+from object_tracker import MultiObjectTracker
+from results_store import EXPORT_FILENAME, ResultsStore
+from recipes import DEFAULT_RECIPE_NAME, Recipe, load_recipes
+from submission_writer import SubmissionWriter
+from event_recorder import EventRecorder, PartLossMonitor
+from detection_log import DetectionLogWriter, SOURCE_DETECTOR, SOURCE_REUSED, SOURCE_TRACKER
+from async_logging import setup_async_logging
 
 class AdvancedObjectDetectionSystem:
     def setup_logging(self):
         """Konfigurasi logging profesional"""
         log_dir = os.path.join(os.getcwd(), 'logs')
-        os.makedirs(log_dir, exist_ok=True)
-        log_filename = os.path.join(log_dir, f'object_detection_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_filename, encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
+        # File log dirotasi berdasarkan ukuran (dikompres gzip); penulisan di thread listener terpisah
+        log_filename, self.log_listener, self.log_buffer = setup_async_logging(log_dir)
         logger = logging.getLogger(__name__)
         logger.info("Logging system initialized successfully")
         logger.info(f"Log file created at: {log_filename}")
@@ -37,27 +40,32 @@ class AdvancedObjectDetectionSystem:
     def log_message(self, message, level="info"):
         """Metode umum untuk logging dengan berbagai level"""
         try:
+            # Hanya enqueue; file, console dan panel GUI ditangani thread listener
             log_method = getattr(self.logger, level.lower(), self.logger.info)
             log_method(message)
-            if hasattr(self, 'log_textbox'):
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                log_entry = f"[{timestamp}] {message}\n"
-                if hasattr(self, 'root'):
-                    self.root.after(0, self._update_log_textbox, log_entry)
         except Exception as e:
             print(f"Logging error: {e}")
             print(f"Original message: {message}")
 
-    def _update_log_textbox(self, message):
-        """Update log textbox dengan pesan baru"""
+    def refresh_log_view(self):
+        """Tick refresh panel log: sisipkan baris baru sekaligus, batasi jumlah baris textbox"""
         try:
-            if hasattr(self, 'log_textbox'):
-                self.log_textbox.insert("end", message)
+            lines = self.log_buffer.drain()
+            if lines:
+                self.log_textbox.insert("end", "".join(lines))
+                line_count = int(self.log_textbox.index("end-1c").split(".")[0])
+                excess = line_count - self.log_view_max_lines
+                if excess > 0:
+                    self.log_textbox.delete("1.0", f"{excess + 1}.0")
                 self.log_textbox.see("end")
         except Exception as e:
             print(f"Error updating log textbox: {e}")
+        if self.running:
+            self.root.after(self.log_view_interval_ms, self.refresh_log_view)
 
     def __init__(self, root):
+        startup_start = time.perf_counter()
+        self.startup_timings = {}
         self.logger = self.setup_logging()
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
@@ -68,39 +76,207 @@ class AdvancedObjectDetectionSystem:
         # Mengizinkan resize
         self.root.resizable(True, True)
         self.root.minsize(1200, 800)  # Ukuran minimum agar sesuai gambar
+        # Tutup window lewat quit_app agar data yang masih antri tetap tersimpan
+        self.root.protocol("WM_DELETE_WINDOW", self.quit_app)
 
         self.base_path = r"D:\DATA\FOR_DL\objectdetection\magang2025"
         self.model_path = os.path.join(self.base_path, "trainedclarinettes_yolov8n.pt")
         self.photo_dir = os.path.join(self.base_path, "clarinet_captured_photos")
         self.csv_dir = os.path.join(self.base_path, "clarinet_detection_logs")
-        self.csv_path = os.path.join(self.csv_dir, "clarinet_detection_log.csv")
+        # CSV hanya hasil export dari database; file terpisah agar log CSV lama tidak tertimpa
+        self.csv_path = os.path.join(self.csv_dir, EXPORT_FILENAME)
+        self.db_path = os.path.join(self.csv_dir, "inspection_results.db")
+        # Log biner per frame (segmen detections_*.bin), dibaca dengan detection_log.py
+        self.detection_log_dir = os.path.join(self.csv_dir, "detection_history")
+        # Resep produk per SKU (part wajib + jumlah, opsional, terlarang)
+        self.recipe_path = os.path.join(self.base_path, "recipes.json")
         self.report_dir = os.path.join(self.base_path, "reports")
-
+        # Klip video sekitar event NG (submit ditolak / part hilang)
+        self.event_dir = os.path.join(self.base_path, "ng_events")
+        # File metrik teks Prometheus yang di-scrape collector lokal
+        self.metrics_path = os.path.join(self.report_dir, "pipeline_metrics.prom")
+        self.metrics_interval = 5.0
+        # Sumber kamera stasiun; tambahkan entri untuk sudut lain, misal
+        # {"name": "Samping", "source": 1} untuk kamera barcode dari samping
+        self.camera_sources = [
+            {"name": "Kamera 1", "source": 0, "width": 640, "height": 360, "fps": 30}
+        ]
+
+        phase_start = time.perf_counter()
         self.prepare_directories()
         self.configure_detection_settings()
-
-        self.frame_queue = queue.Queue(maxsize=128)
+        self.record_startup_phase("directories", phase_start)
+
+        # Satu mailbox frame terbaru per kamera: frame yang belum sempat dideteksi digantikan frame baru
+        self.station = CameraStation(self.camera_sources)
+        self.latency_monitor = LatencyMonitor()
+        self.latency_report_interval = 300
+        self.last_result_seq = 0
+        self.last_result_capture_ts = None
+        self.metrics = MetricsRegistry()
+        self.metrics_exporter = None
+        # Thread capture dan deteksi; di-join saat keluar sebelum writer/perekam ditutup
+        self.worker_threads = []
+        self.worker_join_timeout = 3.0
+        self.pending_ui_callbacks = 0
+        # += dari thread worker dan -= di thread Tk bukan operasi atomik
+        self.pending_ui_lock = threading.Lock()
         self.running = True
         self.detection_lock = threading.Lock()
         self.is_fullscreen = False
 
         self.detected_objects = {}
-        self.current_frame = None
-        self.detection_history = []
+        # Hasil inspeksi gabungan semua kamera terakhir (jumlah per part, status resep)
+        self.station_inspection = None
+        # Semua deteksi per frame ditulis ke log biner (bukan list di memori)
+        self.detection_history = DetectionLogWriter(self.detection_log_dir, logger=self.logger)
         self.detection_stats = {
             "total_detections": 0,
             "object_counts": {},
             "confidence_levels": {}
         }
 
-        self.required_objects = {"Accessories Set", "Barcode", "Silica", "Strap", "Lower", "Mouthpiece", "Barrel", "Bell", "Upper"}
-        self.max_allowed_objects = 9
-
+        self.recipes = self.load_recipes()
+        # GUI hanya klien tipis dari engine inspeksi headless
+        self.engine = DetectionEngine(
+            self.model_path, detection_config=self.detection_config, recipe=next(iter(self.recipes.values()))
+        )
+        for camera in self.station:
+            camera.motion_gate = MotionGate.from_config(self.detection_config)
+            camera.tracker = MultiObjectTracker.from_config(self.detection_config)
+        self.init_event_recorders()
+        phase_start = time.perf_counter()
+        self.results_store = self.init_results_store()
+        self.record_startup_phase("results_store", phase_start)
+        # Penulisan gambar dan metadata submit di thread latar agar UI tidak freeze
+        self.submission_writer = SubmissionWriter(self.results_store, target_size=(640, 360), logger=self.logger)
+        self.submission_poll_ms = 100
+        self.root.after(self.submission_poll_ms, self.poll_submissions)
+
+        # UI tampil dulu dalam status "memuat"; model dan kamera disiapkan paralel di thread latar
+        phase_start = time.perf_counter()
+        self.model = None
+        self.cap = None
         self.create_modern_ui()
-        self.model = self.load_model()
-        self.cap = self.init_video_capture()
-        self.start_video_thread()
         self.add_control_features()
+        self.set_loading_state(True)
+        self.record_startup_phase("ui", phase_start)
+        self.startup_start = startup_start
+        # Executor loader dipakai startup dan pemuatan model tambahan (misal imgsz kecil) di luar thread Tk
+        self.loader_pool = ThreadPoolExecutor(max_workers=2)
+        threading.Thread(target=self.startup_worker, daemon=True).start()
+
+    @property
+    def required_objects(self):
+        """Part wajib resep aktif"""
+        return self.engine.required_objects
+
+    def load_recipes(self):
+        """Baca resep produk dari recipes.json; tanpa file dipakai resep clarinet bawaan"""
+        if os.path.exists(self.recipe_path):
+            try:
+                recipes = load_recipes(self.recipe_path)
+                if recipes:
+                    self.log_message(f"{len(recipes)} resep dimuat dari {self.recipe_path}: {', '.join(recipes)}")
+                    return recipes
+            except Exception as e:
+                self.log_message(f"Gagal membaca resep {self.recipe_path}: {e}", level="error")
+        return {DEFAULT_RECIPE_NAME: Recipe.from_required(DEFAULT_REQUIRED_OBJECTS)}
+
+    def init_event_recorders(self):
+        """Satu perekam per kamera; satu proses penulis video dipakai bersama"""
+        # Part wajib yang hilang setelah sempat terlihat (dengan debounce) memicu rekaman
+        self.part_loss = PartLossMonitor.from_config(self.detection_config)
+        self.event_executor = None
+        enabled = self.detection_config["event_recording_enabled"]
+        if enabled:
+            self.event_executor = ProcessPoolExecutor(max_workers=1)
+        for camera in self.station:
+            camera.event_recorder = EventRecorder.from_config(
+                self.detection_config, camera.name, self.event_dir, self.event_executor, self.logger
+            ) if enabled else None
+
+    def trigger_event_recording(self, reason):
+        """Simpan klip pra/pasca event dari semua kamera (tidak blocking)"""
+        started = [camera.name for camera in self.station
+                   if camera.event_recorder is not None and camera.event_recorder.trigger(reason)]
+        if started:
+            self.log_message(f"Rekam event NG ({reason}): {', '.join(started)}", level="warning")
+
+    def change_recipe(self, recipe_name):
+        """Aktifkan resep lain: model hanya diminta kelas resep ini, state per kamera direset"""
+        self.engine.set_recipe(self.recipes[recipe_name])
+        for camera in self.station:
+            camera.tracker.reset()
+            camera.motion_gate.reset()
+            camera.last_inspection = None
+        with self.detection_lock:
+            self.detected_objects = {}
+            self.station_inspection = None
+        self.part_loss.reset()
+        self.build_item_rows()
+        self.log_message(f"Resep aktif: {recipe_name}")
+
+    def record_startup_phase(self, phase, phase_start):
+        """Catat durasi satu fase startup ke log"""
+        elapsed_ms = (time.perf_counter() - phase_start) * 1000
+        self.startup_timings[phase] = elapsed_ms
+        self.log_message(f"Startup fase {phase}: {elapsed_ms:.0f} ms")
+
+    def timed_startup_phase(self, phase, func):
+        phase_start = time.perf_counter()
+        result = func()
+        self.record_startup_phase(phase, phase_start)
+        return result
+
+    def startup_worker(self):
+        """Load model dan buka kamera bersamaan, warm-up model, lalu mulai deteksi live di thread Tk"""
+        model_future = self.loader_pool.submit(self.timed_startup_phase, "model_load", self.load_model)
+        camera_future = self.loader_pool.submit(self.timed_startup_phase, "camera_open", self.init_video_capture)
+        for title, future in (("Model Error", model_future), ("Kamera Error", camera_future)):
+            try:
+                future.result()
+            except Exception as e:
+                self.schedule_ui(self.show_startup_error, title, str(e))
+                return
+        self.model = model_future.result()
+        self.cap = camera_future.result()
+        try:
+            self.timed_startup_phase("warmup", self.warmup_model)
+        except Exception as e:
+            self.log_message(f"Warm-up model gagal: {e}", level="warning")
+        self.schedule_ui(self.on_startup_complete)
+
+    def warmup_model(self):
+        """Inferensi dummy seukuran frame kamera (satu per kamera) agar frame live pertama tidak lambat"""
+        dummy_frames = [np.zeros((camera.height, camera.width, 3), dtype=np.uint8) for camera in self.station]
+        self.engine.predict(dummy_frames)
+
+    def on_startup_complete(self):
+        """Dipanggil di thread Tk setelah model siap dan kamera terbuka"""
+        if not self.running:
+            return
+        try:
+            self.detection_history.set_names(self.engine.names)
+        except Exception as e:
+            self.log_message(f"Gagal menyimpan nama kelas log deteksi: {e}", level="error")
+        self.start_video_thread()
+        self.set_loading_state(False)
+        self.record_startup_phase("total", self.startup_start)
+
+    def show_startup_error(self, title, error_msg):
+        messagebox.showerror(title, error_msg)
+        self.quit_app()
+
+    def set_loading_state(self, loading):
+        """Tampilkan status memuat dan nonaktifkan submit sampai deteksi live berjalan"""
+        if loading:
+            self.status_label.configure(text="Status: Memuat model dan kamera...", text_color="orange")
+            self.capture_btn.configure(state="disabled")
+        else:
+            self.status_label.configure(text="Status: NG", text_color="red")
+            self.displayed_status = "NG"
+            self.capture_btn.configure(state="normal")
 
     def toggle_fullscreen(self):
         """Toggle antara mode fullscreen dan windowed"""
@@ -153,12 +329,15 @@ class AdvancedObjectDetectionSystem:
     def submit_preview(self, image_path):
         """Proses submit setelah preview dikonfirmasi"""
         with self.detection_lock:
-            detected_objects = set(self.detected_objects.keys())
-        if detected_objects == self.required_objects:
+            detected_objects = dict(self.detected_objects)
+            inspection = self.station_inspection
+        if inspection is not None and inspection["complete"]:
             timestamp = datetime.now()
-            filename = os.path.join(self.photo_dir, f"detected_{timestamp.strftime('%Y%m%d_%H%M%S')}.jpg")
+            filename = os.path.join(self.photo_dir, ResultsStore.live_image_name(timestamp))
             os.rename(image_path, filename)
-            self.save_detection_data(timestamp, detected_objects, filename)
+            self.save_detection_data(timestamp, detected_objects, filename, complete=True)
+            # Set lengkap akan diangkat dari tray: jangan anggap sebagai part hilang
+            self.part_loss.reset(disarm=True)
             success_msg = f"Foto dan data berhasil disimpan: {filename}"
             messagebox.showinfo("Sukses", success_msg)
             self.log_message(success_msg)
@@ -167,6 +346,12 @@ class AdvancedObjectDetectionSystem:
         else:
             messagebox.showwarning("Peringatan", "Objek belum lengkap untuk submit.")
 
+    def update_capture_frame(self, frame):
+        """Tampilkan frame BGR (640x360) yang baru disimpan tanpa membaca ulang dari disk"""
+        img_tk = ImageTk.PhotoImage(Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+        self.capture_label.configure(image=img_tk)
+        self.capture_label.image = img_tk
+
     def update_capture_display(self, image_path):
         """Perbarui tampilan hasil tangkapan gambar di kolom kanan (640x360)"""
         # Resize gambar ke 640x360 untuk ukuran normal
@@ -177,8 +362,10 @@ class AdvancedObjectDetectionSystem:
         self.capture_label.image = img_tk
 
     def open_csv_file(self):
-        """Membuka file CSV dengan aplikasi default sistem"""
+        """Export database ke CSV lalu membuka file dengan aplikasi default sistem"""
         try:
+            exported = self.results_store.export_csv(self.csv_path)
+            self.log_message(f"{exported} set diexport ke {self.csv_path}")
             if os.path.exists(self.csv_path):
                 os.startfile(self.csv_path)
                 self.log_message(f"File CSV dibuka: {self.csv_path}")
@@ -189,183 +376,299 @@ class AdvancedObjectDetectionSystem:
             self.log_message(f"Gagal membuka file CSV: {e}", level="error")
             messagebox.showerror("Error", f"Gagal membuka file CSV: {e}")
 
-    def log_detection(self, timestamp, object_names, filename=None):
-        """Logging deteksi ke CSV dengan format khusus (hanya saat submit)"""
-        try:
-            detection_data = [
-                timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-                f'"{object_names}"'
-            ]
-            with open(self.csv_path, 'a', newline='') as csvfile:
-                csv_writer = csv.writer(csvfile)
-                csv_writer.writerow(detection_data)
-            self.log_message(f"Data berhasil dicatat di {self.csv_path}")
-        except Exception as e:
-            error_msg = f"Gagal mencatat data CSV: {e}"
-            self.log_message(error_msg, level="error")
+    def save_detection_data(self, timestamp, detected_objects, image_path, frame=None, complete=None, frame_ref=None):
+        """Serahkan gambar (640x360) dan data kelengkapan ke writer latar"""
+        # Satu baris per set: bitmask part, confidence, path gambar dan ID stasiun
+        if complete is None:
+            complete = self.engine.check_completeness(detected_objects)["complete"]
+        return self.submission_writer.submit(timestamp, frame, detected_objects, image_path, complete, frame_ref)
 
-    def save_detection_data(self, timestamp, detected_objects, image_path):
-        """Simpan data kelengkapan ke file CSV dengan format 1/0 dan gambar sebagai .jpg (640x360)"""
-        # Resize gambar ke 640x360 sebelum menyimpan
-        img = cv2.imread(image_path)
-        if img is not None:
-            resized_img = cv2.resize(img, (640, 360), interpolation=cv2.INTER_AREA)
-            cv2.imwrite(image_path, resized_img)  # Timpa file dengan resolusi baru
-            self.log_message(f"Foto disimpan dengan resolusi 640x360: {image_path}")
-
-        # Buat nama set berdasarkan timestamp
-        set_name = f"Set_{timestamp.strftime('%Y%m%d_%H%M%S')}"
-        # Buat data kelengkapan (1 untuk ada, 0 untuk tidak ada)
-        data = {'Set': [set_name]}
-        for obj in self.required_objects:
-            data[obj] = [1 if obj in detected_objects else 0]
-
-        # Simpan ke CSV
-        df = pd.DataFrame(data)
-        os.makedirs(self.csv_dir, exist_ok=True)
-        csv_filename = os.path.join(self.csv_dir, f"{set_name}.csv")
-        df.to_csv(csv_filename, index=False)
-        self.log_message(f"Data kelengkapan disimpan ke {csv_filename}")
-
-        # Log ke CSV utama hanya saat submit
-        self.log_detection(timestamp, ", ".join(detected_objects), image_path)
+    def poll_submissions(self):
+        """Tick thread Tk: tampilkan hasil job yang sudah ditulis writer"""
+        for job in self.submission_writer.drain_completed():
+            try:
+                self.on_submission_saved(job)
+            except Exception as e:
+                self.log_message(f"Error di callback submission: {e}", level="error")
+        if self.running:
+            self.root.after(self.submission_poll_ms, self.poll_submissions)
+
+    def on_submission_saved(self, job):
+        """Callback di thread Tk setelah writer selesai menulis satu set"""
+        if job.error is not None:
+            error_msg = f"Gagal menyimpan data: {job.error}"
+            self.log_message(error_msg, level="error")
+            messagebox.showerror("Error", error_msg)
+            return
+        if job.image_frame is not None:
+            self.log_message(f"Foto berhasil disimpan: {job.image_path}")
+            self.update_capture_frame(job.image_frame)  # Tampilkan di "Hasil Tangkapan Gambar"
+        self.log_message(f"Data kelengkapan disimpan ke {self.db_path}")
 
     def prepare_directories(self):
         """Persiapan direktori dengan logging"""
-        directories = [self.photo_dir, self.base_path, self.report_dir, self.csv_dir]
+        directories = [self.photo_dir, self.base_path, self.report_dir, self.csv_dir, self.event_dir]
         for dir_path in directories:
             try:
                 os.makedirs(dir_path, exist_ok=True)
                 self.log_message(f"Direktori berhasil dibuat: {dir_path}")
             except Exception as e:
                 self.log_message(f"Gagal membuat direktori {dir_path}: {e}", level="error")
-        if not os.path.exists(self.csv_path):
+
+    def init_results_store(self):
+        """Buka database hasil; import CSV lama saat database masih kosong"""
+        store = ResultsStore(self.db_path)
+        if store.is_empty():
             try:
-                with open(self.csv_path, 'w', newline='') as csvfile:
-                    csv_writer = csv.writer(csvfile)
-                    csv_writer.writerow(['Timestamp', 'Daftar Objek'])
-                self.log_message(f"File CSV baru dibuat: {self.csv_path}")
+                imported = store.import_csv_logs(self.csv_dir, self.photo_dir, self.required_objects)
+                if imported:
+                    self.log_message(f"{imported} set dari CSV lama diimport ke {self.db_path}")
             except Exception as e:
-                self.log_message(f"Gagal membuat file CSV: {e}", level="error")
+                self.log_message(f"Gagal import CSV lama: {e}", level="error")
+        return store
 
     def configure_detection_settings(self):
         """Konfigurasi pengaturan deteksi lanjutan"""
-        self.detection_config = {
-            "confidence_threshold": 0.3,
-            "nms_threshold": 0.5,
-            "tracking_enabled": False,
-            "alert_mode": False,
-            "min_detection_area": 100
-        }
+        self.detection_config = dict(DEFAULT_DETECTION_CONFIG)
+        # Motion gate: pakai ulang hasil terakhir selama tray statis
+        self.detection_config.update({
+            "motion_gate_enabled": True,
+            "motion_pixel_threshold": 12,  # Selisih intensitas minimum per piksel (frame 160x90)
+            "motion_changed_fraction": 0.002,  # Fraksi piksel berubah untuk memicu inferensi
+            "motion_max_skip_seconds": 1.0  # Inferensi paksa minimal sekali per interval ini
+        })
+        # Perekam event NG: ring JPEG beberapa detik terakhir, klip ditulis proses latar
+        self.detection_config.update({
+            "event_recording_enabled": False,
+            "event_pre_seconds": 5.0,
+            "event_post_seconds": 3.0,
+            "event_record_fps": 10,
+            "event_jpeg_quality": 70,
+            # Part dianggap hilang jika absen sekian inspeksi berturut-turut dan minimal sekian detik
+            "event_part_loss_inspections": 5,
+            "event_part_loss_seconds": 1.0
+        })
+        # Tiling ROI: kamera dibuka di resolusi tinggi, hanya ROI inspeksi yang dipotong menjadi tile
+        self.detection_config.update({
+            "tiling_enabled": False,
+            "tiling_camera_size": (1920, 1080),
+            "tiling_roi": None  # Misal (320, 120, 1600, 1000) untuk area tray saja
+        })
+        if self.detection_config["tiling_enabled"]:
+            width, height = self.detection_config["tiling_camera_size"]
+            for source in self.camera_sources:
+                source.update({"width": width, "height": height})
 
     def load_model(self):
         """Load model dengan error handling komprehensif"""
         try:
-            model = YOLO(self.model_path)
-            self.log_message(f"Model berhasil dimuat dari {self.model_path}")
+            model = self.engine.load_model(logger=self.logger)
+            self.log_message(
+                f"Model berhasil dimuat dari {self.model_path} "
+                f"(backend: {self.detection_config['inference_backend']})"
+            )
             return model
         except Exception as e:
             error_msg = f"Gagal memuat model: {str(e)}"
             self.log_message(error_msg, level="error")
-            messagebox.showerror("Model Error", error_msg)
-            self.root.quit()
+            # Dipanggil dari thread startup: dialog error ditampilkan di thread Tk oleh startup_worker
+            raise RuntimeError(error_msg) from e
 
     def init_video_capture(self):
-        """Inisialisasi capture video dengan error handling untuk resolusi normal (640x360)"""
+        """Inisialisasi semua kamera stasiun dengan error handling (resolusi normal 640x360)"""
         try:
-            cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-            if not cap.isOpened():
-                raise IOError("Tidak dapat membuka kamera")
-            # Atur resolusi normal 640x360 (16:9)
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 360)
-            cap.set(cv2.CAP_PROP_FPS, 30)
-            self.log_message("Video capture berhasil diinisialisasi dengan resolusi 640x360")
-            return cap
+            self.station.open_all()
+            for camera in self.station:
+                self.log_message(
+                    f"Video capture {camera.name} berhasil diinisialisasi dengan resolusi {camera.width}x{camera.height}"
+                )
+            return self.station.primary.cap
         except Exception as e:
             error_msg = f"Gagal menginisialisasi video capture: {e}"
             self.log_message(error_msg, level="error")
-            messagebox.showerror("Kamera Error", error_msg)
-            self.root.quit()
+            raise RuntimeError(error_msg) from e
 
     def start_video_thread(self):
-        """Memulai thread video capture dan deteksi"""
-        capture_thread = threading.Thread(target=self.video_capture_thread, daemon=True)
-        capture_thread.start()
+        """Memulai thread video capture (satu per kamera) dan satu thread deteksi"""
+        for camera in self.station:
+            capture_thread = threading.Thread(target=self.video_capture_thread, args=(camera,), daemon=True)
+            capture_thread.start()
+            self.worker_threads.append(capture_thread)
         detection_thread = threading.Thread(target=self.detection_thread, daemon=True)
         detection_thread.start()
-
-    def video_capture_thread(self):
-        """Thread untuk capture video dengan resolusi 640x360"""
+        self.worker_threads.append(detection_thread)
+        for camera in self.station:
+            camera.display.start()
+        self.metrics_exporter = MetricsExporter(self.metrics, self.metrics_path, self.metrics_interval, self.logger).start()
+        self.root.after(1000, self.refresh_metrics_panel)
+
+    def video_capture_thread(self, camera):
+        """Thread untuk capture video satu kamera dengan resolusi 640x360"""
         while self.running:
             try:
-                ret, frame = self.cap.read()
-                if not ret:
-                    self.log_message("Gagal membaca frame dari kamera", level="warning")
-                    break
-                self.current_frame = frame.copy()
                 # Tidak perlu resize lagi karena sudah 640x360
-                if not self.frame_queue.full():
-                    self.frame_queue.put(frame)
+                packet = camera.read()
+                if packet is None:
+                    self.log_message(f"Gagal membaca frame dari {camera.name}", level="warning")
+                    break
+                self.metrics.mark("capture_frames")
+                recorder = camera.event_recorder
+                if recorder is not None and recorder.due(packet.capture_ts):
+                    # Ring perekam menahan buffer sampai di-encode JPEG di thread perekam
+                    recorder.add(camera.acquire_current(), packet.capture_ts)
             except Exception as e:
-                self.log_message(f"Error di video capture thread: {e}", level="error")
+                self.log_message(f"Error di video capture thread {camera.name}: {e}", level="error")
                 break
 
     def detection_thread(self):
-        """Thread deteksi objek dengan validasi ketat"""
+        """Thread deteksi objek dengan validasi ketat (frame terbaru semua kamera dalam satu batch)"""
         while self.running:
             try:
-                frame = self.frame_queue.get(timeout=1)
-                # Gunakan frame asli 640x360 untuk deteksi
-                results = self.model(frame)
-                filtered_objects = self.advanced_object_filtering(results)
-                self.detected_objects = {obj["name"]: obj for obj in filtered_objects}
-                self.root.after(0, self.update_detection_status)
-                display_frame = frame.copy()  # Gunakan frame asli untuk tampilan (640x360)
-                for obj in filtered_objects:
-                    x1, y1, x2, y2 = obj["bbox"]
-                    name = obj["name"]
-                    conf = obj["confidence"]
-                    color_map = {
-                        "Accessories Set": (255, 0, 0),
-                        "Barcode": (0, 255, 0),
-                        "Silica": (0, 0, 255),
-                        "Strap": (255, 165, 0),
-                        "Lower": (128, 0, 128),
-                        "Mouthpiece": (255, 255, 0),
-                        "Barrel": (0, 255, 255),
-                        "Bell": (255, 0, 255),
-                        "Upper": (75, 0, 130)
-                    }
-                    color = color_map.get(name, (255, 255, 255))
-                    cv2.rectangle(display_frame, (x1, y1), (x2, y2), color, 2)
-                    label = f"{name} {conf:.2f}"
-                    cv2.putText(display_frame, label, (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-                self.display_frame(display_frame)
-            except queue.Empty:
-                continue
+                packets = self.station.wait_packets(timeout=1)
+                if packets:
+                    try:
+                        self.process_packets(packets)
+                    finally:
+                        # Buffer frame kembali ke pool kamera setelah deteksi dan tampilan selesai
+                        for _, packet in packets:
+                            packet.release()
             except Exception as e:
                 self.log_message(f"Error di detection thread: {e}", level="error")
 
+    def process_packets(self, packets):
+        """Motion gate dan tracker per kamera, lalu satu panggilan model untuk kamera yang perlu dideteksi"""
+        tracking = self.detection_config["tracking_enabled"]
+        inference_start = time.perf_counter()
+        to_detect, updated = [], []
+        sources = {}
+        for camera, packet in packets:
+            frame = packet.frame
+            if self.detection_config["motion_gate_enabled"] and camera.last_inspection is not None:
+                with self.metrics.timer("motion_gate"):
+                    run_inference = camera.motion_gate.should_infer(frame)
+                if not run_inference:
+                    # Scene statis: pakai ulang hasil inferensi terakhir kamera ini
+                    self.metrics.inc("motion_gate_skips")
+                    sources[camera.camera_id] = SOURCE_REUSED
+                    continue
+                # Hit hanya dihitung saat gate aktif dan meloloskan frame ke inferensi
+                self.metrics.inc("motion_gate_hits")
+            if tracking and not camera.tracker.needs_detection(
+                    self.detection_config["tracking_detect_interval"],
+                    self.detection_config["confidence_threshold"]):
+                # Di antara deteksi: propagasi bbox dengan tracker
+                with self.metrics.timer("track"):
+                    camera.last_inspection = self.engine.inspect(camera.tracker.propagate(frame))
+                self.metrics.inc("tracked_frames")
+                sources[camera.camera_id] = SOURCE_TRACKER
+                updated.append((camera, packet))
+            else:
+                sources[camera.camera_id] = SOURCE_DETECTOR
+                to_detect.append((camera, packet))
+
+        if to_detect:
+            # Gunakan frame asli 640x360 untuk deteksi; satu model untuk semua kamera
+            frames = [packet.frame for _, packet in to_detect]
+            if self.detection_config["tiling_enabled"]:
+                # Tile ROI semua kamera dalam satu batch; box dipetakan kembali ke koordinat frame kamera
+                with self.metrics.timer("infer"):
+                    inspections = self.engine.predict_tiled(frames)
+                self.metrics.set_gauge("tiles_per_batch", sum(inspection["tiles"] for inspection in inspections))
+            elif self.detection_config["adaptive_resolution_enabled"]:
+                # Pass imgsz kecil, ulang di imgsz penuh hanya untuk frame yang ambigu
+                escalated_before = self.engine.adaptive_stats["escalated"]
+                with self.metrics.timer("infer"):
+                    inspections = self.engine.predict_adaptive(frames)
+                self.metrics.inc("adaptive_escalations", self.engine.adaptive_stats["escalated"] - escalated_before)
+            else:
+                infer_start = time.perf_counter()
+                results = self.engine.run_model(frames)
+                self.metrics.observe("infer", time.perf_counter() - infer_start)
+                with self.metrics.timer("filter"):
+                    inspections = self.engine.postprocess(results)
+            for (camera, packet), inspection in zip(to_detect, inspections):
+                if tracking:
+                    inspection = self.engine.inspect(camera.tracker.update(packet.frame, inspection["objects"]))
+                camera.last_inspection = inspection
+            self.metrics.inc("detector_frames", len(to_detect))
+            self.metrics.set_gauge("inference_batch_size", len(to_detect))
+            updated.extend(to_detect)
+        inference_time = time.perf_counter() - inference_start
+
+        if updated:
+            # Kelengkapan = union part dari semua sudut kamera
+            merged = self.engine.merge_inspections(
+                [camera.last_inspection for camera in self.station if camera.last_inspection is not None]
+            )
+            oldest_camera, oldest_packet = min(updated, key=lambda item: item[1].capture_ts)
+            with self.detection_lock:
+                self.detected_objects = merged["detected_objects"]
+                self.station_inspection = merged
+                self.last_result_seq = oldest_packet.seq
+                self.last_result_capture_ts = oldest_packet.capture_ts
+            self.schedule_ui(self.update_detection_status, oldest_packet, inference_time, oldest_camera)
+            if self.event_executor is not None:
+                lost = self.part_loss.update(self.required_objects - merged["missing"])
+                if lost:
+                    self.trigger_event_recording(f"part hilang: {', '.join(sorted(lost))}")
+
+        # perf_counter capture -> epoch agar log bisa dianalisis per shift
+        epoch_offset = time.time() - time.perf_counter()
+        for camera, packet in packets:
+            if camera.last_inspection is None:
+                continue
+            self.detection_history.append(packet.seq, packet.capture_ts + epoch_offset, camera.camera_id,
+                                          camera.last_inspection["objects"], sources[camera.camera_id])
+            # Overlay digambar di frame tampilan hasil resize, buffer kamera tidak disalin
+            with self.metrics.timer("display"):
+                camera.display.submit(packet.frame, camera.last_inspection["objects"])
+        self.metrics.mark("detection_frames")
+        self.metrics.set_gauge("frame_mailbox_depth", self.station.queue_depth())
+        self.metrics.set_gauge("frames_dropped", self.station.dropped_frames())
+        self.metrics.set_gauge("frames_pool_exhausted", self.station.pool_exhausted())
+
+    def motion_gate_stats(self):
+        """Statistik motion gate gabungan semua kamera"""
+        hits = sum(camera.motion_gate.hits for camera in self.station)
+        skips = sum(camera.motion_gate.skips for camera in self.station)
+        total = hits + skips
+        return {"hits": hits, "skips": skips, "skip_ratio": skips / total if total else 0.0}
+
+    def schedule_ui(self, callback, *args, delay=0):
+        """Jadwalkan callback di thread Tk sambil mengukur antrian dan delay callback"""
+        scheduled_at = time.perf_counter()
+        with self.pending_ui_lock:
+            self.pending_ui_callbacks += 1
+
+        def run_callback():
+            with self.pending_ui_lock:
+                self.pending_ui_callbacks -= 1
+            started = time.perf_counter()
+            self.metrics.observe("ui_callback_delay", started - scheduled_at)
+            try:
+                callback(*args)
+            finally:
+                self.metrics.observe("ui_update", time.perf_counter() - started)
+
+        self.root.after(delay, run_callback)
+
+    def refresh_metrics_panel(self):
+        """Perbarui panel metrik live (FPS, waktu inferensi, kedalaman antrian)"""
+        if not self.running:
+            return
+        queue_depth = self.station.queue_depth() + self.pending_ui_callbacks
+        self.metrics.set_gauge("ui_pending_callbacks", self.pending_ui_callbacks)
+        self.metrics_label.configure(
+            text=f"FPS: {self.metrics.rate('detection_frames'):.1f} | "
+                 f"Inferensi: {self.metrics.stage_ms('infer'):.0f} ms | "
+                 f"Antrian: {queue_depth} | "
+                 f"Skip: {self.motion_gate_stats()['skip_ratio'] * 100:.0f}%"
+        )
+        self.root.after(1000, self.refresh_metrics_panel)
+
     def advanced_object_filtering(self, results):
         """Filtering objek dengan kriteria lanjutan"""
-        filtered_objects = []
-        for result in results:
-            for box in result.boxes:
-                conf = float(box.conf[0])
-                class_id = int(box.cls[0])
-                object_name = self.model.names[class_id]
-                if conf > self.detection_config["confidence_threshold"]:
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                    area = (x2 - x1) * (y2 - y1)
-                    if area > self.detection_config["min_detection_area"]:
-                        filtered_objects.append({
-                            "name": object_name,
-                            "confidence": conf,
-                            "bbox": (x1, y1, x2, y2),
-                            "area": area
-                        })
-        return filtered_objects
+        return self.engine.advanced_object_filtering(results)
 
     def update_detection_stats(self, detected_objects):
         """Perbarui statistik deteksi"""
@@ -381,52 +684,91 @@ class AdvancedObjectDetectionSystem:
             else:
                 self.detection_stats["confidence_levels"][name] = (self.detection_stats["confidence_levels"][name] + conf) / 2
 
-    def update_detection_status(self):
+    def update_detection_status(self, packet=None, inference_time=0.0, camera=None):
         """Update status deteksi di UI (tanpa logging ke CSV secara terus menerus)"""
         with self.detection_lock:
-            detected = set(self.detected_objects.keys())
-        status = "Lengkap" if self.required_objects.issubset(detected) else "NG"
-        if status == "Lengkap":
-            self.status_label.configure(text=f"Status: {status}", text_color="green")
-        else:
-            self.status_label.configure(text=f"Status: {status}", text_color="red")
-        items_text = "List Barang:\n"
-        for obj in self.required_objects:
-            status_text = "ada" if obj in detected else "tidak ada"
-            items_text += f"- {obj}: {status_text}\n"
-        self.items_list.delete("1.0", ctk.END)
-        self.items_list.insert("1.0", items_text)
+            inspection = self.station_inspection
+        if inspection is not None:
+            status = inspection["status"]
+            if status != self.displayed_status:
+                self.status_label.configure(text=f"Status: {status}", text_color="green" if status == "Lengkap" else "red")
+                self.displayed_status = status
+            # Hanya baris part yang berubah yang dikonfigurasi ulang
+            counts = inspection["counts"]
+            compiled = self.engine.compiled_recipe
+            for part, row in self.item_rows.items():
+                state = self.item_row_state(part, counts, compiled)
+                if state != row[1]:
+                    row[0].configure(text=state[0], text_color=state[1])
+                    row[1] = state
         # Menghapus log ke CSV yang otomatis di sini
-
-    def display_frame(self, frame):
+        if packet is not None:
+            self.record_status_latency(packet, inference_time, camera or self.station.primary)
+
+    def item_row_state(self, part, counts, compiled):
+        """Teks dan warna satu baris part di List Barang"""
+        recipe = self.engine.recipe
+        class_id = compiled.name_to_id.get(part)
+        count = int(counts[class_id]) if class_id is not None and class_id < len(counts) else 0
+        if part in recipe.forbidden:
+            return (f"- {part} (terlarang): ada", "red") if count else (f"- {part} (terlarang): tidak ada", "white")
+        if part in recipe.optional:
+            return f"- {part} (opsional): {'ada' if count else 'tidak ada'}", "white"
+        quantity = recipe.required[part]
+        if quantity > 1:
+            return f"- {part}: {count}/{quantity}", "white" if count >= quantity else "red"
+        return (f"- {part}: ada", "white") if count else (f"- {part}: tidak ada", "red")
+
+    def build_item_rows(self):
+        """Bangun ulang baris List Barang untuk resep aktif (satu label per part)"""
+        for widget in self.items_frame.winfo_children():
+            widget.destroy()
+        ctk.CTkLabel(self.items_frame, text="List Barang:", text_color="white", anchor="w").pack(fill="x", padx=5)
+        recipe = self.engine.recipe
+        parts = sorted(recipe.required) + sorted(recipe.optional) + sorted(recipe.forbidden)
+        self.item_rows = {}
+        for part in parts:
+            label = ctk.CTkLabel(self.items_frame, text=f"- {part}: -", text_color="white", anchor="w")
+            label.pack(fill="x", padx=5)
+            self.item_rows[part] = [label, None]
+        self.displayed_status = None
+
+    def record_status_latency(self, packet, inference_time, camera):
+        """Catat latensi glass-to-status dan laporkan secara berkala ke log"""
+        self.latency_monitor.record(packet, inference_time, camera.mailbox.latest_seq)
+        if self.latency_monitor.samples % self.latency_report_interval == 0:
+            summary = self.latency_monitor.summary()
+            self.log_message(
+                "Latensi glass-to-status: p50 {latency_p50_ms:.1f} ms, p95 {latency_p95_ms:.1f} ms, "
+                "max {latency_max_ms:.1f} ms | inferensi p50 {inference_p50_ms:.1f} ms | "
+                "p95 latensi/inferensi {latency_per_inference_p95:.2f} | "
+                "maks tertinggal {max_frames_behind} frame".format(**summary)
+            )
+            self.log_message(
+                f"Frame dibuang (digantikan frame terbaru): {self.station.dropped_frames()}"
+            )
+            gate_stats = self.motion_gate_stats()
+            self.log_message(
+                f"Motion gate: inferensi {gate_stats['hits']}, dilewati {gate_stats['skips']} "
+                f"(rasio skip {gate_stats['skip_ratio']:.1%})"
+            )
+            if self.detection_config["adaptive_resolution_enabled"]:
+                adaptive = self.engine.adaptive_stats
+                self.log_message(
+                    f"Resolusi adaptif: {adaptive['escalated']}/{adaptive['frames']} frame diulang di imgsz penuh "
+                    f"(rasio {self.engine.escalation_rate():.1%}; part hilang {adaptive['missing']}, "
+                    f"confidence ragu {adaptive['uncertain']})"
+                )
+
+    @property
+    def current_frame(self):
+        """Frame terbaru kamera utama (dipakai untuk foto submit)"""
+        return self.station.primary.current_frame
+
+    def display_frame(self, frame, camera=None, objects=None):
         """Tampilkan frame di GUI (sesuai ukuran layar, minimal 640x360)"""
-        # Hitung ukuran layar saat ini
-        screen_width = self.root.winfo_width()
-        screen_height = self.root.winfo_height()
-        aspect_ratio = 16 / 9  # Rasio 16:9
-
-        # Tentukan ukuran minimum berdasarkan program (640x360 untuk rasio 16:9)
-        min_width = 640
-        min_height = 360
-
-        # Tentukan ukuran maksimum berdasarkan layar (menjaga rasio 16:9)
-        max_width = int(screen_width * 0.33)  # 1/3 lebar layar untuk kolom kamera
-        max_height = int(max_width / aspect_ratio)  # Hitung tinggi berdasarkan rasio
-
-        # Gunakan ukuran minimum jika layar lebih kecil dari ukuran minimum
-        display_width = max(min_width, min(max_width, 640))
-        display_height = max(min_height, min(max_height, 360))
-
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img = Image.fromarray(frame_rgb)
-        img_resized = img.resize((display_width, display_height), Image.LANCZOS)
-        imgtk = ImageTk.PhotoImage(image=img_resized)
-        self.root.after(10, self.update_video_label, imgtk)
-
-    def update_video_label(self, imgtk):
-        """Update label video"""
-        self.video_label.configure(image=imgtk)
-        self.video_label.image = imgtk
+        # Resize di thread ini; thread Tk hanya blit frame terbaru pada tick refresh berikutnya
+        (camera or self.station.primary).display.submit(frame, objects)
 
     def create_modern_ui(self):
         """Membuat antarmuka pengguna modern dengan CustomTkinter sesuai layout gambar"""
@@ -443,8 +785,18 @@ class AdvancedObjectDetectionSystem:
         camera_frame.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
         ctk.CTkLabel(camera_frame, text="Tampilan Kamera Realtime", font=("Helvetica", 14, "bold"), 
                      text_color="white").pack(pady=5)
-        self.video_label = ctk.CTkLabel(camera_frame, text="")
-        self.video_label.pack(expand=True, fill="both", padx=5, pady=5)
+        # Satu tile per kamera (grid persegi)
+        tiles_frame = ctk.CTkFrame(camera_frame, fg_color="#3a3a3a")
+        tiles_frame.pack(expand=True, fill="both", padx=5, pady=5)
+        grid_columns = math.ceil(math.sqrt(len(self.station)))
+        self.video_labels = []
+        for index, camera in enumerate(self.station):
+            video_label = ctk.CTkLabel(tiles_frame, text="" if len(self.station) == 1 else camera.name,
+                                       compound="top")
+            video_label.grid(row=index // grid_columns, column=index % grid_columns, padx=2, pady=2, sticky="nsew")
+            camera.display = FrameDisplay(self.root, video_label, metrics=self.metrics, grid_columns=grid_columns)
+            self.video_labels.append(video_label)
+        self.video_label = self.video_labels[0]
 
         # Kolom Tengah: Cek Kelengkapan
         check_frame = ctk.CTkFrame(main_frame, fg_color="#3a3a3a", border_width=1, border_color="black")
@@ -457,10 +809,21 @@ class AdvancedObjectDetectionSystem:
                                        font=("Helvetica", 16, "bold"))
         self.status_label.pack(pady=5)
 
-        # List Barang
-        self.items_list = ctk.CTkTextbox(check_frame, height=300, width=200, fg_color="#4a4a4a", 
-                                        text_color="white")
-        self.items_list.pack(expand=True, fill="both", padx=5, pady=5)
+        # Panel metrik live
+        self.metrics_label = ctk.CTkLabel(check_frame, text="FPS: - | Inferensi: - ms | Antrian: -",
+                                          text_color="#bbbbbb", font=("Helvetica", 12))
+        self.metrics_label.pack(pady=2)
+
+        # Pilihan resep produk (SKU)
+        self.recipe_var = ctk.StringVar(value=self.engine.recipe.name)
+        self.recipe_menu = ctk.CTkOptionMenu(check_frame, values=list(self.recipes), variable=self.recipe_var,
+                                             command=self.change_recipe)
+        self.recipe_menu.pack(pady=2)
+
+        # List Barang: satu baris per part, diperbarui hanya saat statusnya berubah
+        self.items_frame = ctk.CTkScrollableFrame(check_frame, height=300, width=200, fg_color="#4a4a4a")
+        self.items_frame.pack(expand=True, fill="both", padx=5, pady=5)
+        self.build_item_rows()
 
         # Kolom Kanan: Hasil Tangkapan Gambar
         capture_frame = ctk.CTkFrame(main_frame, fg_color="#3a3a3a", border_width=1, border_color="black")
@@ -475,6 +838,9 @@ class AdvancedObjectDetectionSystem:
         self.log_frame.grid(row=1, column=0, columnspan=3, padx=5, pady=5, sticky="nsew")
         self.log_textbox = ctk.CTkTextbox(self.log_frame, height=150, fg_color="#4a4a4a", text_color="white")
         self.log_textbox.pack(expand=True, fill="both", padx=5, pady=5)
+        self.log_view_max_lines = 500
+        self.log_view_interval_ms = 250
+        self.root.after(self.log_view_interval_ms, self.refresh_log_view)
 
         # Tombol di bagian bawah, termasuk toggle fullscreen
         button_frame = ctk.CTkFrame(main_frame, fg_color="#2b2b2b", border_width=1, border_color="black")
@@ -498,32 +864,42 @@ class AdvancedObjectDetectionSystem:
         self.fullscreen_btn.grid(row=0, column=3, padx=5, pady=5)
 
     def submit_data(self):
-        """Mengambil foto dan menyimpan data kelengkapan ke .jpg dan .csv"""
+        """Mengambil foto dan menyimpan data kelengkapan ke .jpg dan database hasil"""
         with self.detection_lock:
-            detected_objects = set(self.detected_objects.keys())
+            detected_objects = dict(self.detected_objects)
+            inspection = self.station_inspection
 
-        if detected_objects == self.required_objects:
+        if inspection is not None and inspection["complete"]:
             timestamp = datetime.now()
             # Simpan gambar sebagai .jpg (640x360)
-            image_filename = os.path.join(self.photo_dir, f"detected_{timestamp.strftime('%Y%m%d_%H%M%S')}.jpg")
-            if self.current_frame is not None:
-                try:
-                    cv2.imwrite(image_filename, self.current_frame)
-                    self.log_message(f"Foto berhasil disimpan: {image_filename}")
-                    self.update_capture_display(image_filename)  # Tampilkan di "Hasil Tangkapan Gambar"
-                except Exception as e:
-                    error_msg = f"Gagal menyimpan foto: {e}"
-                    messagebox.showerror("Error", error_msg)
-                    self.log_message(error_msg, level="error")
-
-            # Simpan data kelengkapan ke .csv
-            self.save_detection_data(timestamp, detected_objects, image_filename)
-            success_msg = "Data dan foto berhasil disimpan."
+            # Nama foto beresolusi milidetik seperti nama set: submit di detik yang sama tidak saling menimpa
+            image_filename = os.path.join(self.photo_dir, ResultsStore.live_image_name(timestamp))
+            # Frame tidak disalin: buffer pool ditahan (retain) sampai writer selesai meng-encode
+            frame_ref = self.station.primary.acquire_current()
+            frame = frame_ref.array if frame_ref is not None else None
+            # Gambar dan data kelengkapan ditulis writer latar; hasilnya dilaporkan lewat on_submission_saved
+            try:
+                self.save_detection_data(timestamp, detected_objects, image_filename if frame is not None else None,
+                                         frame, complete=True, frame_ref=frame_ref)
+            except Exception:
+                if frame_ref is not None:
+                    frame_ref.release()
+                raise
+            # Set lengkap akan diangkat dari tray: jangan anggap sebagai part hilang
+            self.part_loss.reset(disarm=True)
+            success_msg = "Data dan foto dikirim untuk disimpan."
             messagebox.showinfo("Sukses", success_msg)
             self.log_message(success_msg)
         else:
-            missing = self.required_objects - detected_objects
-            warning_msg = f"Objek belum lengkap. Kurang: {', '.join(missing)}" if missing else "Harus lengkap 9 objek untuk submit."
+            missing = inspection["missing"] if inspection is not None else self.required_objects
+            forbidden = inspection["forbidden"] if inspection is not None else set()
+            if missing:
+                warning_msg = f"Objek belum lengkap. Kurang: {', '.join(sorted(missing))}"
+            elif forbidden:
+                warning_msg = f"Ada part terlarang untuk resep {self.engine.recipe.name}: {', '.join(sorted(forbidden))}"
+            else:
+                warning_msg = "Harus lengkap sesuai resep untuk submit."
+            self.trigger_event_recording(f"submit ditolak: {warning_msg}")
             messagebox.showwarning("Peringatan", warning_msg)
             self.log_message(warning_msg, level="warning")
 
@@ -549,7 +925,7 @@ class AdvancedObjectDetectionSystem:
         self.confidence_slider.set(self.detection_config["confidence_threshold"])
         self.confidence_slider.pack(side="left", padx=5)
 
-        self.tracking_var = ctk.BooleanVar(value=False)
+        self.tracking_var = ctk.BooleanVar(value=self.detection_config["tracking_enabled"])
         self.tracking_switch = ctk.CTkSwitch(
             control_frame,
             text="Object Tracking",
@@ -558,23 +934,120 @@ class AdvancedObjectDetectionSystem:
         )
         self.tracking_switch.pack(side="left", padx=5)
 
+        self.motion_gate_var = ctk.BooleanVar(value=self.detection_config["motion_gate_enabled"])
+        self.motion_gate_switch = ctk.CTkSwitch(
+            control_frame,
+            text="Motion Gate",
+            variable=self.motion_gate_var,
+            command=self.toggle_motion_gate
+        )
+        self.motion_gate_switch.pack(side="left", padx=5)
+
+        self.adaptive_var = ctk.BooleanVar(value=self.detection_config["adaptive_resolution_enabled"])
+        self.adaptive_switch = ctk.CTkSwitch(
+            control_frame,
+            text="Resolusi Adaptif",
+            variable=self.adaptive_var,
+            command=self.toggle_adaptive_resolution
+        )
+        self.adaptive_switch.pack(side="left", padx=5)
+
     def toggle_tracking(self):
         """Toggle object tracking mode"""
         tracking_enabled = self.tracking_var.get()
         self.detection_config["tracking_enabled"] = tracking_enabled
+        for camera in self.station:
+            camera.tracker.reset()
         tracking_status = "enabled" if tracking_enabled else "disabled"
         self.log_message(f"Object tracking {tracking_status}")
 
+    def toggle_motion_gate(self):
+        """Toggle motion gate (lewati inferensi saat scene statis)"""
+        enabled = self.motion_gate_var.get()
+        self.detection_config["motion_gate_enabled"] = enabled
+        for camera in self.station:
+            camera.motion_gate.reset()
+        stats = self.motion_gate_stats()
+        self.log_message(
+            f"Motion gate {'enabled' if enabled else 'disabled'} "
+            f"(inferensi: {stats['hits']}, dilewati: {stats['skips']}, rasio skip: {stats['skip_ratio']:.1%})"
+        )
+
+    def toggle_adaptive_resolution(self):
+        """Toggle resolusi adaptif (pass imgsz kecil, eskalasi ke imgsz penuh saat ambigu)"""
+        enabled = self.adaptive_var.get()
+        if not enabled:
+            self.set_adaptive_resolution(False)
+            return
+        if self.model is None:
+            self.adaptive_var.set(False)
+            self.log_message("Model belum siap; resolusi adaptif belum bisa diaktifkan", level="warning")
+            return
+        # Model imgsz kecil (bisa export ONNX/OpenVINO puluhan detik) disiapkan di executor loader;
+        # mode baru aktif setelah model siap, switch dikunci selama pemuatan
+        self.adaptive_switch.configure(state="disabled")
+        self.log_message(f"Menyiapkan model imgsz {self.detection_config['adaptive_low_imgsz']} untuk resolusi adaptif")
+        future = self.loader_pool.submit(self.engine.model_for_imgsz, self.detection_config["adaptive_low_imgsz"])
+        future.add_done_callback(lambda done: self.schedule_ui(self.on_adaptive_model_ready, done))
+
+    def on_adaptive_model_ready(self, future):
+        """Dipanggil di thread Tk setelah model resolusi rendah selesai dimuat"""
+        self.adaptive_switch.configure(state="normal")
+        try:
+            future.result()
+        except Exception as e:
+            self.adaptive_var.set(False)
+            self.log_message(f"Gagal memuat model resolusi rendah: {e}", level="error")
+            return
+        self.set_adaptive_resolution(True)
+
+    def set_adaptive_resolution(self, enabled):
+        self.detection_config["adaptive_resolution_enabled"] = enabled
+        self.engine.reset_adaptive_stats()
+        self.log_message(f"Resolusi adaptif {'enabled' if enabled else 'disabled'}")
+
     def update_confidence_threshold(self, value):
         """Update confidence threshold dynamically"""
         self.detection_config["confidence_threshold"] = value
+        # Paksa inferensi berikutnya agar threshold baru langsung terlihat
+        for camera in self.station:
+            camera.motion_gate.reset()
         self.log_message(f"Confidence threshold updated to {value:.2f}")
 
+    def join_worker_threads(self):
+        """Tunggu thread capture dan deteksi berhenti (dibatasi timeout; thread bisa tertahan read kamera)"""
+        deadline = time.perf_counter() + self.worker_join_timeout
+        for thread in self.worker_threads:
+            thread.join(max(0.0, deadline - time.perf_counter()))
+        alive = sum(thread.is_alive() for thread in self.worker_threads)
+        if alive:
+            # Writer dan perekam tetap aman: append/add setelah close diabaikan
+            self.log_message(f"{alive} thread capture/deteksi belum berhenti saat keluar", level="warning")
+
     def quit_app(self):
         """Keluar dari aplikasi"""
         self.running = False
-        if self.cap:
-            self.cap.release()
+        self.loader_pool.shutdown(wait=False)
+        for camera in self.station:
+            camera.display.stop()
+        if self.metrics_exporter:
+            self.metrics_exporter.stop()
+        # Thread capture/deteksi masih memakai kamera, perekam dan log deteksi sampai loop-nya selesai
+        self.join_worker_threads()
+        self.station.release_all()
+        for camera in self.station:
+            if camera.event_recorder is not None:
+                camera.event_recorder.close()
+        if self.event_executor is not None:
+            self.event_executor.shutdown(wait=True)
+        self.detection_history.close()
+        # Kuras writer (fsync gambar + checkpoint database) agar tidak ada set yang hilang
+        if self.submission_writer.close():
+            self.results_store.close()
+        else:
+            # Worker masih memakai database: jangan tutup koneksi di bawahnya
+            self.log_message("Database hasil tidak ditutup karena writer submit belum selesai", level="error")
+        self.log_listener.stop()
         self.root.quit()
 
 def main():
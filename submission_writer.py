@@ -0,0 +1,164 @@
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+
+class SubmissionJob:
+    """Satu set yang menunggu ditulis: frame, metadata dan path gambar tujuan"""
+    __slots__ = ("timestamp", "frame", "detected_objects", "image_path", "complete", "image_frame", "error",
+                 "frame_ref")
+
+    def __init__(self, timestamp, frame, detected_objects, image_path, complete, frame_ref=None):
+        self.timestamp = timestamp
+        self.frame = frame
+        # FrameRef buffer kamera yang dipinjam: dilepas setelah gambar selesai di-encode
+        self.frame_ref = frame_ref
+        self.detected_objects = detected_objects
+        self.image_path = image_path
+        self.complete = complete
+        self.image_frame = None
+        self.error = None
+
+
+class SubmissionWriter:
+    """Worker write-behind: encode gambar sekali di resolusi target dan batch penulisan metadata"""
+
+    def __init__(self, results_store, target_size=(640, 360), jpeg_quality=95,
+                 batch_interval=0.5, max_batch=32, logger=None):
+        self.results_store = results_store
+        self.target_size = target_size
+        self.jpeg_quality = jpeg_quality
+        self.batch_interval = batch_interval
+        self.max_batch = max_batch
+        # Job selesai diambil thread UI lewat drain_completed (worker tidak pernah menunggu thread Tk)
+        self.completed = queue.Queue()
+        self.logger = logger
+        self._queue = queue.Queue()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def submit(self, timestamp, frame, detected_objects, image_path, complete=True, frame_ref=None):
+        """Serahkan set ke worker; frame None berarti gambar sudah ada di disk"""
+        if self._stopping:
+            raise RuntimeError("SubmissionWriter sudah ditutup")
+        job = SubmissionJob(timestamp, frame, detected_objects, image_path, complete, frame_ref)
+        self._queue.put(job)
+        return job
+
+    def drain_completed(self):
+        """Job yang sudah selesai ditulis (dipanggil berkala dari thread UI)"""
+        jobs = []
+        while True:
+            try:
+                jobs.append(self.completed.get_nowait())
+            except queue.Empty:
+                return jobs
+
+    def close(self, timeout=30.0):
+        """Kuras antrian, fsync gambar dan checkpoint database; False jika worker belum selesai dalam timeout"""
+        self._stopping = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            if self.logger:
+                self.logger.error(f"SubmissionWriter belum selesai setelah {timeout:.0f} s; "
+                                  f"{self.pending()} set masih di antrian")
+            return False
+        self.results_store.checkpoint()
+        return True
+
+    def _collect_batch(self):
+        """Ambil satu job lalu kumpulkan job lain yang datang dalam batch_interval"""
+        first = self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = time.perf_counter() + self.batch_interval
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if job is None:
+                return batch, True
+            batch.append(job)
+        return batch, False
+
+    def _write_image(self, job):
+        """Resize sekali ke resolusi target, encode JPEG sekali, tulis dan fsync"""
+        frame = job.frame
+        resized = (frame.shape[1], frame.shape[0]) != self.target_size
+        if resized:
+            frame = cv2.resize(frame, self.target_size, interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if job.frame_ref is not None and not resized:
+            # Frame masih buffer pool kamera: salin untuk tampilan hasil sebelum buffer dilepas
+            frame = frame.copy()
+        if not ok:
+            raise IOError(f"Gagal encode gambar {job.image_path}")
+        tmp_path = f"{job.image_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(encoded.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, job.image_path)
+        job.image_frame = frame
+        job.frame = None
+
+    def _process(self, batch):
+        for job in batch:
+            if job.frame is None:
+                continue
+            try:
+                self._write_image(job)
+            except Exception as e:
+                job.error = e
+                if self.logger:
+                    self.logger.error(f"Gagal menyimpan foto {job.image_path}: {e}")
+            finally:
+                if job.frame_ref is not None:
+                    job.frame_ref.release()
+                    job.frame_ref = None
+                    job.frame = None
+
+        entries = [(job.timestamp, job.detected_objects, job.image_path if job.error is None else None, job.complete)
+                   for job in batch]
+        try:
+            self.results_store.record_sets(entries)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Gagal menyimpan {len(batch)} set ke database: {e}")
+            for job in batch:
+                job.error = job.error or e
+
+        for job in batch:
+            self.completed.put(job)
+
+    def _run(self):
+        while True:
+            batch, stop = self._collect_batch()
+            if batch:
+                self._process(batch)
+            if stop:
+                # Tulis sisa job yang masuk sebelum sentinel diproses
+                remaining = []
+                while True:
+                    try:
+                        job = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is not None:
+                        remaining.append(job)
+                if remaining:
+                    self._process(remaining)
+                return
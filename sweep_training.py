@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+
+from benchmark_pipeline import iter_source_frames
+from inference_backends import yolo_class
+from quantize_int8 import DEFAULT_DATA_YAML, build_engine, measure_latency
+
+RESULTS_FILENAME = "sweep_results.json"
+
+
+def config_key(model, imgsz, epochs):
+    """Nama run unik per konfigurasi (dipakai sebagai direktori run dan kunci cache hasil)"""
+    return f"{os.path.splitext(os.path.basename(model))[0]}_{imgsz}_e{epochs}"
+
+
+def load_results(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_results(path, results):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def is_finished_run_error(error):
+    return "nothing to resume" in str(error)
+
+
+def train_config(model, imgsz, epochs, data_yaml, sweep_dir, key, batch=32, patience=20, device=None):
+    """Training satu konfigurasi; run yang terputus dilanjutkan dari last.pt"""
+    run_dir = os.path.join(sweep_dir, key)
+    best = os.path.join(run_dir, "weights", "best.pt")
+    last = os.path.join(run_dir, "weights", "last.pt")
+    if os.path.exists(last):
+        print(f"[{key}] Melanjutkan training dari {last}")
+        try:
+            yolo_class()(last).train(resume=True)
+        except AssertionError as e:
+            # Ultralytics menolak resume run yang sudah selesai ("... is finished, nothing to resume");
+            # hanya kondisi itu yang dianggap selesai, error lain (data, OOM, checkpoint rusak) diteruskan
+            if not is_finished_run_error(e) or not os.path.exists(best):
+                raise
+            print(f"[{key}] Training sudah selesai; memakai {best}")
+    else:
+        print(f"[{key}] Training {model} imgsz={imgsz} epochs={epochs}")
+        yolo_class()(model).train(
+            data=data_yaml, epochs=epochs, imgsz=imgsz, batch=batch, patience=patience, device=device,
+            project=sweep_dir, name=key, exist_ok=True, plots=False, verbose=False
+        )
+    return best
+
+
+def evaluate_config(weights, data_yaml, imgsz):
+    """mAP dan recall per part pada split val (CPU)"""
+    model = yolo_class()(weights)
+    metrics = model.val(data=data_yaml, imgsz=imgsz, split="val", device="cpu", plots=False, verbose=False)
+    box = metrics.box
+    per_part = {}
+    for index, class_id in enumerate(box.ap_class_index):
+        precision, recall, ap50, ap = box.class_result(index)
+        per_part[model.names[int(class_id)]] = {
+            "precision": float(precision),
+            "recall": float(recall),
+            "map50": float(ap50),
+            "map50_95": float(ap)
+        }
+    return {"map50": float(box.map50), "map50_95": float(box.map), "per_part": per_part}
+
+
+def pareto_front(entries):
+    """Konfigurasi yang tidak didominasi: tidak ada yang lebih cepat sekaligus mAP lebih tinggi atau sama"""
+    front = []
+    for entry in entries:
+        dominated = any(
+            other["latency_p50_ms"] <= entry["latency_p50_ms"] and other["map50_95"] >= entry["map50_95"]
+            and (other["latency_p50_ms"] < entry["latency_p50_ms"] or other["map50_95"] > entry["map50_95"])
+            for other in entries
+        )
+        if not dominated:
+            front.append(entry["key"])
+    return front
+
+
+def build_report(results, recall_target):
+    """Ringkasan per konfigurasi, Pareto front latensi vs mAP dan rekomendasi tercepat yang memenuhi recall"""
+    entries = []
+    for key, result in results.items():
+        if "accuracy" not in result or "latency" not in result:
+            continue
+        recalls = {part: stats["recall"] for part, stats in result["accuracy"]["per_part"].items()}
+        weakest = min(recalls, key=recalls.get) if recalls else None
+        entries.append({
+            "key": key,
+            "model": result["model"],
+            "imgsz": result["imgsz"],
+            "latency_p50_ms": result["latency"]["p50_ms"],
+            "latency_p95_ms": result["latency"]["p95_ms"],
+            "throughput_fps": result["latency"]["throughput_fps"],
+            "map50_95": result["accuracy"]["map50_95"],
+            "min_part_recall": recalls[weakest] if weakest else 0.0,
+            "weakest_part": weakest,
+            "meets_recall_target": bool(recalls) and min(recalls.values()) >= recall_target
+        })
+    entries.sort(key=lambda entry: entry["latency_p50_ms"])
+    front = pareto_front(entries)
+    for entry in entries:
+        entry["pareto"] = entry["key"] in front
+    eligible = [entry for entry in entries if entry["meets_recall_target"]]
+    return {
+        "recall_target": recall_target,
+        "configs": entries,
+        "pareto_front": front,
+        "recommended": eligible[0]["key"] if eligible else None
+    }
+
+
+def run_sweep(models, imgsz_values, epochs, data_yaml, sweep_dir, latency_images, recall_target=0.9,
+              batch=32, patience=20, device=None, backend="torch"):
+    """Train/evaluasi setiap kombinasi model x imgsz; hasil disimpan per konfigurasi agar sweep bisa dilanjutkan"""
+    os.makedirs(sweep_dir, exist_ok=True)
+    results_path = os.path.join(sweep_dir, RESULTS_FILENAME)
+    results = load_results(results_path)
+    frames = list(iter_source_frames([latency_images]))
+    if not frames:
+        raise ValueError(f"Tidak ada gambar untuk pengukuran latensi di {latency_images}")
+
+    for model in models:
+        for imgsz in imgsz_values:
+            key = config_key(model, imgsz, epochs)
+            result = results.setdefault(key, {"model": model, "imgsz": imgsz, "epochs": epochs})
+            if "weights" not in result:
+                result["weights"] = train_config(model, imgsz, epochs, data_yaml, sweep_dir, key, batch, patience, device)
+                save_results(results_path, results)
+            if "accuracy" not in result:
+                result["accuracy"] = evaluate_config(result["weights"], data_yaml, imgsz)
+                save_results(results_path, results)
+            if "latency" not in result:
+                engine = build_engine(result["weights"], backend, imgsz)
+                result["latency"] = measure_latency(engine, frames)
+                result["latency"]["backend"] = backend
+                save_results(results_path, results)
+            print(f"[{key}] mAP50-95 {result['accuracy']['map50_95']:.3f}, "
+                  f"latensi p50 {result['latency']['p50_ms']:.1f} ms")
+    return build_report(results, recall_target)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep ukuran model x imgsz: akurasi per part vs latensi CPU")
+    parser.add_argument("--models", nargs="+", default=["yolov8n.pt", "yolov8s.pt"])
+    parser.add_argument("--imgsz", nargs="+", type=int, default=[320, 416, 512, 640])
+    parser.add_argument("--epochs", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--patience", type=int, default=20)
+    parser.add_argument("--device", default=None, help="Device training (default: otomatis)")
+    parser.add_argument("--data", default=DEFAULT_DATA_YAML)
+    parser.add_argument("--sweep-dir", default=os.path.join("runs", "sweep"))
+    parser.add_argument("--latency-images", default=os.path.join("data", "clarinet_captured_photos"))
+    parser.add_argument("--backend", default="torch", help="Backend inferensi untuk pengukuran latensi")
+    parser.add_argument("--recall-target", type=float, default=0.9, help="Recall minimum setiap part")
+    parser.add_argument("--output", default="sweep_report.json")
+    args = parser.parse_args()
+
+    report = run_sweep(args.models, args.imgsz, args.epochs, args.data, args.sweep_dir, args.latency_images,
+                       args.recall_target, args.batch, args.patience, args.device, args.backend)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"{'Konfigurasi':<24}{'p50 ms':>9}{'mAP50-95':>10}{'recall min':>12}  Pareto")
+    for entry in report["configs"]:
+        print(f"{entry['key']:<24}{entry['latency_p50_ms']:>9.1f}{entry['map50_95']:>10.3f}"
+              f"{entry['min_part_recall']:>12.3f}  {'*' if entry['pareto'] else ''}")
+    print(f"Rekomendasi (tercepat dengan recall setiap part >= {args.recall_target}): {report['recommended']}")
+    print(f"Laporan ditulis ke {args.output}")
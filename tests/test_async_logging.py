@@ -0,0 +1,38 @@
+import logging
+
+from async_logging import DuplicateCollapseFilter, LogRingBuffer
+
+
+def record(message, created, level=logging.INFO):
+    return logging.makeLogRecord({"msg": message, "levelno": level, "levelname": logging.getLevelName(level),
+                                  "created": created})
+
+
+def test_duplicates_collapsed_within_window():
+    collapse = DuplicateCollapseFilter(window_seconds=5.0)
+    assert collapse.filter(record("Data berhasil dicatat", 0.0))
+    assert not collapse.filter(record("Data berhasil dicatat", 1.0))
+    assert not collapse.filter(record("Data berhasil dicatat", 2.0))
+    # Level berbeda adalah pesan berbeda
+    assert collapse.filter(record("Data berhasil dicatat", 2.0, logging.ERROR))
+    summary = record("Data berhasil dicatat", 6.0)
+    assert collapse.filter(summary)
+    assert summary.getMessage() == "Data berhasil dicatat (diulang 2 kali sebelumnya)"
+
+
+def test_collapse_keys_are_bounded():
+    collapse = DuplicateCollapseFilter(window_seconds=5.0, max_keys=2)
+    for index in range(3):
+        collapse.filter(record(f"pesan {index}", 0.0))
+    # Kunci tertua sudah dibuang sehingga pesan 0 lolos lagi
+    assert collapse.filter(record("pesan 0", 1.0))
+    assert not collapse.filter(record("pesan 2", 1.0))
+
+
+def test_ring_buffer_drain_is_bounded():
+    buffer = LogRingBuffer(capacity=3)
+    for index in range(5):
+        buffer.emit(record(f"baris {index}", 0.0))
+    lines = buffer.drain()
+    assert [line.split("] ")[1].strip() for line in lines] == ["baris 2", "baris 3", "baris 4"]
+    assert buffer.drain() == []
@@ -0,0 +1,109 @@
+import os
+
+import numpy as np
+import pytest
+
+from detection_log import (
+    NO_DETECTION, RECORD_DTYPE, SOURCE_TRACKER, DetectionLogWriter, confidence_drift, flicker, frame_keys,
+    list_segments, load_names, open_segment, part_detection_rates, read_log, summarize
+)
+
+NAMES = {0: "Upper", 1: "Lower"}
+
+
+def obj(class_id, confidence, bbox=(10, 20, 110, 220)):
+    return {"class_id": class_id, "confidence": confidence, "bbox": bbox}
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    """Empat frame kamera 0: Lower hilang di frame ke-3 (flicker), satu frame kosong"""
+    writer = DetectionLogWriter(str(tmp_path))
+    writer.set_names(NAMES)
+    writer.append(1, 1000.0, 0, [obj(0, 0.9), obj(1, 0.8)])
+    writer.append(2, 1001.0, 0, [obj(0, 0.9), obj(1, 0.6)], source=SOURCE_TRACKER)
+    writer.append(3, 1002.0, 0, [obj(0, 0.7)])
+    writer.append(4, 1003.0, 0, [])
+    writer.close()
+    return str(tmp_path)
+
+
+def test_record_layout():
+    assert RECORD_DTYPE.itemsize == 32
+
+
+def test_write_and_read_records(log_dir):
+    records = read_log(log_dir)
+    assert len(records) == 6
+    assert records["seq"].tolist() == [1, 1, 2, 2, 3, 4]
+    assert records["class_id"].tolist() == [0, 1, 0, 1, 0, NO_DETECTION]
+    assert records["source"][2] == SOURCE_TRACKER
+    assert records["bbox"][0].tolist() == [10, 20, 110, 220]
+    assert load_names(log_dir) == NAMES
+    assert len(np.unique(frame_keys(records))) == 4
+
+
+def test_read_log_time_range(log_dir):
+    records = read_log(log_dir, start=1001.0, end=1003.0)
+    assert records["seq"].tolist() == [2, 2, 3]
+
+
+def test_truncated_record_is_ignored(log_dir):
+    path = list_segments(log_dir)[0]
+    with open(path, "ab") as f:
+        f.write(b"\1" * 10)
+    assert len(open_segment(path)) == 6
+
+
+def test_bad_segment_rejected(tmp_path):
+    path = tmp_path / "detections_bad.bin"
+    path.write_bytes(b"X" * 64)
+    with pytest.raises(ValueError):
+        open_segment(str(path))
+
+
+def test_segment_rotation(tmp_path):
+    writer = DetectionLogWriter(str(tmp_path), segment_bytes=16 + 2 * RECORD_DTYPE.itemsize, buffer_records=2)
+    for seq in range(1, 6):
+        writer.append(seq, 1000.0 + seq, 0, [obj(0, 0.5)])
+    writer.close()
+    assert len(list_segments(str(tmp_path))) == 3
+    assert read_log(str(tmp_path))["seq"].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_append_after_close_is_ignored(log_dir):
+    writer = DetectionLogWriter(log_dir)
+    writer.close()
+    writer.append(9, 2000.0, 0, [obj(0, 0.5)])
+    writer.close()
+    assert len(read_log(log_dir)) == 6
+
+
+def test_part_detection_rates(log_dir):
+    rates = part_detection_rates(read_log(log_dir), NAMES)
+    assert rates["total_frames"] == 4
+    assert rates["parts"]["Upper"]["frames"] == 3
+    assert rates["parts"]["Lower"]["rate"] == pytest.approx(0.5)
+    assert rates["parts"]["Lower"]["mean_confidence"] == pytest.approx(0.7)
+
+
+def test_confidence_drift(log_dir):
+    drift = confidence_drift(read_log(log_dir), NAMES, bucket_seconds=2.0)
+    assert [bucket["count"] for bucket in drift["Upper"]["buckets"]] == [2, 1]
+    assert drift["Upper"]["delta"] == pytest.approx(-0.2)
+    assert "Lower" in drift and len(drift["Lower"]["buckets"]) == 1
+
+
+def test_flicker(log_dir):
+    result = flicker(read_log(log_dir), NAMES)
+    # Upper: hadir, hadir, hadir, hilang; Lower: hadir, hadir, hilang, hilang (3 transisi frame)
+    assert result["Upper"]["transitions"] == 1
+    assert result["Lower"]["transitions"] == 1
+    assert result["Upper"]["rate"] == pytest.approx(1 / 3)
+
+
+def test_summarize_without_names(log_dir):
+    os.remove(os.path.join(log_dir, "names.json"))
+    summary = summarize(log_dir)
+    assert summary["records"] == 6
+    assert set(summary["rates"]["parts"]) == {"0", "1"}
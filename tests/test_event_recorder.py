@@ -0,0 +1,66 @@
+import time
+
+import numpy as np
+
+from event_recorder import EventRecorder, PartLossMonitor
+from frame_pool import FramePool
+
+
+def test_part_loss_needs_inspections_and_seconds():
+    monitor = PartLossMonitor(min_missing_inspections=3, min_missing_seconds=1.0)
+    assert monitor.update({"Upper", "Strap"}, now=0.0) == set()
+    assert monitor.update({"Upper"}, now=0.1) == set()
+    assert monitor.update({"Upper"}, now=0.2) == set()
+    # Sudah 3 inspeksi tetapi baru 0.2 s
+    assert monitor.update({"Upper"}, now=0.3) == set()
+    assert monitor.update({"Upper"}, now=1.1) == {"Strap"}
+    # Dilaporkan sekali saja
+    assert monitor.update({"Upper"}, now=2.0) == set()
+
+
+def test_part_loss_flicker_resets_debounce():
+    monitor = PartLossMonitor(min_missing_inspections=2, min_missing_seconds=0.0)
+    monitor.update({"Strap"}, now=0.0)
+    assert monitor.update(set(), now=0.1) == set()
+    assert monitor.update({"Strap"}, now=0.2) == set()
+    assert monitor.update(set(), now=0.3) == set()
+    assert monitor.update(set(), now=0.4) == {"Strap"}
+
+
+def test_disarm_after_submit_until_tray_empty():
+    monitor = PartLossMonitor(min_missing_inspections=1, min_missing_seconds=0.0)
+    monitor.update({"Upper", "Strap"}, now=0.0)
+    monitor.reset(disarm=True)
+    # Set yang sudah disubmit diangkat satu per satu: bukan event NG
+    assert monitor.update({"Upper"}, now=0.1) == set()
+    assert monitor.update(set(), now=0.2) == set()
+    assert monitor.armed
+    monitor.update({"Upper"}, now=0.3)
+    assert monitor.update(set(), now=0.4) == {"Upper"}
+
+
+def test_recorder_releases_frames_and_ignores_adds_after_close(tmp_path):
+    pool = FramePool(4, (36, 64, 3))
+    recorder = EventRecorder("Kamera 1", str(tmp_path), pre_seconds=1.0, record_fps=10)
+    for index in range(3):
+        ref = pool.acquire()
+        ref.array[:] = np.uint8(index * 50)
+        recorder.add(ref, index * 0.1)
+    deadline = time.perf_counter() + 2
+    while pool.in_use() and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    assert pool.in_use() == 0
+    recorder.close()
+    assert not recorder.add(pool.acquire(), 1.0)
+    assert pool.in_use() == 0
+
+
+def test_due_subsamples_to_record_fps(tmp_path):
+    recorder = EventRecorder("Kamera 1", str(tmp_path), record_fps=10)
+    try:
+        assert recorder.due(0.0)
+        recorder.add(FramePool(1, (2, 2, 3)).acquire(), 0.0)
+        assert not recorder.due(0.05)
+        assert recorder.due(0.1)
+    finally:
+        recorder.close()
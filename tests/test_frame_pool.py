@@ -0,0 +1,94 @@
+import queue
+import threading
+
+import pytest
+
+from frame_mailbox import LatestFrameMailbox
+from frame_pool import FramePool
+
+
+def test_acquire_release_returns_buffer_to_pool():
+    pool = FramePool(2, (4, 6, 3))
+    first, second = pool.acquire(), pool.acquire()
+    assert first.array.shape == (4, 6, 3)
+    assert first.index != second.index
+    assert pool.in_use() == 2
+    first.release()
+    assert pool.in_use() == 1
+    # Buffer yang dilepas dipakai ulang, bukan dialokasikan baru
+    assert pool.acquire().index == first.index
+
+
+def test_retain_keeps_buffer_until_last_release():
+    pool = FramePool(1, (2, 2))
+    ref = pool.acquire()
+    ref.retain()
+    ref.release()
+    assert pool.in_use() == 1
+    ref.release()
+    assert pool.in_use() == 0
+    with pytest.raises(RuntimeError):
+        ref.release()
+    with pytest.raises(RuntimeError):
+        ref.retain()
+
+
+def test_exhausted_pool_allocates_outside():
+    pool = FramePool(1, (2, 2))
+    pool.acquire()
+    extra = pool.acquire()
+    assert extra.pool is None and extra.array.shape == (2, 2)
+    assert pool.exhausted == 1
+    extra.release()
+    extra.retain()
+    assert pool.in_use() == 1
+
+
+def test_concurrent_retain_release():
+    pool = FramePool(4, (2, 2))
+    refs = [pool.acquire() for _ in range(4)]
+
+    def worker():
+        for _ in range(1000):
+            for ref in refs:
+                ref.retain()
+                ref.release()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert pool.in_use() == 4
+    for ref in refs:
+        ref.release()
+    assert pool.in_use() == 0
+
+
+def test_mailbox_replaces_stale_frame_and_releases_it():
+    pool = FramePool(3, (2, 2))
+    mailbox = LatestFrameMailbox()
+    for _ in range(3):
+        ref = pool.acquire()
+        mailbox.put(ref.array, ref=ref)
+    assert mailbox.dropped_frames == 2
+    assert pool.in_use() == 1
+    packet = mailbox.get(timeout=0)
+    assert packet.seq == mailbox.latest_seq == 3
+    packet.release()
+    packet.release()
+    assert pool.in_use() == 0
+    assert mailbox.delivered_frames == 1
+
+
+def test_mailbox_get_timeout_and_wakeup():
+    mailbox = LatestFrameMailbox(capacity=2)
+    with pytest.raises(queue.Empty):
+        mailbox.get(timeout=0.01)
+    timer = threading.Timer(0.05, mailbox.put, args=("frame", 1.0))
+    timer.start()
+    packet = mailbox.get(timeout=2)
+    assert packet.frame == "frame" and packet.capture_ts == 1.0
+    mailbox.put("a")
+    mailbox.put("b")
+    assert mailbox.qsize() == 2 and mailbox.dropped_frames == 0
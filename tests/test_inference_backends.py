@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+import inference_backends
+from inference_backends import cached_artifact_path, export_backend
+
+
+class FakeExportModel:
+    """Pengganti YOLO: export menulis artefak baru (direktori OpenVINO atau file ONNX) di tmp"""
+    names = {0: "Upper"}
+
+    def __init__(self, export_dir):
+        self.export_dir = export_dir
+
+    def export(self, format, **kwargs):
+        if format == "openvino":
+            path = os.path.join(self.export_dir, "model_openvino_model")
+            os.makedirs(path)
+            with open(os.path.join(path, "model.xml"), "w") as f:
+                f.write("new")
+            return path
+        path = os.path.join(self.export_dir, "model.onnx")
+        with open(path, "w") as f:
+            f.write("new")
+        return path
+
+
+@pytest.fixture
+def weights(tmp_path, monkeypatch):
+    export_dir = tmp_path / "export"
+    export_dir.mkdir()
+    monkeypatch.setattr(inference_backends, "yolo_class", lambda: lambda path: FakeExportModel(str(export_dir)))
+    path = tmp_path / "model.pt"
+    path.write_bytes(b"weights")
+    return str(path)
+
+
+def test_cache_key_contains_hash_imgsz_and_dynamic(weights):
+    path = cached_artifact_path(weights, "openvino", 480)
+    assert path.endswith("_480_dyn_openvino_model")
+    assert inference_backends.weights_hash(weights) in path
+    assert cached_artifact_path(weights, "onnxruntime", 480).endswith("_480_dyn.onnx")
+    with pytest.raises(ValueError):
+        cached_artifact_path(weights, "torch", 480)
+
+
+def test_reexport_replaces_existing_openvino_dir(weights):
+    target = cached_artifact_path(weights, "openvino", 640)
+    os.makedirs(target)
+    with open(os.path.join(target, "model.xml"), "w") as f:
+        f.write("old")
+    assert export_backend(weights, "openvino", 640) == target
+    with open(os.path.join(target, "model.xml")) as f:
+        assert f.read() == "new"
+    assert not os.path.exists(f"{target}.tmp")
+
+
+def test_reexport_replaces_existing_onnx_file(weights):
+    target = cached_artifact_path(weights, "onnxruntime", 640)
+    with open(target, "w") as f:
+        f.write("old")
+    export_backend(weights, "onnxruntime", 640)
+    with open(target) as f:
+        assert f.read() == "new"
@@ -0,0 +1,43 @@
+import io
+
+import cv2
+import numpy as np
+import pytest
+
+from inference_server import decode_frames, parse_params
+
+DEFAULTS = {"confidence_threshold": 0.3, "nms_threshold": 0.5, "imgsz": 640}
+
+
+def test_parse_params_defaults_and_overrides():
+    assert parse_params("", DEFAULTS) == (0.3, 0.5, 640, None)
+    assert parse_params("conf=0.5&imgsz=320&classes=3,1,", DEFAULTS) == (0.5, 0.5, 320, (1, 3))
+    # Dipakai sebagai kunci batch: urutan kelas tidak membuat kunci berbeda
+    assert parse_params("classes=1,3", DEFAULTS) == parse_params("classes=3,1", DEFAULTS)
+    with pytest.raises(ValueError):
+        parse_params("conf=tinggi", DEFAULTS)
+
+
+def npy_bytes(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+
+def test_decode_npy_single_and_batch():
+    frame = np.arange(2 * 3 * 3, dtype=np.uint8).reshape(2, 3, 3)
+    frames = decode_frames(npy_bytes(frame), "application/x-npy")
+    assert len(frames) == 1 and np.array_equal(frames[0], frame)
+    batch = decode_frames(npy_bytes(np.stack([frame, frame + 1])), "application/x-npy")
+    assert len(batch) == 2 and np.array_equal(batch[1], frame + 1)
+    with pytest.raises(ValueError):
+        decode_frames(npy_bytes(np.zeros((2, 3), dtype=np.uint8)), "application/x-npy")
+
+
+def test_decode_image():
+    frame = np.zeros((8, 12, 3), dtype=np.uint8)
+    ok, encoded = cv2.imencode(".png", frame)
+    frames = decode_frames(encoded.tobytes(), "image/png")
+    assert len(frames) == 1 and frames[0].shape == (8, 12, 3)
+    with pytest.raises(ValueError):
+        decode_frames(b"bukan gambar", "image/jpeg")
@@ -0,0 +1,48 @@
+import numpy as np
+
+from motion_gate import MotionGate
+
+
+def frame(value=0, patch=None):
+    image = np.full((90, 160, 3), value, dtype=np.uint8)
+    if patch is not None:
+        x, y = patch
+        image[y:y + 20, x:x + 20] = 255
+    return image
+
+
+def test_static_scene_is_skipped_until_max_skip():
+    gate = MotionGate(max_skip_seconds=1.0)
+    assert gate.should_infer(frame(), now=0.0)
+    assert not gate.should_infer(frame(), now=0.5)
+    assert gate.should_infer(frame(), now=1.0)
+    assert gate.stats() == {"hits": 2, "skips": 1, "skip_ratio": 1 / 3}
+
+
+def test_motion_triggers_inference():
+    gate = MotionGate(max_skip_seconds=10.0)
+    gate.should_infer(frame(), now=0.0)
+    assert not gate.should_infer(frame(3), now=0.1)  # Noise kecil di bawah pixel_threshold
+    assert gate.should_infer(frame(patch=(50, 30)), now=0.2)
+
+
+def test_reference_is_last_inferred_frame():
+    # Perubahan lambat tetap terakumulasi terhadap frame terakhir yang diinferensi
+    gate = MotionGate(pixel_threshold=12, max_skip_seconds=10.0)
+    gate.should_infer(frame(0), now=0.0)
+    assert not gate.should_infer(frame(8), now=0.1)
+    assert gate.should_infer(frame(16), now=0.2)
+
+
+def test_reset_and_shape_change_force_inference():
+    gate = MotionGate(max_skip_seconds=10.0)
+    gate.should_infer(frame(), now=0.0)
+    gate.reset()
+    assert gate.should_infer(frame(), now=0.1)
+    gate.size = (80, 45)
+    assert gate.should_infer(frame(), now=0.2)
+
+
+def test_from_config():
+    gate = MotionGate.from_config({"motion_pixel_threshold": 20, "motion_max_skip_seconds": 2.5})
+    assert gate.pixel_threshold == 20 and gate.max_skip_seconds == 2.5 and gate.changed_fraction == 0.002
@@ -0,0 +1,70 @@
+import numpy as np
+
+from geometry import box_iou
+from object_tracker import MultiObjectTracker
+
+
+def textured_frame(offset_x=0):
+    """Frame dengan satu blok bertekstur (titik fitur untuk optical flow) di x = 40 + offset_x"""
+    rng = np.random.default_rng(0)
+    frame = np.zeros((120, 200, 3), dtype=np.uint8)
+    frame[30:80, 40 + offset_x:100 + offset_x] = rng.integers(0, 255, (50, 60, 3), dtype=np.uint8)
+    return frame
+
+
+def detection(confidence=0.8, bbox=(40, 30, 100, 80)):
+    return {"name": "Upper", "class_id": 0, "confidence": confidence, "bbox": bbox}
+
+
+def test_box_iou():
+    assert box_iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert box_iou((0, 0, 10, 10), (5, 0, 15, 10)) == 50 / 150
+    assert box_iou((0, 0, 10, 10), (20, 20, 30, 30)) == 0.0
+    assert box_iou((0, 0, 0, 0), (0, 0, 0, 0)) == 0.0
+
+
+def test_propagate_follows_motion():
+    tracker = MultiObjectTracker()
+    tracker.update(textured_frame(), [detection()])
+    objects = tracker.propagate(textured_frame(offset_x=4))
+    assert len(objects) == 1
+    assert abs(objects[0]["bbox"][0] - 44) <= 1
+    assert objects[0]["confidence"] < 0.8
+
+
+def test_decayed_confidence_does_not_force_detection():
+    tracker = MultiObjectTracker(confidence_decay=0.8, max_age=50)
+    tracker.update(textured_frame(), [detection(confidence=0.35)])
+    for _ in range(8):
+        tracker.propagate(textured_frame())
+    # Confidence tampilan sudah jauh di bawah threshold, skor detector asli masih di atasnya
+    assert tracker.objects()[0]["confidence"] < 0.3
+    assert not tracker.needs_detection(detect_interval=20, min_confidence=0.3)
+    assert tracker.needs_detection(detect_interval=20, min_confidence=0.4)
+
+
+def test_age_limit_and_interval_force_detection():
+    tracker = MultiObjectTracker(max_age=3)
+    assert tracker.needs_detection(5, 0.3)
+    tracker.update(textured_frame(), [detection()])
+    tracker.propagate(textured_frame())
+    tracker.propagate(textured_frame())
+    assert not tracker.needs_detection(5, 0.3)
+    tracker.propagate(textured_frame())
+    assert tracker.needs_detection(5, 0.3)
+    tracker = MultiObjectTracker(max_age=99)
+    tracker.update(textured_frame(), [detection()])
+    tracker.propagate(textured_frame())
+    assert not tracker.needs_detection(2, 0.3)
+    tracker.propagate(textured_frame())
+    assert tracker.needs_detection(2, 0.3)
+
+
+def test_update_keeps_track_id_and_drops_after_misses():
+    tracker = MultiObjectTracker(max_misses=1)
+    first = tracker.update(textured_frame(), [detection()])[0]["track_id"]
+    tracker.propagate(textured_frame())
+    assert tracker.update(textured_frame(), [detection(bbox=(42, 30, 102, 80))])[0]["track_id"] == first
+    assert tracker.tracks[0].age == 0
+    assert len(tracker.update(textured_frame(), [])) == 1
+    assert tracker.update(textured_frame(), []) == []
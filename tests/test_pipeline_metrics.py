@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from pipeline_metrics import MetricsRegistry, RateMeter, RollingHistogram
+
+
+def test_rolling_histogram():
+    histogram = RollingHistogram(window=3)
+    for value in (1.0, 2.0, 3.0, 4.0):
+        histogram.observe(value)
+    summary = histogram.summary()
+    assert summary["count"] == 4 and summary["sum"] == 10.0
+    assert summary["mean"] == 3.0 and summary["p50"] == 3.0 and summary["p99"] == 4.0
+
+
+def test_rate_meter_window():
+    meter = RateMeter(window_seconds=1.0)
+    for index in range(11):
+        meter.mark(now=index * 0.1)
+    assert meter.rate(now=1.0) == pytest.approx(10.0)
+    assert meter.rate(now=5.0) == 0.0
+
+
+def test_to_prometheus():
+    registry = MetricsRegistry(station_id='st"1')
+    for seconds in (0.02, 0.04, 0.06):
+        registry.observe("infer", seconds)
+    registry.inc("motion_gate_skips", 3)
+    registry.set_gauge("queue_depth", 2)
+    text = registry.to_prometheus()
+    lines = text.splitlines()
+    assert text.endswith("\n")
+    assert "# TYPE clarinet_stage_seconds summary" in lines
+    assert 'clarinet_stage_seconds{station="st1",stage="infer",quantile="0.5"} 0.040000' in lines
+    assert 'clarinet_stage_seconds_sum{station="st1",stage="infer"} 0.120000' in lines
+    assert 'clarinet_stage_seconds_count{station="st1",stage="infer"} 3' in lines
+    assert "# TYPE clarinet_motion_gate_skips_total counter" in lines
+    assert 'clarinet_motion_gate_skips_total{station="st1"} 3' in lines
+    assert 'clarinet_queue_depth{station="st1"} 2' in lines
+
+
+def test_write_json_and_prometheus(tmp_path):
+    registry = MetricsRegistry(station_id="st1")
+    with registry.timer("draw"):
+        pass
+    registry.mark("capture_frames")
+    registry.write(str(tmp_path / "metrics.json"))
+    snapshot = json.loads((tmp_path / "metrics.json").read_text())
+    assert snapshot["stages"]["draw"]["count"] == 1
+    assert "capture_frames" in snapshot["rates"]
+    registry.write(str(tmp_path / "metrics.prom"))
+    assert "clarinet_capture_frames_per_second" in (tmp_path / "metrics.prom").read_text()
+    assert not list(tmp_path.glob("*.tmp"))
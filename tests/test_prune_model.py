@@ -0,0 +1,60 @@
+import copy
+import os
+import subprocess
+import sys
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("ultralytics")
+pytest.importorskip("torch_pruning")
+
+from inference_backends import yolo_class  # noqa: E402
+from prune_model import count_complexity, prune_channels  # noqa: E402
+from pruned_layers import C2f_v2, replace_c2f  # noqa: E402
+
+IMGSZ = 64
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dijalankan di proses terpisah: load persis seperti load_model aplikasi (backend torch) lalu predict
+RELOAD_SCRIPT = """
+import sys
+import numpy as np
+from inference_backends import load_backend_model
+model = load_backend_model(sys.argv[1], "torch")
+results = model(np.zeros((96, 128, 3), dtype=np.uint8), imgsz=int(sys.argv[2]), verbose=False)
+print(len(results), type(model.model.model[2]).__module__)
+"""
+
+
+def build_model():
+    return yolo_class()("yolov8n.yaml").model.eval()
+
+
+def test_replace_c2f_keeps_output():
+    model = build_model()
+    inputs = torch.rand(1, 3, IMGSZ, IMGSZ)
+    with torch.no_grad():
+        expected = model(inputs)[0]
+        assert replace_c2f(model) > 0
+        actual = model(inputs)[0]
+    assert not any(type(module).__name__ == "C2f" for module in model.modules())
+    assert torch.allclose(expected, actual, atol=1e-5)
+
+
+def test_pruned_checkpoint_round_trip(tmp_path):
+    model = build_model()
+    before = count_complexity(model, IMGSZ)
+    prune_channels(model, 0.3, IMGSZ)
+    assert count_complexity(model, IMGSZ)["params"] < before["params"]
+    c2f = [module for module in model.modules() if isinstance(module, C2f_v2)]
+    assert c2f and all(module.c == module.cv0.conv.out_channels for module in c2f)
+    assert C2f_v2.__module__ == "pruned_layers"
+
+    # Format checkpoint trainer ultralytics: modul utuh dalam half precision
+    path = str(tmp_path / "best.pt")
+    torch.save({"model": copy.deepcopy(model).half(), "train_args": {"imgsz": IMGSZ, "task": "detect"}}, path)
+    env = dict(os.environ, PYTHONPATH=REPO_DIR)
+    output = subprocess.run([sys.executable, "-c", RELOAD_SCRIPT, path, str(IMGSZ)], cwd=str(tmp_path), env=env,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.split()[-2:] == ["1", "pruned_layers"]
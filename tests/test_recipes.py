@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import pytest
+
+from recipes import Recipe, load_recipes
+
+NAMES = {0: "Upper", 1: "Lower", 2: "Strap", 3: "Reed", 4: "Cap"}
+
+
+@pytest.fixture
+def compiled():
+    recipe = Recipe("Duo", {"Upper": 1, "Lower": 2}, optional=["Strap"], forbidden=["Cap"])
+    return recipe.compile(NAMES)
+
+
+def test_compile_masks(compiled):
+    assert compiled.required_counts.tolist() == [1, 2, 0, 0, 0]
+    assert compiled.required_mask == 0b00011
+    assert compiled.allowed_mask == 0b00111
+    assert compiled.forbidden_mask == 0b10000
+    assert compiled.class_ids == [0, 1, 2, 4]
+
+
+def test_complete_with_optional_part(compiled):
+    result = compiled.check_counts(compiled.count([0, 1, 1, 2]))
+    assert result["complete"]
+    assert result["status"] == "Lengkap"
+    assert result["missing"] == set()
+    assert result["presence_mask"] == 0b00111
+
+
+def test_quantity_short_is_missing(compiled):
+    result = compiled.check_counts(compiled.count([0, 1]))
+    assert not result["complete"]
+    assert result["missing"] == {"Lower"}
+
+
+def test_forbidden_and_extra_parts(compiled):
+    result = compiled.check_counts(compiled.count([0, 1, 1, 3, 4]))
+    assert not result["complete"]
+    assert result["forbidden"] == {"Cap"}
+    assert result["extra"] == {"Reed", "Cap"}
+
+
+def test_count_ignores_unknown_class_ids(compiled):
+    assert compiled.count([-1, 0, 7, 1]).tolist() == [1, 1, 0, 0, 0]
+
+
+def test_class_ids_of_uses_class_id_or_name(compiled):
+    objects = [{"class_id": 2, "name": "Strap"}, {"name": "Lower"}, {"name": "Unknown"}]
+    assert compiled.class_ids_of(objects).tolist() == [2, 1, -1]
+    assert compiled.class_ids_of([]).dtype == np.int64
+
+
+def test_required_part_unknown_to_model_is_always_missing():
+    compiled = Recipe("Trio", {"Upper": 1, "Bell": 1}).compile(NAMES)
+    result = compiled.check_counts(compiled.count([0]))
+    assert not result["complete"]
+    assert result["missing"] == {"Bell"}
+
+
+def test_overlapping_forbidden_part_rejected():
+    with pytest.raises(ValueError):
+        Recipe("Salah", {"Upper": 1}, forbidden=["Upper"])
+
+
+def test_load_recipes_round_trip(tmp_path):
+    recipe = Recipe("Duo", {"Upper": 1, "Lower": 2}, optional=["Strap"], forbidden=["Cap"])
+    path = tmp_path / "recipes.json"
+    path.write_text(json.dumps({"recipes": [recipe.to_dict(), {"name": "List", "required": ["Upper"]}]}))
+    recipes = load_recipes(str(path))
+    assert list(recipes) == ["Duo", "List"]
+    assert recipes["Duo"].to_dict() == recipe.to_dict()
+    assert recipes["List"].required == {"Upper": 1}
+
+
+def test_load_recipes_rejects_duplicate_names(tmp_path):
+    path = tmp_path / "recipes.json"
+    path.write_text(json.dumps([{"name": "A", "required": ["Upper"]}, {"name": "A", "required": ["Lower"]}]))
+    with pytest.raises(ValueError):
+        load_recipes(str(path))
@@ -0,0 +1,102 @@
+import csv
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from results_store import EXPORT_FILENAME, ResultsStore
+from submission_writer import SubmissionWriter
+
+PARTS = ["Upper", "Lower", "Barrel"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"), station_id="test")
+    yield store
+    store.close()
+
+
+def write_legacy_logs(csv_dir):
+    """Set_*.csv (1/0 per part) dan log utama lama dengan baris ganda di detik yang sama"""
+    with open(os.path.join(csv_dir, "Set_20250221_113846.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Set", *PARTS])
+        writer.writerow(["Set_20250221_113846", 1, 1, 0])
+    with open(os.path.join(csv_dir, "clarinet_detection_log.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Timestamp", "Daftar Objek"])
+        writer.writerow(["2025-02-21 11:38:41", '"Upper, Lower, Barrel"'])
+        writer.writerow(["2025-02-21 11:38:41", '"Upper, Lower, Barrel"'])
+        # Sudah tercatat di Set_*.csv: tidak boleh diimport dua kali
+        writer.writerow(["2025-02-21 11:38:46", '"Upper, Lower"'])
+
+
+def test_record_sets_keeps_same_second_submits(store):
+    timestamp = datetime(2025, 7, 1, 8, 0, 0, 250000)
+    entries = [(timestamp, {"Upper": {"confidence": 0.9}}, None, False, None) for _ in range(3)]
+    assert store.record_sets(entries) == 3
+    names = [row["set_name"] for row in store.query()]
+    assert names == ["Set_20250701_080000_250", "Set_20250701_080000_250_2", "Set_20250701_080000_250_3"]
+    assert store.query()[0]["confidences"] == {"Upper": 0.9}
+
+
+def test_live_set_name_has_milliseconds():
+    assert ResultsStore.live_set_name(datetime(2025, 7, 1, 8, 0, 0, 7999)) == "Set_20250701_080000_007"
+    assert ResultsStore.live_image_name(datetime(2025, 7, 1, 8, 0, 0, 7999)) == "detected_20250701_080000_007.jpg"
+
+
+def test_same_second_submits_keep_separate_photos(store, tmp_path):
+    writer = SubmissionWriter(store, target_size=(64, 36), batch_interval=0.01)
+    for index, millisecond in enumerate((100, 400, 900)):
+        timestamp = datetime(2025, 7, 1, 8, 0, 0, millisecond * 1000)
+        frame = np.full((36, 64, 3), index * 100, dtype=np.uint8)
+        writer.submit(timestamp, frame, {"Upper": {"confidence": 0.9}},
+                      str(tmp_path / ResultsStore.live_image_name(timestamp)))
+    assert writer.close()
+    rows = store.query()
+    image_paths = [row["image_path"] for row in rows]
+    assert len(rows) == 3 and len(set(image_paths)) == 3
+    assert all(os.path.exists(path) for path in image_paths)
+    assert [row["set_name"] for row in rows] == [
+        "Set_20250701_080000_100", "Set_20250701_080000_400", "Set_20250701_080000_900"
+    ]
+
+
+def test_import_legacy_logs(store, tmp_path):
+    write_legacy_logs(str(tmp_path))
+    assert store.import_csv_logs(str(tmp_path), required_objects=PARTS) == 2
+    rows = {row["set_name"]: row for row in store.query()}
+    assert set(rows) == {"Set_20250221_113846", "Set_20250221_113841"}
+    assert rows["Set_20250221_113846"]["parts"] == {"Upper", "Lower"}
+    assert not rows["Set_20250221_113846"]["complete"]
+    assert rows["Set_20250221_113841"]["complete"]
+    # Import ulang tidak menggandakan set
+    assert store.import_csv_logs(str(tmp_path), required_objects=PARTS) == 0
+    assert len(store.query()) == 2
+
+
+def test_export_is_not_reimported(store, tmp_path):
+    store.record_set(datetime(2025, 7, 1, 8, 0, 0), {"Upper": {"confidence": 0.8}}, complete=False)
+    store.record_set(datetime(2025, 7, 1, 8, 0, 1), {name: {"confidence": 0.9} for name in PARTS})
+    assert store.export_csv(str(tmp_path / EXPORT_FILENAME)) == 2
+    # Export lama yang pernah menimpa log utama juga dikenali dari header-nya
+    assert store.export_csv(str(tmp_path / "clarinet_detection_log.csv")) == 2
+    assert store.import_csv_logs(str(tmp_path)) == 0
+    assert len(store.query()) == 2
+
+
+def test_export_round_trip(store, tmp_path):
+    store.register_parts(PARTS)
+    store.record_set(datetime(2025, 7, 1, 8, 0, 0), {"Upper": {"confidence": 0.8}}, "a.jpg", complete=False)
+    store.record_set(datetime(2025, 7, 1, 8, 0, 1), {name: {"confidence": 0.9} for name in PARTS}, "b.jpg")
+    path = str(tmp_path / EXPORT_FILENAME)
+    store.export_csv(path, complete=False)
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 1
+    assert rows[0]["Set"] == "Set_20250701_080000_000"
+    assert [rows[0][name] for name in PARTS] == ["1", "0", "0"]
+    assert rows[0]["Status"] == "NG"
+    assert rows[0]["Gambar"] == "a.jpg"
@@ -0,0 +1,74 @@
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from frame_pool import FramePool
+from submission_writer import SubmissionWriter
+
+
+class RecordingStore:
+    """Pengganti ResultsStore: catat entri; opsional tahan record_sets sampai release di-set"""
+
+    def __init__(self, release=None):
+        self.entries = []
+        self.checkpoints = 0
+        self.release = release
+
+    def record_sets(self, entries):
+        if self.release is not None:
+            self.release.wait()
+        self.entries.extend(entries)
+        return len(entries)
+
+    def checkpoint(self):
+        self.checkpoints += 1
+
+
+def test_close_drains_queue_and_releases_frames(tmp_path):
+    store = RecordingStore()
+    pool = FramePool(3, (36, 64, 3))
+    writer = SubmissionWriter(store, target_size=(64, 36), batch_interval=0.01)
+    for index in range(3):
+        ref = pool.acquire()
+        ref.array[:] = index
+        writer.submit(datetime(2025, 7, 1, 8, 0, index), ref.array, {"Upper": {"confidence": 0.9}},
+                      str(tmp_path / f"{index}.jpg"), frame_ref=ref)
+    assert writer.close()
+    assert store.checkpoints == 1
+    assert len(store.entries) == 3
+    assert pool.in_use() == 0
+    jobs = writer.drain_completed()
+    assert len(jobs) == 3 and writer.drain_completed() == []
+    for job in jobs:
+        assert job.error is None and os.path.exists(job.image_path)
+        # Frame untuk tampilan hasil adalah salinan, bukan buffer pool yang sudah dilepas
+        assert job.image_frame is not None and job.frame_ref is None
+        assert not np.shares_memory(job.image_frame, pool.buffers)
+    with pytest.raises(RuntimeError):
+        writer.submit(datetime.now(), None, {}, None)
+
+
+def test_write_error_is_reported_without_image_path(tmp_path):
+    store = RecordingStore()
+    writer = SubmissionWriter(store, target_size=(64, 36), batch_interval=0.01)
+    frame = np.zeros((36, 64, 3), dtype=np.uint8)
+    writer.submit(datetime(2025, 7, 1), frame, {}, str(tmp_path / "tidak_ada" / "a.jpg"))
+    assert writer.close()
+    job, = writer.drain_completed()
+    assert job.error is not None
+    assert store.entries[0][2] is None
+
+
+def test_close_times_out_while_worker_busy():
+    release = threading.Event()
+    store = RecordingStore(release)
+    writer = SubmissionWriter(store, batch_interval=0.0)
+    writer.submit(datetime(2025, 7, 1), None, {}, None)
+    assert not writer.close(timeout=0.1)
+    assert store.checkpoints == 0
+    release.set()
+    writer._thread.join(2)
+    assert len(writer.drain_completed()) == 1
@@ -0,0 +1,74 @@
+import numpy as np
+
+from tiling import clip_roi, merge_detections, tile_windows
+
+
+def test_clip_roi():
+    assert clip_roi(None, 1920, 1080) == (0, 0, 1920, 1080)
+    assert clip_roi((-10, 100.4, 2000, 900), 1920, 1080) == (0, 100, 1920, 900)
+    # ROI kosong setelah dipotong = seluruh frame
+    assert clip_roi((500, 500, 400, 600), 1920, 1080) == (0, 0, 1920, 1080)
+
+
+def test_tile_windows_cover_area_with_overlap():
+    windows = tile_windows(1920, 1080, 640, overlap=0.2)
+    coverage = np.zeros((1080, 1920), dtype=bool)
+    for x1, y1, x2, y2 in windows:
+        assert x2 - x1 == 640 and y2 - y1 == 640
+        coverage[y1:y2, x1:x2] = True
+    assert coverage.all()
+    xs = sorted({x1 for x1, _, _, _ in windows})
+    assert xs[0] == 0 and xs[-1] == 1920 - 640
+    assert all(640 - (b - a) >= 0.2 * 640 for a, b in zip(xs, xs[1:]))
+
+
+def test_tile_windows_small_area_is_single_window():
+    assert tile_windows(500, 300, 640) == [(0, 0, 500, 300)]
+
+
+def test_merge_joins_part_split_at_tile_seam():
+    # Potongan part di tepi tile (conf rendah) berada di dalam deteksi utuh dari tile tetangga
+    xyxy = [[600, 100, 700, 200], [600, 100, 640, 200], [1000, 100, 1100, 200]]
+    merged, conf, cls = merge_detections(xyxy, [0.9, 0.6, 0.8], [1, 1, 1])
+    assert merged.tolist() == [[600, 100, 700, 200], [1000, 100, 1100, 200]]
+    assert conf.tolist() == np.float32([0.9, 0.8]).tolist()
+    assert cls.tolist() == [1, 1]
+
+
+def test_merge_expands_to_union_and_keeps_highest_confidence():
+    merged, conf, cls = merge_detections([[0, 0, 50, 100], [10, 0, 80, 100]], [0.5, 0.7], [2, 2])
+    assert merged.tolist() == [[0, 0, 80, 100]]
+    assert conf.tolist() == np.float32([0.7]).tolist()
+
+
+def test_merge_is_per_class_and_respects_threshold():
+    xyxy = [[0, 0, 100, 100], [0, 0, 100, 100], [90, 0, 190, 100]]
+    merged, conf, cls = merge_detections(xyxy, [0.9, 0.8, 0.7], [0, 1, 0])
+    assert len(merged) == 3
+    assert sorted(cls.tolist()) == [0, 0, 1]
+
+
+def test_merge_empty_and_single():
+    merged, conf, cls = merge_detections(np.zeros((0, 4)), [], [])
+    assert merged.shape == (0, 4) and conf.shape == (0,) and cls.shape == (0,)
+    merged, conf, cls = merge_detections([[1, 2, 3, 4]], [0.5], [3.0])
+    assert merged.tolist() == [[1, 2, 3, 4]] and cls.dtype == np.int32
+
+
+def test_match_frame_counts_per_class():
+    from benchmark_tiling import load_ground_truth, match_frame
+
+    gt_cls = np.array([0, 0, 1])
+    gt_xyxy = np.array([[0, 0, 10, 10], [20, 0, 30, 10], [0, 20, 10, 30]], dtype=np.float32)
+    objects = [
+        {"class_id": 0, "confidence": 0.9, "bbox": (0, 0, 10, 10)},
+        {"class_id": 0, "confidence": 0.8, "bbox": (1, 0, 11, 10)},  # Duplikat box pertama: FP
+        {"class_id": 2, "confidence": 0.7, "bbox": (0, 0, 5, 5)}
+    ]
+    counts = {}
+    match_frame(objects, gt_cls, gt_xyxy, 0.5, counts)
+    assert counts[0] == {"gt": 2, "tp": 1, "fp": 1}
+    assert counts[1] == {"gt": 1, "tp": 0, "fp": 0}
+    assert counts[2] == {"gt": 0, "tp": 0, "fp": 1}
+    cls, xyxy = load_ground_truth("tidak_ada.txt", 100, 100)
+    assert cls.shape == (0,) and xyxy.shape == (0, 4)
@@ -0,0 +1,65 @@
+import numpy as np
+
+
+def clip_roi(roi, width, height):
+    """ROI (x1, y1, x2, y2) piksel kamera yang dipotong ke batas frame; None atau ROI kosong = seluruh frame"""
+    if roi is None:
+        return 0, 0, width, height
+    x1, y1, x2, y2 = (int(round(value)) for value in roi)
+    x1, x2 = max(0, min(x1, width)), max(0, min(x2, width))
+    y1, y2 = max(0, min(y1, height)), max(0, min(y2, height))
+    if x2 <= x1 or y2 <= y1:
+        return 0, 0, width, height
+    return x1, y1, x2, y2
+
+
+def tile_windows(width, height, tile_size, overlap=0.2):
+    """Jendela tile (x1, y1, x2, y2) yang menutup area width x height dengan overlap minimal, tersebar rata"""
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        stride = max(1, int(tile_size * (1 - overlap)))
+        count = -(-(length - tile_size) // stride) + 1
+        return np.linspace(0, length - tile_size, count).round().astype(int).tolist()
+
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in starts(height) for x in starts(width)
+    ]
+
+
+def merge_detections(xyxy, conf, cls, match_threshold=0.5):
+    """Gabungkan deteksi ganda di sambungan tile (greedy, per kelas, intersection-over-smaller)"""
+    # Box confidence tertinggi dipertahankan lalu diperluas ke union box yang cocok, sehingga potongan
+    # part di tepi tile menyatu dengan deteksi utuh dari tile tetangga atau pass ROI penuh
+    xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+    conf = np.asarray(conf, dtype=np.float32).reshape(-1)
+    cls = np.asarray(cls).astype(np.int32, copy=False).reshape(-1)
+    if len(conf) <= 1:
+        return xyxy, conf, cls
+    order = np.argsort(-conf, kind="stable")
+    xyxy, conf, cls = xyxy[order], conf[order], cls[order]
+    area = np.maximum(xyxy[:, 2] - xyxy[:, 0], 0) * np.maximum(xyxy[:, 3] - xyxy[:, 1], 0)
+    suppressed = np.zeros(len(conf), dtype=bool)
+    merged = xyxy.copy()
+    keep = []
+    for index in range(len(conf)):
+        if suppressed[index]:
+            continue
+        keep.append(index)
+        candidates = np.flatnonzero(~suppressed & (cls == cls[index]))
+        candidates = candidates[candidates > index]
+        if not candidates.size:
+            continue
+        box = xyxy[index]
+        inter_w = np.minimum(box[2], xyxy[candidates, 2]) - np.maximum(box[0], xyxy[candidates, 0])
+        inter_h = np.minimum(box[3], xyxy[candidates, 3]) - np.maximum(box[1], xyxy[candidates, 1])
+        inter = np.maximum(inter_w, 0) * np.maximum(inter_h, 0)
+        smaller = np.maximum(np.minimum(area[index], area[candidates]), 1e-6)
+        matched = candidates[inter / smaller >= match_threshold]
+        if matched.size:
+            suppressed[matched] = True
+            group = np.vstack([box[None], xyxy[matched]])
+            merged[index] = (group[:, 0].min(), group[:, 1].min(), group[:, 2].max(), group[:, 3].max())
+    keep = np.asarray(keep, dtype=np.int64)
+    return merged[keep], conf[keep], cls[keep]
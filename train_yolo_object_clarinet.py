@@ -2,6 +2,7 @@ import torch
 from ultralytics import YOLO  
 import multiprocessing  
 import os  
+from dataset_audit import audit_dataset, load_names, print_summary  
 
 def verify_dataset_structure(dataset_path):  
     """Verify YOLO dataset directory structure"""  
@@ -31,6 +32,15 @@ if __name__ == '__main__':
         print("Dataset structure is incomplete. Please check your directories.")
         exit(1)  
 
+    data_yaml = os.path.join(dataset_path, "data.yaml")  
+
+    # Audit images/labels in parallel before training (cached index: only changed files are re-read)  
+    audit = audit_dataset(dataset_path, load_names(data_yaml))  
+    print_summary(audit)  
+    if audit["errors"]:  
+        print("Dataset has invalid images or labels. Fix them (see list above) before training.")  
+        exit(1)  
+
     # CUDA availability  
     print("CUDA Available:", torch.cuda.is_available())  
 
@@ -44,7 +54,7 @@ if __name__ == '__main__':
 
         # Training configuration  
         model.train( 
-            data=os.path.join(dataset_path, "D:/DATA/FOR_DL/objectdetection/magang2025/DatasetClarinet/data.yaml"),  # Path to dataset.yaml  
+            data=data_yaml,  # Path to dataset.yaml  
             epochs=50,  # Increased epochs  
             imgsz=640,  
             batch=32,  # Adjusted batch size  